@@ -0,0 +1,46 @@
+"""
+Benchmark das estratégias de compressão do ZIP de XMLs: tamanho final
+contra tempo, com e sem o pool de threads de deflate.
+
+Uso:
+    python benchmarks/bench_compressao.py --linhas 100000 --threads 4
+"""
+import argparse
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_gerar_xml import criar_df  # noqa: E402
+from gerador.services.escritor_zip import COMPRESSOES, EscritorZipXml  # noqa: E402
+from gerador.services.gerar_xml_lote import GeradorXmlLote  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--linhas', type=int, default=100_000)
+    parser.add_argument('--threads', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    xmls = list(GeradorXmlLote(criar_df(args.linhas), False, motor='template').gerar_xmls())
+    tamanho_original = sum(len(x) for x in xmls)
+    print(f"{len(xmls):,} XMLs, {tamanho_original / 1024 / 1024:.1f} MB sem compressão\n")
+
+    print(f"{'compressão':>10} {'threads':>8} {'tempo (s)':>10} {'tamanho (MB)':>13}")
+    for compressao in COMPRESSOES:
+        for threads in sorted({1, args.threads}):
+            destino = io.BytesIO()
+            inicio = time.perf_counter()
+            with EscritorZipXml(destino, compressao, threads) as escritor:
+                for numero, xml_content in enumerate(xmls, 1):
+                    escritor.adicionar(numero, xml_content)
+            tempo = time.perf_counter() - inicio
+            tamanho = destino.getbuffer().nbytes / 1024 / 1024
+            print(f"{compressao:>10} {threads:>8} {tempo:>10.2f} {tamanho:>13.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""
+Benchmark da geração de XML: GeradorXml linha a linha (df.iterrows) contra
+o GeradorXmlLote.
+
+Uso:
+    python benchmarks/bench_gerar_xml.py
+    python benchmarks/bench_gerar_xml.py --tamanhos 10000 100000 1000000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gerador.constants import COLUNAS_OBRIGATORIAS  # noqa: E402
+from gerador.services.gerar_xml import GeradorXml  # noqa: E402
+from gerador.services.gerar_xml_lote import GeradorXmlLote  # noqa: E402
+
+COMPLEMENTOS = ['LT 10', 'QD 5', 'CS 2', 'AP 101', 'BL A', 'M', 'SL 3', np.nan]
+
+
+def criar_df(linhas, semente=42):
+    """Cria um DataFrame sintético com as colunas do CSV do Netwin"""
+    rng = np.random.default_rng(semente)
+    df = pd.DataFrame({coluna: 'X' for coluna in COLUNAS_OBRIGATORIAS}, index=range(linhas))
+    df['COD_SURVEY'] = [f'SV{i}' for i in range(linhas)]
+    df['ID_ENDERECO'] = np.arange(linhas) + 90000000
+    df['LATITUDE'] = [f'-15,{v}' for v in rng.integers(100000, 999999, linhas)]
+    df['LONGITUDE'] = [f'-47,{v}' for v in rng.integers(100000, 999999, linhas)]
+    df['COMPLEMENTO'] = rng.choice(np.array(COMPLEMENTOS[:-1], dtype=object), linhas)
+    df['COMPLEMENTO2'] = rng.choice(np.array(COMPLEMENTOS, dtype=object), linhas)
+    df['COMPLEMENTO3'] = rng.choice(np.array(COMPLEMENTOS, dtype=object), linhas)
+    df['QUANTIDADE_UMS'] = rng.integers(1, 10, linhas)
+    return df
+
+
+def medir(funcao):
+    inicio = time.perf_counter()
+    funcao()
+    return time.perf_counter() - inicio
+
+
+def por_linha(df):
+    for i, (_, linha) in enumerate(df.iterrows(), 1):
+        GeradorXml(linha, i, False).gerar_xml()
+
+
+def em_lote(df):
+    for _ in GeradorXmlLote(df, False).gerar_xmls():
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tamanhos', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+
+    print(f"{'linhas':>10} {'por linha (s)':>14} {'lote (s)':>10} {'ganho':>7}")
+    for linhas in args.tamanhos:
+        df = criar_df(linhas)
+        tempo_linha = medir(lambda: por_linha(df))
+        tempo_lote = medir(lambda: em_lote(df))
+        print(f"{linhas:>10,} {tempo_linha:>14.2f} {tempo_lote:>10.2f} {tempo_linha / tempo_lote:>6.1f}x")
+
+
+if __name__ == '__main__':
+    main()
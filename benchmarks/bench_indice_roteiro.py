@@ -0,0 +1,74 @@
+"""
+Benchmark do IndiceRoteiro: custo de resolver um chunk de endereços contra
+roteiros de tamanhos diferentes.
+
+O índice é montado uma vez por roteiro (fora da medição, como no
+CacheRoteiros); cada chunk faz apenas a busca vetorizada, então o tempo por
+chunk deve ficar praticamente constante quando o roteiro cresce. Para
+comparação também é medido um merge do chunk com o roteiro inteiro.
+
+Uso:
+    python benchmarks/bench_indice_roteiro.py --chunk 50000 --roteiros 10000 100000 1000000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gerador.services.indice_roteiro import IndiceRoteiro  # noqa: E402
+
+
+def criar_roteiro(linhas):
+    """Roteiro sintético com chaves únicas de localidade/logradouro"""
+    return pd.DataFrame({
+        'COD_LOCALIDADE': np.arange(linhas) // 1000,
+        'COD_LOGRADOURO': np.arange(linhas) % 1000,
+        'ROTEIRO': [f'R{i % 500}' for i in range(linhas)],
+    })
+
+
+def criar_chunk(linhas, tamanho_roteiro, semente=0):
+    """Chunk de endereços apontando para chaves aleatórias do roteiro"""
+    posicoes = np.random.default_rng(semente).integers(0, tamanho_roteiro, linhas)
+    return pd.DataFrame({'COD_LOCALIDADE': posicoes // 1000, 'COD_LOGRADOURO': posicoes % 1000})
+
+
+def medir(funcao, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--chunk', type=int, default=50_000)
+    parser.add_argument('--roteiros', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--repeticoes', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'roteiro':>10} {'montagem':>10} {'indice/chunk':>13} {'merge/chunk':>12}")
+    for tamanho in args.roteiros:
+        roteiro = criar_roteiro(tamanho)
+        chunk = criar_chunk(args.chunk, tamanho)
+
+        inicio = time.perf_counter()
+        indice = IndiceRoteiro(roteiro)
+        montagem = time.perf_counter() - inicio
+
+        busca = medir(lambda: indice.buscar(chunk), args.repeticoes)
+        merge = medir(lambda: chunk.merge(roteiro, on=list(IndiceRoteiro.CHAVES), how='left'),
+                      args.repeticoes)
+
+        print(f"{tamanho:>10,} {montagem:>9.3f}s {busca:>12.4f}s {merge:>11.4f}s")
+
+
+if __name__ == '__main__':
+    main()
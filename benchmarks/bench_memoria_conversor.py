@@ -0,0 +1,68 @@
+"""
+Relatório de memória da leitura do extrato de endereços do conversor:
+leitura atual (tipos inferidos) contra o schema de gerador/schema_csv.py.
+
+Gera um extrato sintético com as COLUNAS_OBRIGATORIAS (separador '|') e
+compara o memory_usage(deep=True) de cada coluna e o total.
+
+Uso:
+    python benchmarks/bench_memoria_conversor.py --linhas 200000
+"""
+import argparse
+import io
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gerador.constants import COLUNAS_OBRIGATORIAS  # noqa: E402
+from gerador.schema_csv import TIPOS_COLUNAS, opcoes_leitura_conversor  # noqa: E402
+
+
+def criar_extrato(linhas, semente=0):
+    """Extrato sintético com valores repetitivos como os do Netwin"""
+    rng = np.random.default_rng(semente)
+    colunas = {}
+    for coluna in COLUNAS_OBRIGATORIAS:
+        if TIPOS_COLUNAS.get(coluna) == 'category':
+            valores = np.array([f'{coluna}_{i}' for i in range(20)])
+            colunas[coluna] = valores[rng.integers(0, 20, linhas)]
+        else:
+            colunas[coluna] = rng.integers(0, 10_000_000, linhas).astype(str)
+
+    texto = io.StringIO()
+    pd.DataFrame(colunas).to_csv(texto, sep='|', index=False)
+    return texto.getvalue().encode('latin-1')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--linhas', type=int, default=200_000)
+    parser.add_argument('--colunas', action='store_true', help='Mostra o uso de memória por coluna')
+    args = parser.parse_args()
+
+    dados = criar_extrato(args.linhas)
+    leitura = dict(encoding='latin-1', sep='|', low_memory=False)
+
+    atual = pd.read_csv(io.BytesIO(dados), **leitura)
+    schema = pd.read_csv(io.BytesIO(dados), **leitura, **opcoes_leitura_conversor())
+
+    memoria_atual = atual.memory_usage(deep=True, index=False)
+    memoria_schema = schema.memory_usage(deep=True, index=False)
+
+    if args.colunas:
+        print(f"{'coluna':<28} {'atual':>10} {'schema':>10}")
+        for coluna in atual.columns:
+            print(f"{coluna:<28} {memoria_atual[coluna] / 2**20:>8.1f}MB {memoria_schema[coluna] / 2**20:>8.1f}MB")
+
+    total_atual = memoria_atual.sum() / 2**20
+    total_schema = memoria_schema.sum() / 2**20
+    print(f"{args.linhas:,} linhas: atual {total_atual:.1f}MB, schema {total_schema:.1f}MB "
+          f"({total_atual / total_schema:.1f}x menor)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+"""
+Micro-benchmark dos motores de geração de XML do GeradorXmlLote:
+ElementTree ('etree') contra o template pré-compilado ('template').
+
+Mede apenas a montagem dos documentos (as colunas são preparadas antes)
+e reporta documentos/segundo.
+
+Uso:
+    python benchmarks/bench_motores_xml.py --linhas 50000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_gerar_xml import criar_df  # noqa: E402
+from gerador.services.gerar_xml_lote import GeradorXmlLote  # noqa: E402
+from gerador.services.template_xml import TemplateXmlEdificio  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--linhas', type=int, default=50_000)
+    args = parser.parse_args()
+
+    gerador = GeradorXmlLote(criar_df(args.linhas), False)
+    colunas = gerador.preparar_colunas()
+    nomes = list(colunas)
+    linhas = [dict(zip(nomes, valores)) for valores in zip(*colunas.values())]
+
+    motores = {
+        'etree': gerador._montar_edificio,
+        'template': TemplateXmlEdificio(gerador.valores_padrao, gerador.data).renderizar,
+    }
+
+    print(f"{'motor':>10} {'docs/s':>12}")
+    for nome, montar in motores.items():
+        inicio = time.perf_counter()
+        for campos in linhas:
+            montar(campos)
+        tempo = time.perf_counter() - inicio
+        print(f"{nome:>10} {len(linhas) / tempo:>12,.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -15,3 +15,49 @@ class Config:
 
     # Cria a pasta se não existir
     os.makedirs(DOWNLOAD_FOLDER, exist_ok=True)
+
+    # Geração de XML em paralelo (processos)
+    XML_WORKERS = os.cpu_count() or 1
+    XML_TAMANHO_FATIA = 5000  # Linhas por tarefa enviada a cada processo
+    XML_MIN_LINHAS_PARALELO = 20000  # Abaixo disso usa o caminho serial
+    XML_MOTOR = 'etree'  # 'etree' (ElementTree) ou 'template' (layout pré-compilado)
+    XML_PROGRESSO_LINHAS = 1000  # Intervalo, em linhas, do progresso enviado à página
+
+    # Compressão do ZIP de XMLs: 'padrao', 'stored', 'rapida' ou 'maxima'
+    ZIP_COMPRESSAO = 'padrao'
+    ZIP_THREADS = os.cpu_count() or 1
+    ZIP_MIN_LINHAS_PARALELO = 20000  # Abaixo disso comprime em uma thread só
+
+    # Regeneração incremental (opcional): reaproveita o XML das linhas que não mudaram
+    XML_INCREMENTAL = False
+    XML_INCREMENTAL_IDADE_MAXIMA = 7 * 24 * 3600  # Segundos
+
+    # Detecção de encoding e delimitador dos CSVs enviados
+    CSV_TAMANHO_AMOSTRA = 64 * 1024  # Bytes do início do arquivo analisados
+    CSV_CONFIANCA_MINIMA = 0.5  # Abaixo disso o chardet não é aceito
+
+    # Conversor de arquivos grandes
+    CONVERSOR_TAMANHO_CHUNK = 50000  # Linhas do primeiro chunk (os seguintes seguem o orçamento)
+    CONVERSOR_CHUNK_MINIMO = 5000
+    CONVERSOR_CHUNK_MAXIMO = 500000
+    CONVERSOR_MEMORIA_MAXIMA = 1024 * 1024 * 1024  # Orçamento de memória do processo (1GB)
+    CONVERSOR_WORKERS = os.cpu_count() or 1  # Processos convertendo chunks (1 = serial)
+    CONVERSOR_INICIO_PROCESSOS = 'forkserver'  # Início dos workers: sem fork do servidor com threads
+    CONVERSOR_COLUNAS_DESCARTADAS = []  # Colunas do extrato que não são lidas nem gravadas
+    CONVERSOR_SAIDA_GZIP = False  # Grava o resultado como .csv.gz
+    CONVERSOR_GZIP_NIVEL = 6
+
+    # Jobs de conversão em segundo plano
+    JOBS_WORKERS = 2  # Conversões executadas ao mesmo tempo
+    JOBS_FILA_MAXIMA = 10  # Conversões aguardando; acima disso o upload é recusado
+    JOBS_TTL = 24 * 3600  # Segundos que estado e resultado de um job ficam no SQLite
+    JOBS_INTERVALO_GRAVACAO = 1.0  # Intervalo mínimo entre gravações do progresso de um job
+
+    # Progresso dos jobs (SSE)
+    PROGRESSO_BUFFER_EVENTOS = 50  # Últimos eventos guardados por job
+    PROGRESSO_RETENCAO = 3600  # Segundos que o progresso de um job encerrado fica disponível
+    PROGRESSO_EVENTOS_POR_SEGUNDO = 4  # Máximo enviado a cada assinante; o excesso é agrupado
+
+    # Limpeza da pasta de downloads e cache de resultados
+    IDADE_MAXIMA_DOWNLOADS = 3600  # Segundos
+    CACHE_TAMANHO_MAXIMO = 2 * 1024 * 1024 * 1024  # 2GB de arquivos em cache
@@ -1,4 +1,6 @@
-import threading, queue
+
+# Versão da geração dos arquivos; faz parte da chave do cache de resultados
+VERSAO_GERADOR = '0.1.0'
 
 # Dicionário de mapeamento de códigos de complemento
 CODIGOS_COMPLEMENTO = {
@@ -37,21 +39,3 @@ COLUNAS_OBRIGATORIAS = [
 LOG_COMPLEMENTOS = ""
 ERRO_COMPLEMENTO3 = False
 ERRO_COMPLEMENTO2 = False
-
-# Sistema de mensagens para SSE
-MESSAGE_QUEUE =  queue.Queue()
-
-# Dicionário global para armazenar resultados (em vez de session)
-PROCESSING_RESULTS  = {}
-RESULTS_LOCK = threading.Lock()
-
-PROGRESS_DATA  = {
-    'message': '',
-    'progress': 0,
-    'current': 0,
-    'total': 0,
-    'filename': '',
-    'status': 'waiting'
-}
-
-PROGRESS_LOCK = threading.Lock()
\ No newline at end of file
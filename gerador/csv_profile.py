@@ -0,0 +1,115 @@
+import pandas as pd
+from gerador.formato_csv import detectar_formato, encodings_alternativos
+
+COLUNAS_COMPLEMENTO = ['COMPLEMENTO', 'COMPLEMENTO2', 'COMPLEMENTO3']
+
+
+class CsvProfile:
+    """
+    Perfil de um CSV enviado, montado em uma única leitura no upload.
+
+    Guarda o encoding, o delimitador e o DataFrame já lidos, além das
+    estatísticas de colunas vazias e de complementos, para que o
+    CSVValidator e o processar_csv não precisem reler nem reescanear o
+    arquivo.
+    """
+
+    def __init__(self, caminho, encoding, delimitador, df):
+        self.caminho = caminho
+        self.encoding = encoding
+        self.delimitador = delimitador
+        self.df = df
+
+        # Nomes normalizados (maiúsculo, sem espaços) -> nome original
+        self.colunas = {col.upper().strip(): col for col in df.columns}
+
+        self._preenchidas = {}
+        self._estatisticas_complementos = None
+
+    @classmethod
+    def carregar(cls, caminho, formato=None):
+        """
+        Lê o CSV uma vez, com o encoding e o delimitador detectados em uma
+        amostra do início do arquivo (ou os do FormatoCsv informado). Se o
+        restante do arquivo não decodificar com esse encoding, tenta o
+        cp1252 e o latin-1.
+        """
+        formato = formato or detectar_formato(caminho)
+        for encoding in encodings_alternativos(formato.encoding):
+            try:
+                df = pd.read_csv(caminho, delimiter=formato.delimitador, encoding=encoding)
+                break
+            except UnicodeDecodeError as e:
+                erro = e
+            except (pd.errors.ParserError, pd.errors.EmptyDataError) as e:
+                raise ValueError(f'Não foi possível ler o arquivo: {e}')
+        else:
+            raise ValueError(f'Não foi possível ler o arquivo: {erro}')
+        return cls(caminho, encoding, formato.delimitador, df)
+
+    def coluna(self, nome):
+        """Retorna o nome real da coluna a partir do nome normalizado (ou None)"""
+        return self.colunas.get(nome.upper().strip())
+
+    def preenchidas(self, nome):
+        """Máscara das células preenchidas (não nulas e não só espaços) da coluna"""
+        coluna = self.coluna(nome)
+        if coluna is None:
+            return None
+
+        if coluna not in self._preenchidas:
+            serie = self.df[coluna]
+            self._preenchidas[coluna] = serie.notna() & serie.astype(str).str.strip().ne('')
+        return self._preenchidas[coluna]
+
+    def coluna_vazia(self, nome):
+        """Indica se a coluna não existe ou não tem nenhuma célula preenchida"""
+        mascara = self.preenchidas(nome)
+        return mascara is None or not mascara.any()
+
+    @property
+    def colunas_vazias(self):
+        """Dicionário coluna -> totalmente vazia"""
+        return {coluna: self.coluna_vazia(coluna) for coluna in self.df.columns}
+
+    def estatisticas_complementos(self):
+        """
+        Conta os registros com 1, 2 e 3 complementos e encontra o primeiro
+        erro de preenchimento (na ordem das linhas)
+        """
+        if self._estatisticas_complementos is not None:
+            return self._estatisticas_complementos
+
+        estatisticas = {
+            'coluna_faltante': None,
+            'erro': None,
+            'registros_1_comp': 0,
+            'registros_2_comp': 0,
+            'registros_3_comp': 0,
+        }
+
+        for coluna in COLUNAS_COMPLEMENTO:
+            if self.coluna(coluna) is None:
+                estatisticas['coluna_faltante'] = coluna
+                self._estatisticas_complementos = estatisticas
+                return estatisticas
+
+        comp1, comp2, comp3 = (self.preenchidas(coluna) for coluna in COLUNAS_COMPLEMENTO)
+
+        sem_comp1 = ~comp1
+        sem_comp2_com_comp3 = comp1 & ~comp2 & comp3
+        com_erro = (sem_comp1 | sem_comp2_com_comp3).to_numpy()
+
+        if com_erro.any():
+            primeira = com_erro.argmax()
+            if sem_comp1.iloc[primeira]:
+                estatisticas['erro'] = "COMPLEMENTO deve estar preenchido"
+            else:
+                estatisticas['erro'] = "Para gerar XML com três complementos a coluna COMPLEMENTO2 deve ser preenchida"
+
+        estatisticas['registros_1_comp'] = int((comp1 & ~comp2 & ~comp3).sum())
+        estatisticas['registros_2_comp'] = int((comp1 & comp2 & ~comp3).sum())
+        estatisticas['registros_3_comp'] = int((comp1 & comp2 & comp3).sum())
+
+        self._estatisticas_complementos = estatisticas
+        return estatisticas
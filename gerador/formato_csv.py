@@ -0,0 +1,163 @@
+import codecs, csv, gzip, os, zipfile
+from collections import namedtuple
+import chardet
+from gerador.config import Config
+
+FormatoCsv = namedtuple('FormatoCsv', ['encoding', 'delimitador', 'confianca'])
+
+# Alternativas quando o arquivo não decodifica com o encoding da amostra
+# (amostra só ASCII ou UTF-8 válido só até ali); o latin-1 nunca falha
+ENCODINGS_ALTERNATIVOS = ('cp1252', 'latin-1')
+
+
+def compressao_arquivo(caminho):
+    """'gzip' para .gz, 'zip' para .zip, None para arquivos sem compressão"""
+    nome = caminho.lower()
+    if nome.endswith('.gz'):
+        return 'gzip'
+    if nome.endswith('.zip'):
+        return 'zip'
+    return None
+
+
+def _membro_csv(arquivo_zip):
+    """Entrada do ZIP com o CSV: a primeira .csv, ou a única entrada"""
+    entradas = [info for info in arquivo_zip.infolist() if not info.is_dir()]
+    csvs = [info for info in entradas if info.filename.lower().endswith('.csv')]
+    if csvs:
+        return csvs[0]
+    if len(entradas) == 1:
+        return entradas[0]
+    raise ValueError('O arquivo ZIP não contém um CSV.')
+
+
+def abrir_csv_binario(caminho):
+    """
+    Abre o CSV para leitura binária, descompactando .gz e .zip em fluxo
+    (sem extrair o arquivo inteiro)
+    """
+    compressao = compressao_arquivo(caminho)
+    if compressao == 'gzip':
+        return gzip.open(caminho, 'rb')
+    if compressao == 'zip':
+        try:
+            with zipfile.ZipFile(caminho) as arquivo_zip:
+                # O membro continua legível depois de fechar o ZipFile
+                return arquivo_zip.open(_membro_csv(arquivo_zip))
+        except zipfile.BadZipFile:
+            raise ValueError('O arquivo ZIP está corrompido.')
+    return open(caminho, 'rb')
+
+
+def tamanho_descomprimido(caminho, limite=None):
+    """
+    Tamanho do CSV descompactado: exato para arquivos sem compressão e .zip.
+
+    O .gz é descompactado em fluxo para contar os bytes: o rodapé do gzip
+    só guarda o tamanho módulo 4GB, e do último membro apenas. Com 'limite'
+    a contagem para assim que o passar (o retorno é então só um mínimo).
+    """
+    compressao = compressao_arquivo(caminho)
+    if compressao == 'zip':
+        with zipfile.ZipFile(caminho) as arquivo_zip:
+            return _membro_csv(arquivo_zip).file_size
+    if compressao == 'gzip':
+        tamanho = 0
+        with gzip.open(caminho, 'rb') as f:
+            for bloco in iter(lambda: f.read(1024 * 1024), b''):
+                tamanho += len(bloco)
+                if limite is not None and tamanho > limite:
+                    break
+        return tamanho
+    return os.path.getsize(caminho)
+
+
+def _ler_amostra(caminho, tamanho):
+    """Primeiros 'tamanho' bytes do CSV, cortados na última quebra de linha"""
+    try:
+        with abrir_csv_binario(caminho) as f:
+            amostra = f.read(tamanho)
+            if f.read(1) and b'\n' in amostra:
+                amostra = amostra[:amostra.rindex(b'\n') + 1]
+    except (gzip.BadGzipFile, EOFError, zipfile.BadZipFile):
+        raise ValueError('O arquivo compactado está corrompido.')
+    return amostra
+
+
+def detectar_encoding(amostra, encoding_ascii='utf-8'):
+    """
+    Encoding da amostra: (encoding, confiança).
+
+    Amostra só ASCII usa 'encoding_ascii' (não há como distinguir); UTF-8
+    válido é aceito direto; nos demais casos decide o chardet. Como só a
+    amostra é verificada, quem lê o arquivo inteiro deve tentar também os
+    encodings_alternativos.
+    """
+    if amostra.isascii():
+        return encoding_ascii, 1.0
+
+    try:
+        amostra.decode('utf-8')
+        return ('utf-8-sig' if amostra.startswith(codecs.BOM_UTF8) else 'utf-8'), 1.0
+    except UnicodeDecodeError:
+        pass
+
+    resultado = chardet.detect(amostra)
+    encoding, confianca = resultado['encoding'], resultado['confidence'] or 0.0
+    if encoding is None or confianca < Config.CSV_CONFIANCA_MINIMA:
+        raise ValueError(f'Não foi possível identificar o encoding do arquivo (confiança de {confianca:.0%}).')
+
+    encoding = codecs.lookup(encoding).name
+    if encoding == 'iso8859-1':
+        encoding = 'latin-1'
+        # Exportações do Windows: o chardet indica latin-1, mas bytes de 0x80
+        # a 0x9F são caracteres do cp1252 (aspas curvas, travessão...)
+        if any(0x80 <= byte <= 0x9F for byte in set(amostra)):
+            try:
+                amostra.decode('cp1252')
+                encoding = 'cp1252'
+            except UnicodeDecodeError:
+                pass
+
+    try:
+        amostra.decode(encoding)
+    except UnicodeDecodeError:
+        raise ValueError(f'O arquivo não pôde ser lido como {encoding}.')
+    return encoding, confianca
+
+
+def encodings_alternativos(encoding):
+    """Encodings a tentar na leitura completa: o detectado e as alternativas"""
+    encodings = [encoding]
+    for alternativo in ENCODINGS_ALTERNATIVOS:
+        if codecs.lookup(alternativo).name not in {codecs.lookup(e).name for e in encodings}:
+            encodings.append(alternativo)
+    return encodings
+
+
+def detectar_delimitador(texto, delimitadores):
+    """Delimitador pelo csv.Sniffer; se ele falhar, o mais frequente no cabeçalho"""
+    try:
+        return csv.Sniffer().sniff(texto, delimiters=delimitadores).delimiter
+    except csv.Error:
+        cabecalho = texto.split('\n', 1)[0]
+        contagens = {delimitador: cabecalho.count(delimitador) for delimitador in delimitadores}
+        delimitador = max(contagens, key=contagens.get)
+        if not contagens[delimitador]:
+            raise ValueError('Não foi possível identificar o delimitador do arquivo.')
+        return delimitador
+
+
+def detectar_formato(caminho, delimitadores=';,', encoding_ascii='utf-8', tamanho_amostra=None):
+    """
+    Detecta encoding e delimitador do CSV a partir de uma amostra do início
+    do arquivo (Config.CSV_TAMANHO_AMOSTRA). Feito uma vez por upload; o
+    FormatoCsv resultante é repassado a todos que leem o arquivo.
+    """
+    amostra = _ler_amostra(caminho, tamanho_amostra or Config.CSV_TAMANHO_AMOSTRA)
+    if not amostra.strip():
+        raise ValueError('O arquivo está vazio.')
+
+    encoding, confianca = detectar_encoding(amostra, encoding_ascii)
+    delimitador = detectar_delimitador(amostra.decode(encoding), delimitadores)
+    return FormatoCsv(encoding, delimitador, confianca)
@@ -1,9 +1,19 @@
-import os, queue, threading
-from flask import Blueprint, request, flash, redirect, render_template, send_file, url_for, json, jsonify, Response, session
+import os, uuid
+from flask import Blueprint, request, flash, redirect, render_template, send_file, url_for, json, jsonify, Response, session, stream_with_context
 from werkzeug.utils import secure_filename
 from gerador.config import Config
-from gerador.constants import ERRO_COMPLEMENTO2, ERRO_COMPLEMENTO3, LOG_COMPLEMENTOS, MESSAGE_QUEUE, RESULTS_LOCK, PROCESSING_RESULTS
-from gerador.services.process_csv import processar_csv
+from gerador.csv_profile import CsvProfile
+from gerador.formato_csv import tamanho_descomprimido
+from gerador.schema_csv import detectar_formato_conversor
+from gerador.constants import ERRO_COMPLEMENTO2, ERRO_COMPLEMENTO3, LOG_COMPLEMENTOS
+from gerador.services.process_csv import processar_csv, processar_csv_streaming
+from gerador.services.gerar_xml_lote import GeradorXmlLote
+from gerador.services.cache_resultados import CacheResultados
+from gerador.services.cache_roteiros import CACHE_ROTEIROS
+from gerador.services.escritor_zip import COMPRESSOES
+from gerador.services.progresso_jobs import PROGRESSO_JOBS
+from gerador.services.armazem_jobs import armazem_jobs
+from gerador.services.agendador_jobs import AGENDADOR_JOBS
 from gerador.services.processar_conversor_csv import processar_conversor_csv
 from gerador.services.processar_conversor_csv_grande import processar_conversor_csv_grande
 from gerador.utils import update_progress
@@ -24,28 +34,146 @@ def index():
             return redirect(request.url)
         
         if file and file.filename.endswith('.csv'):
+            # ID do processamento no nome do upload: envios simultâneos do
+            # mesmo arquivo não se sobrescrevem
+            process_id = str(uuid.uuid4())
             filename = secure_filename(file.filename)
-            filepath = os.path.join(Config.UPLOAD_FOLDER, filename)
+            filepath = os.path.join(Config.UPLOAD_FOLDER, f"{process_id}_{filename}")
             file.save(filepath)
             
-            # USAR O MÉTODO 'validar'
-            validar_csv = CSVValidator()
-            sucesso, mensagem = validar_csv.validar(filepath)
+            download_direto = bool(request.form.get('download_direto'))
+            compressao = request.form.get('compressao') or None
+            if compressao not in (None,) + tuple(COMPRESSOES):
+                compressao = None
             
-            if sucesso:
-                flash(mensagem, 'success')
-                zip_filename, total_registros, log = processar_csv(filepath)
-                return render_template('resultado.html', 
+            # Upload idêntico já processado: devolve o ZIP existente
+            cache = CacheResultados()
+            chave_cache = cache.chave(filepath, 'xml', compressao=compressao or Config.ZIP_COMPRESSAO)
+            em_cache = None if download_direto else cache.obter(chave_cache)
+            if em_cache:
+                os.remove(filepath)
+                flash('✅ Este arquivo já foi processado: resultado reaproveitado', 'success')
+                return render_template('resultado.html',
                                       complementos=LOG_COMPLEMENTOS,
-                                      log=log, 
-                                      total_registros=total_registros,
-                                      zip_filename=zip_filename)
-            else:
-                flash(mensagem, 'danger')
+                                      log=em_cache['log'],
+                                      total_registros=em_cache['total_registros'],
+                                      zip_filename=em_cache['filename'])
+            
+            motor = request.form.get('motor') or None
+            if motor not in (None,) + GeradorXmlLote.MOTORES:
+                motor = None
+            
+            # Download direto: o ZIP é enviado enquanto os XMLs são gerados
+            if download_direto:
+                # Lê o arquivo uma única vez; validador e gerador usam o mesmo perfil
+                try:
+                    perfil = CsvProfile.carregar(filepath)
+                except ValueError as e:
+                    os.remove(filepath)
+                    flash(f'❌ {e}', 'danger')
+                    return render_template('index.html')
+                
+                sucesso, mensagem = CSVValidator().validar(filepath, perfil=perfil)
+                if not sucesso:
+                    os.remove(filepath)
+                    flash(mensagem, 'danger')
+                    return render_template('index.html')
+                
+                try:
+                    zip_filename, corpo = processar_csv_streaming(filepath, perfil=perfil, motor=motor, compressao=compressao)
+                except Exception:
+                    os.remove(filepath)
+                    raise
+                resposta = Response(
+                    stream_with_context(corpo),
+                    mimetype='application/zip',
+                    headers={'Content-Disposition': f'attachment; filename="{zip_filename}"'}
+                )
+                # O upload é removido quando o envio termina (ou o cliente desiste)
+                resposta.call_on_close(lambda: os.path.exists(filepath) and os.remove(filepath))
+                return resposta
+            
+            # Leitura, validação e geração rodam em segundo plano, como no conversor
+            canal = PROGRESSO_JOBS.criar(process_id)
+            canal.publicar(message='🕒 Iniciando geração dos XMLs...', progress=0, current=0, total=0,
+                           status='processing', resultado=url_for('main.xml_result', job_id=process_id),
+                           voltar=url_for('main.index'))
+            
+            posicao = AGENDADOR_JOBS.enviar(process_id, gerar_xml_job, process_id, filepath, motor, compressao, cache, chave_cache)
+            if posicao is None:
+                PROGRESSO_JOBS.remover(process_id)
+                os.remove(filepath)
+                flash('⚠️ O servidor está com muitos processamentos em andamento. Tente novamente em alguns minutos.', 'warning')
                 return render_template('index.html')
+            if posicao:
+                flash(f'⏳ Arquivo na fila de processamento: posição {posicao}', 'info')
+            
+            return redirect(url_for('main.progress_page', job=process_id))
     
     return render_template('index.html')
 
+def gerar_xml_job(process_id, filepath, motor, compressao, cache, chave_cache):
+    """Executado por uma das threads do agendador, no contexto do job"""
+    try:
+        update_progress('📂 Lendo o arquivo CSV...', progress=1)
+        try:
+            perfil = CsvProfile.carregar(filepath)
+        except ValueError as e:
+            raise ValueError(f'❌ {e}')
+        
+        sucesso, mensagem = CSVValidator().validar(filepath, perfil=perfil)
+        if not sucesso:
+            raise ValueError(mensagem)
+        update_progress(mensagem, progress=5, current=0, total=len(perfil.df))
+        
+        zip_filename, total_registros, log = processar_csv(filepath, perfil=perfil, motor=motor, compressao=compressao)
+        cache.registrar(chave_cache, zip_filename, total_registros=total_registros, log=log)
+        
+        # Resultado no armazém de jobs, visível para todos os processos
+        armazem_jobs().gravar_resultado(process_id, {
+            'filename': zip_filename,
+            'total_registros': total_registros,
+            'log': log,
+            'mensagem': mensagem,
+            'status': 'success'
+        })
+        
+        update_progress('✅ XMLs gerados com sucesso!', progress=100, status='completed')
+    
+    except Exception as e:
+        print(f'❌ Erro na geração dos XMLs: {str(e)}')
+        # Erro no armazém de jobs, visível para todos os processos
+        armazem_jobs().gravar_resultado(process_id, {
+            'error': str(e),
+            'status': 'error'
+        })
+        update_progress(str(e) if isinstance(e, ValueError) else f'❌ Erro na geração dos XMLs: {str(e)}', status='error')
+    finally:
+        # Limpar o upload, que é só deste job
+        if os.path.exists(filepath):
+            os.remove(filepath)
+
+@routes_bP.route('/xml-result/<job_id>')
+def xml_result(job_id):
+    """Página de resultado da geração de XMLs feita em segundo plano"""
+    # O resultado fica no armazém até expirar (Config.JOBS_TTL)
+    result = armazem_jobs().resultado(job_id)
+    
+    if not result:
+        flash('Resultado não encontrado. O processamento pode ainda estar em andamento.', 'warning')
+        return redirect(url_for('main.index'))
+    
+    if result.get('status') == 'success':
+        flash(result['mensagem'], 'success')
+        return render_template('resultado.html',
+                              complementos=LOG_COMPLEMENTOS,
+                              log=result['log'],
+                              total_registros=result['total_registros'],
+                              zip_filename=result['filename'])
+    
+    flash(result.get('error', 'Erro desconhecido'), 'danger')
+    return redirect(url_for('main.index'))
+
 @routes_bP.route('/download/<filename>')
 def download_file(filename):
     try:
@@ -94,34 +222,40 @@ def download_modelo_csv():
         mimetype='text/csv'
     )
 
-@routes_bP.route('/progress')
-def progress():
-    """Rota para SSE do progresso"""
+@routes_bP.route('/progress', defaults={'job_id': None})
+@routes_bP.route('/progress/<job_id>')
+def progress(job_id):
+    """
+    Rota para SSE do progresso de um job (sem id, o job da sessão). Cada
+    evento leva a sequência em 'id:'; na reconexão o navegador envia o
+    Last-Event-ID (ou a página, o parâmetro 'ultimo_evento') e o envio
+    continua do ponto em que parou.
+    """
+    job_id = job_id or session.get('current_process_id')
+    canal = PROGRESSO_JOBS.obter(job_id)
+    try:
+        ultimo_evento = int(request.headers.get('Last-Event-ID') or request.args.get('ultimo_evento') or 0)
+    except ValueError:
+        ultimo_evento = 0
+    
     def generate():
         try:
+            if canal is None:
+                yield f"data: {json.dumps({'message': 'Processamento não encontrado', 'status': 'error'})}\n\n"
+                return
+            
             # Envia um ping inicial para manter a conexão
             yield f"data: {json.dumps({'message': 'Conectado...', 'status': 'connected'})}\n\n"
             
-            last_data = None
-            while True:
-                try:
-                    # Pega a mensagem mais recente da fila (com timeout)
-                    data = MESSAGE_QUEUE.get(timeout=30)
-                    
-                    # Só envia se os dados mudaram
-                    if data != last_data:
-                        yield f"data: {json.dumps(data)}\n\n"
-                        last_data = data
-                        
-                        # Se o processamento terminou, encerra a conexão
-                        if data.get('status') in ['completed', 'error']:
-                            break
-                    
-                    MESSAGE_QUEUE.task_done()
-                    
-                except queue.Empty:
+            # Atualizações agrupadas, no máximo Config.PROGRESSO_EVENTOS_POR_SEGUNDO
+            for evento in canal.acompanhar(ultimo_evento):
+                if evento is None:
                     # Timeout - envia ping para manter conexão
                     yield f"data: {json.dumps({'message': 'Aguardando...', 'status': 'waiting'})}\n\n"
+                    continue
+                
+                sequencia, data = evento
+                yield f"id: {sequencia}\ndata: {json.dumps(data)}\n\n"
                     
         except GeneratorExit:
             # Cliente desconectou
@@ -136,11 +270,17 @@ def progress():
         headers={
             'Cache-Control': 'no-cache',
             'Connection': 'keep-alive',
+            'X-Accel-Buffering': 'no',
             'Access-Control-Allow-Origin': '*',
-            'Access-Control-Allow-Headers': 'Cache-Control'
+            'Access-Control-Allow-Headers': 'Cache-Control, Last-Event-ID'
         }
     )
 
+@routes_bP.route('/monitoramento')
+def monitoramento():
+    """Estatísticas dos caches do processo (acertos, falhas e tempo de carga) e da fila de jobs"""
+    return jsonify({'roteiros': CACHE_ROTEIROS.estatisticas(), 'jobs': AGENDADOR_JOBS.estatisticas()})
+
 @routes_bP.route('/validar-csv', methods=['POST'])
 def validar_csv():
     print("\n🟢 Iniciando rota /validar-csv", flush=True)
@@ -154,7 +294,7 @@ def validar_csv():
 
     # Validação do arquivo
     file_validator = FileValidator()
-    file_validation_result = file_validator.validate_upload(file, allowed_extensions={'csv'})
+    file_validation_result = file_validator.validate_upload(file, allowed_extensions={'csv', 'csv.gz', 'zip'})
     
     if not file_validation_result['is_valid']:
         return jsonify({'valido': False, 'erro': file_validation_result['errors'][0]})
@@ -210,7 +350,7 @@ def conversor_csv():
     if request.method == 'POST':
         # NOVA VALIDAÇÃO: Usar FileValidator
         file_validator = FileValidator()
-        validation_result = file_validator.validate_upload(request.files.get('file'), allowed_extensions={'csv'})
+        validation_result = file_validator.validate_upload(request.files.get('file'), allowed_extensions={'csv', 'csv.gz', 'zip'})
         
         if not validation_result['is_valid']:
             for error in validation_result['errors']:
@@ -218,48 +358,53 @@ def conversor_csv():
             return redirect(request.url)
         
         file = request.files['file']
+        saida_gzip = request.form.get('saida_gzip') == 'on'
         filename = secure_filename(file.filename)
-        filepath = os.path.join(Config.UPLOAD_FOLDER, filename)
-        file.save(filepath)
         
-        # Reset progress data
-        update_progress('🕒 Iniciando processamento...', progress=0, current=0, total=0, status='processing')
+        # Gerar um ID único para este processamento, com seu próprio canal de progresso;
+        # o upload é salvo com o ID no nome, sem colidir com envios do mesmo arquivo
+        process_id = str(uuid.uuid4())
+        filepath = os.path.join(Config.UPLOAD_FOLDER, f"{process_id}_{filename}")
+        file.save(filepath)
+        canal = PROGRESSO_JOBS.criar(process_id)
+        canal.publicar(message='🕒 Iniciando processamento...', progress=0, current=0, total=0, status='processing')
         
         try:
-            # Verificar tamanho do arquivo
-            file_size = os.path.getsize(filepath) / (1024 * 1024)
+            # Tamanho do CSV descompactado: é ele que decide o caminho de
+            # processamento (basta saber se passa de 100 MB; .gz é lido só até aí)
+            file_size = tamanho_descomprimido(filepath, limite=100 * 1024 * 1024) / (1024 * 1024)
             
-            # Limpar a fila de mensagens antigas
-            while not MESSAGE_QUEUE.empty():
-                try:
-                    MESSAGE_QUEUE.get_nowait()
-                    MESSAGE_QUEUE.task_done()
-                except queue.Empty:
-                    break
+            cache = CacheResultados()
+            chave_cache = cache.chave(filepath, 'conversor', gzip=saida_gzip)
             
-            # Gerar um ID único para este processamento
-            import uuid
-            process_id = str(uuid.uuid4())
-            
-            # Iniciar processamento em thread separada
+            # Executado por uma das threads do agendador, no contexto do job
             def processar_arquivo(process_id, filepath, file_size):
                 try:
                     update_progress(f'📊 Arquivo validado: {file_size:.2f} MB', progress=5)
                     
-                    if file_size > 100:
-                        update_progress('🔧 Usando processamento otimizado para arquivo grande...', progress=10)
-                        zip_filename, total_registros = processar_conversor_csv_grande(filepath)
+                    em_cache = cache.obter(chave_cache)
+                    if em_cache:
+                        update_progress('♻️ Este arquivo já foi convertido: resultado reaproveitado', progress=90)
+                        zip_filename, total_registros = em_cache['filename'], em_cache['total_registros']
                     else:
-                        update_progress('🔧 Processando arquivo...', progress=10)
-                        zip_filename, total_registros = processar_conversor_csv(filepath)
+                        # Encoding e delimitador detectados uma vez e repassados ao leitor
+                        formato = detectar_formato_conversor(filepath)
+                        update_progress(f'🔎 Encoding {formato.encoding}, delimitador "{formato.delimitador}"', progress=8)
+                        if file_size > 100:
+                            # Registra o resultado no cache ele mesmo, ainda com a trava da chave
+                            update_progress('🔧 Usando processamento otimizado para arquivo grande...', progress=10)
+                            zip_filename, total_registros = processar_conversor_csv_grande(filepath, formato, chave=chave_cache, saida_gzip=saida_gzip)
+                        else:
+                            update_progress('🔧 Processando arquivo...', progress=10)
+                            zip_filename, total_registros = processar_conversor_csv(filepath, formato, saida_gzip=saida_gzip)
+                            cache.registrar(chave_cache, zip_filename, total_registros=total_registros)
                     
-                    # Armazenar resultado no dicionário global
-                    with RESULTS_LOCK:
-                        PROCESSING_RESULTS[process_id] = {
-                            'filename': zip_filename,
-                            'total_registros': total_registros,
-                            'status': 'success'
-                        }
+                    # Resultado no armazém de jobs, visível para todos os processos
+                    armazem_jobs().gravar_resultado(process_id, {
+                        'filename': zip_filename,
+                        'total_registros': total_registros,
+                        'status': 'success'
+                    })
                     
                     update_progress('✅ Processamento concluído com sucesso!', progress=100, status='completed')
                     
@@ -267,29 +412,35 @@ def conversor_csv():
                     error_msg = f'❌ Erro no processamento: {str(e)}'
                     print(error_msg)
                     
-                    # Armazenar erro no dicionário global
-                    with RESULTS_LOCK:
-                        PROCESSING_RESULTS[process_id] = {
-                            'error': str(e),
-                            'status': 'error'
-                        }
+                    # Erro no armazém de jobs, visível para todos os processos
+                    armazem_jobs().gravar_resultado(process_id, {
+                        'error': str(e),
+                        'status': 'error'
+                    })
                     
                     update_progress(error_msg, status='error')
                 finally:
                     # Limpar arquivo temporário
                     if os.path.exists(filepath):
                         os.remove(filepath)
-            
-            thread = threading.Thread(target=processar_arquivo, args=(process_id, filepath, file_size))
-            thread.daemon = True
-            thread.start()
+        
+            # Pool fixo de conversões; com a fila cheia o upload é recusado
+            posicao = AGENDADOR_JOBS.enviar(process_id, processar_arquivo, process_id, filepath, file_size)
+            if posicao is None:
+                PROGRESSO_JOBS.remover(process_id)
+                os.remove(filepath)
+                flash('⚠️ O servidor está com muitas conversões em andamento. Tente novamente em alguns minutos.', 'warning')
+                return redirect(request.url)
+            if posicao:
+                flash(f'⏳ Arquivo na fila de processamento: posição {posicao}', 'info')
             
             # Armazenar o process_id na session para recuperar depois
             session['current_process_id'] = process_id
             
-            return redirect(url_for('main.progress_page'))
+            return redirect(url_for('main.progress_page', job=process_id))
             
         except Exception as e:
+            PROGRESSO_JOBS.remover(process_id)
             flash(f'❌ Erro ao iniciar processamento: {str(e)}', 'danger')
             if os.path.exists(filepath):
                 os.remove(filepath)
@@ -300,7 +451,12 @@ def conversor_csv():
 @routes_bP.route('/progress-page')
 def progress_page():
     """Página que mostra o progresso"""
-    return render_template('progresso.html')
+    job_id = request.args.get('job') or session.get('current_process_id')
+    canal = PROGRESSO_JOBS.obter(job_id)
+    estado = canal.estado if canal else {}
+    return render_template('progresso.html', job_id=job_id,
+                           resultado_url=estado.get('resultado', url_for('main.conversor_result')),
+                           voltar_url=estado.get('voltar', url_for('main.conversor_csv')))
 
 @routes_bP.route('/conversor-result')
 def conversor_result():
@@ -311,17 +467,14 @@ def conversor_result():
         flash('Nenhum processamento em andamento', 'warning')
         return redirect(url_for('main.conversor_csv'))
     
-    with RESULTS_LOCK:
-        result = PROCESSING_RESULTS.get(process_id)
+    # O resultado fica no armazém até expirar (Config.JOBS_TTL)
+    result = armazem_jobs().resultado(process_id)
     
     if not result:
         flash('Resultado não encontrado. O processamento pode ainda estar em andamento.', 'warning')
         return redirect(url_for('main.conversor_csv'))
     
     if result.get('status') == 'success':
-        # Limpar o resultado após usar
-        with RESULTS_LOCK:
-            PROCESSING_RESULTS.pop(process_id, None)
         session.pop('current_process_id', None)
         
         return render_template('resultado_conversor.html', 
@@ -330,9 +483,6 @@ def conversor_result():
     
     elif result.get('status') == 'error':
         error_msg = result.get('error', 'Erro desconhecido')
-        # Limpar o resultado após usar
-        with RESULTS_LOCK:
-            PROCESSING_RESULTS.pop(process_id, None)
         session.pop('current_process_id', None)
         
         flash(f'❌ Erro na conversão: {error_msg}', 'danger')
@@ -360,7 +510,7 @@ def download_convertido(filename):
             file_path,
             as_attachment=True,
             download_name=filename,
-            mimetype='text/csv'
+            mimetype='application/gzip' if filename.endswith('.gz') else 'text/csv'
         )
     
     except Exception as e:
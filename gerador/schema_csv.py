@@ -0,0 +1,49 @@
+from gerador.config import Config
+from gerador.formato_csv import detectar_formato
+
+# Campos descritivos repetitivos (poucos valores distintos), que o
+# conversor só repassa para a saída: category guarda cada valor uma vez e as
+# linhas apenas um código inteiro. Colunas de chave ou transformadas (UF,
+# códigos, COD_LOCALIDADE/COD_LOGRADOURO do cruzamento com os roteiros...)
+# continuam com o tipo inferido: category não aceita operações de texto nem
+# valores novos, e um tipo diferente do roteiro quebraria o cruzamento.
+# Contagens também ficam inferidas (Int64 falha em células não inteiras).
+COLUNAS_CATEGORIA = [
+    'TIPO_VIABILIDADE', 'TIPO_REDE', 'TIPO_SURVEY', 'REDE_INTERNA', 'REDE_EDIF_CERT',
+    'DISP_COMERCIAL', 'ESTADO_CONTROLE',
+]
+
+TIPOS_COLUNAS = {coluna: 'category' for coluna in COLUNAS_CATEGORIA}
+
+
+class ColunasMantidas:
+    """usecols do pd.read_csv: mantém as colunas que não foram descartadas"""
+
+    def __init__(self, descartadas):
+        self.descartadas = frozenset(descartadas)
+
+    def __call__(self, coluna):
+        return coluna not in self.descartadas
+
+
+def opcoes_leitura_conversor(descartadas=None):
+    """
+    Opções do pd.read_csv para o extrato de endereços do conversor: category
+    para as colunas de COLUNAS_CATEGORIA (as demais continuam inferidas) e
+    descarte das colunas de Config.CONVERSOR_COLUNAS_DESCARTADAS
+    """
+    if descartadas is None:
+        descartadas = Config.CONVERSOR_COLUNAS_DESCARTADAS
+
+    opcoes = {'dtype': dict(TIPOS_COLUNAS)}
+    if descartadas:
+        opcoes['usecols'] = ColunasMantidas(descartadas)
+    return opcoes
+
+
+def detectar_formato_conversor(caminho):
+    """
+    Formato do extrato do conversor: normalmente separado por '|'; amostras
+    só ASCII são tratadas como latin-1, o encoding histórico do extrato
+    """
+    return detectar_formato(caminho, delimitadores='|;,', encoding_ascii='latin-1')
@@ -0,0 +1,121 @@
+import threading, time
+from collections import deque
+from gerador.config import Config
+from gerador.services.progresso_jobs import PROGRESSO_JOBS, contexto_job, job_atual
+
+
+class AgendadorJobs:
+    """
+    Executa os jobs de conversão em um número fixo de threads, com uma fila
+    de espera limitada.
+
+    Um job enviado com todas as threads ocupadas espera na fila e recebe, pelo
+    seu canal de progresso, a posição e o tempo de espera sempre que a fila
+    anda. Com a fila cheia o job é recusado, e quem enviou deve avisar o
+    usuário em vez de iniciar mais um processamento.
+    """
+
+    def __init__(self, workers=None, tamanho_fila=None, progresso=None):
+        self.workers = workers or Config.JOBS_WORKERS
+        self.tamanho_fila = Config.JOBS_FILA_MAXIMA if tamanho_fila is None else tamanho_fila
+        self.progresso = PROGRESSO_JOBS if progresso is None else progresso
+        self._fila = deque()  # (job_id, funcao, args, enviado_em)
+        self._ativos = 0
+        self._threads = []
+        self._condicao = threading.Condition()
+        self._estatisticas = {'executados': 0, 'recusados': 0, 'espera_maxima': 0.0}
+
+    def enviar(self, job_id, funcao, *args):
+        """
+        Agenda funcao(*args) para o job; retorna a posição na fila (0 quando
+        começa imediatamente) ou None se a fila estiver cheia
+        """
+        with self._condicao:
+            posicao = self._posicao(len(self._fila))
+            if posicao > self.tamanho_fila:
+                self._estatisticas['recusados'] += 1
+                return None
+
+            self._iniciar_threads()
+            self._fila.append((job_id, funcao, args, time.time()))
+            if posicao:
+                self._avisar_posicao(job_id, posicao, 0)
+            self._condicao.notify()
+            return posicao
+
+    def _posicao(self, indice):
+        """Posição de espera do item 'indice' da fila (0: há thread livre para ele)"""
+        return max(0, indice + 1 - (self.workers - self._ativos))
+
+    def _iniciar_threads(self):
+        while len(self._threads) < self.workers:
+            thread = threading.Thread(target=self._executar, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _executar(self):
+        while True:
+            with self._condicao:
+                self._condicao.wait_for(lambda: self._fila)
+                job_id, funcao, args, enviado_em = self._fila.popleft()
+                self._ativos += 1
+                espera = time.time() - enviado_em
+                self._estatisticas['espera_maxima'] = max(self._estatisticas['espera_maxima'], espera)
+                self._avisar_fila()
+
+            try:
+                with contexto_job(job_id):
+                    if espera >= 1:
+                        self._publicar(job_id, message=f'▶️ Iniciando após {espera:.0f}s na fila',
+                                       status='processing', posicao=0)
+                    funcao(*args)
+            except Exception as e:
+                print(f"❌ Erro no job {job_id}: {e}")
+            finally:
+                with self._condicao:
+                    self._ativos -= 1
+                    self._estatisticas['executados'] += 1
+
+    def _avisar_fila(self):
+        """Nova posição e tempo de espera de cada job que continua na fila"""
+        agora = time.time()
+        for indice, (job_id, _, _, enviado_em) in enumerate(self._fila):
+            posicao = self._posicao(indice)
+            if posicao:
+                self._avisar_posicao(job_id, posicao, agora - enviado_em)
+
+    def _avisar_posicao(self, job_id, posicao, espera):
+        self._publicar(
+            job_id,
+            message=f'⏳ Aguardando na fila: posição {posicao} ({espera:.0f}s de espera)',
+            status='queued',
+            posicao=posicao,
+            espera=round(espera, 1)
+        )
+
+    def _publicar(self, job_id, **campos):
+        canal = self.progresso.obter(job_id)
+        if canal is not None:
+            canal.publicar(**campos)
+
+    def cota(self, total):
+        """
+        Parte de um recurso de CPU (processos ou threads) de cada job: com
+        'workers' jobs rodando juntos, cada um usa total // workers (ao menos
+        1), e os pools dos jobs somados não passam do total configurado
+        """
+        return max(1, total // self.workers)
+
+    def estatisticas(self):
+        with self._condicao:
+            return dict(self._estatisticas, workers=self.workers, ativos=self._ativos,
+                        na_fila=len(self._fila), tamanho_fila=self.tamanho_fila)
+
+
+# Agendador único do processo
+AGENDADOR_JOBS = AgendadorJobs()
+
+
+def cota_do_job(total):
+    """Cota de 'total' para a thread atual: dividida se ela roda um job do agendador"""
+    return total if job_atual() is None else AGENDADOR_JOBS.cota(total)
@@ -0,0 +1,156 @@
+import json, os, socket, sqlite3, threading, time
+from contextlib import contextmanager
+from gerador.config import Config
+
+# Status em que o job já terminou (também usados pelo progresso_jobs)
+STATUS_FINAIS = ('completed', 'error')
+
+_ARMAZENS = {}
+_LOCK_ARMAZENS = threading.Lock()
+
+
+class ArmazemJobs:
+    """
+    Estado dos jobs em SQLite, compartilhado pelos processos do servidor:
+    o último progresso de cada job (com a sequência do evento), os
+    metadados do resultado e o processo (pid e host) que executa o job.
+    Qualquer worker responde /progress e as páginas de resultado, mesmo que
+    o job rode em outro processo.
+
+    Jobs sem atualização há mais de Config.JOBS_TTL segundos são removidos
+    pelo limpar. Use armazem_jobs() para a instância do processo, que
+    prepara o banco uma única vez.
+    """
+
+    def __init__(self, caminho=None):
+        self.caminho = caminho or os.path.join(Config.DOWNLOAD_FOLDER, '.cache', 'jobs.sqlite')
+        os.makedirs(os.path.dirname(self.caminho), exist_ok=True)
+        with self._conectar() as conexao:
+            # WAL: leitores de outros processos não bloqueiam a gravação do progresso
+            conexao.execute('PRAGMA journal_mode=WAL')
+            conexao.execute(
+                'CREATE TABLE IF NOT EXISTS jobs ('
+                ' job_id TEXT PRIMARY KEY, sequencia INTEGER NOT NULL DEFAULT 0,'
+                ' progresso TEXT, resultado TEXT, atualizado REAL NOT NULL,'
+                ' dono_pid INTEGER, dono_host TEXT)'
+            )
+            # Bancos criados antes das colunas do dono
+            colunas = {linha[1] for linha in conexao.execute('PRAGMA table_info(jobs)')}
+            for coluna, tipo in (('dono_pid', 'INTEGER'), ('dono_host', 'TEXT')):
+                if coluna not in colunas:
+                    conexao.execute(f'ALTER TABLE jobs ADD COLUMN {coluna} {tipo}')
+
+    @contextmanager
+    def _conectar(self):
+        """Conexão com commit ao final do bloco e sempre fechada"""
+        conexao = sqlite3.connect(self.caminho, timeout=30)
+        try:
+            with conexao:
+                yield conexao
+        finally:
+            conexao.close()
+
+    def gravar_progresso(self, job_id, sequencia, estado):
+        """Grava o progresso se for mais recente; o processo atual fica como dono do job"""
+        with self._conectar() as conexao:
+            conexao.execute(
+                'INSERT INTO jobs (job_id, sequencia, progresso, atualizado, dono_pid, dono_host)'
+                ' VALUES (?, ?, ?, ?, ?, ?)'
+                ' ON CONFLICT(job_id) DO UPDATE SET sequencia = excluded.sequencia,'
+                ' progresso = excluded.progresso, atualizado = excluded.atualizado,'
+                ' dono_pid = excluded.dono_pid, dono_host = excluded.dono_host'
+                ' WHERE excluded.sequencia > jobs.sequencia',
+                (job_id, sequencia, json.dumps(estado), time.time(), os.getpid(), socket.gethostname())
+            )
+
+    def progresso(self, job_id):
+        """(sequência, estado) do último progresso gravado, ou None"""
+        with self._conectar() as conexao:
+            linha = conexao.execute(
+                'SELECT sequencia, progresso FROM jobs WHERE job_id = ? AND progresso IS NOT NULL', (job_id,)
+            ).fetchone()
+        return None if linha is None else (linha[0], json.loads(linha[1]))
+
+    def gravar_resultado(self, job_id, resultado):
+        with self._conectar() as conexao:
+            conexao.execute(
+                'INSERT INTO jobs (job_id, resultado, atualizado) VALUES (?, ?, ?)'
+                ' ON CONFLICT(job_id) DO UPDATE SET resultado = excluded.resultado,'
+                ' atualizado = excluded.atualizado',
+                (job_id, json.dumps(resultado), time.time())
+            )
+
+    def resultado(self, job_id):
+        """Metadados do resultado do job, ou None se ainda não terminou"""
+        with self._conectar() as conexao:
+            linha = conexao.execute(
+                'SELECT resultado FROM jobs WHERE job_id = ? AND resultado IS NOT NULL', (job_id,)
+            ).fetchone()
+        return None if linha is None else json.loads(linha[0])
+
+    def remover(self, job_id):
+        with self._conectar() as conexao:
+            conexao.execute('DELETE FROM jobs WHERE job_id = ?', (job_id,))
+
+    def limpar(self, idade_maxima=None):
+        """Remove os jobs não atualizados há mais de 'idade_maxima' segundos"""
+        idade_maxima = idade_maxima or Config.JOBS_TTL
+        with self._conectar() as conexao:
+            conexao.execute('DELETE FROM jobs WHERE atualizado < ?', (time.time() - idade_maxima,))
+
+    def encerrar_orfaos(self):
+        """
+        Marca como 'error' os jobs não finalizados cujo processo dono (neste
+        host) não existe mais, p.ex. após reiniciar o servidor: assim quem
+        acompanha o progresso ou espera o resultado deixa de esperar.
+        Retorna os job_ids encerrados.
+        """
+        mensagem = '❌ O processamento foi interrompido (o servidor foi reiniciado). Envie o arquivo novamente.'
+        with self._conectar() as conexao:
+            linhas = conexao.execute(
+                'SELECT job_id, sequencia, progresso, resultado, dono_pid FROM jobs'
+                ' WHERE progresso IS NOT NULL AND dono_host = ?', (socket.gethostname(),)
+            ).fetchall()
+
+            encerrados = []
+            for job_id, sequencia, progresso, resultado, dono_pid in linhas:
+                estado = json.loads(progresso)
+                if estado.get('status') in STATUS_FINAIS or _processo_existe(dono_pid):
+                    continue
+
+                estado.update(message=mensagem, status='error')
+                conexao.execute(
+                    'UPDATE jobs SET sequencia = ?, progresso = ?, resultado = ?, atualizado = ? WHERE job_id = ?',
+                    (sequencia + 1, json.dumps(estado),
+                     resultado or json.dumps({'error': mensagem, 'status': 'error'}), time.time(), job_id)
+                )
+                encerrados.append(job_id)
+        return encerrados
+
+
+def _processo_existe(pid):
+    """
+    Se há um processo com o pid neste host. No Windows o os.kill encerraria
+    o processo, então ele é sempre considerado vivo
+    """
+    if not pid:
+        return False
+    if os.name == 'nt':
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass  # Existe, mas é de outro usuário
+    return True
+
+
+def armazem_jobs(caminho=None):
+    """ArmazemJobs do processo para o caminho (padrão: DOWNLOAD_FOLDER/.cache/jobs.sqlite), criado uma vez"""
+    caminho = caminho or os.path.join(Config.DOWNLOAD_FOLDER, '.cache', 'jobs.sqlite')
+    with _LOCK_ARMAZENS:
+        armazem = _ARMAZENS.get(caminho)
+        if armazem is None:
+            armazem = _ARMAZENS[caminho] = ArmazemJobs(caminho)
+        return armazem
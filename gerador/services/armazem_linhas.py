@@ -0,0 +1,181 @@
+import hashlib, json, os, re, sqlite3, time
+from datetime import datetime
+from contextlib import contextmanager
+import pandas as pd
+from gerador.config import Config
+from gerador.constants import VERSAO_GERADOR
+from .gerar_xml import GeradorXml
+
+# Elemento <data> do XML (AAAAMMDDHHMMSS), atualizado nos XMLs reaproveitados
+_DATA_XML = re.compile(rb'<data>\d{14}</data>')
+
+
+class ArmazemLinhas:
+    """
+    Armazena o XML já gerado de cada linha, indexado por
+    ESTACAO_ABASTECEDORA + ID_ENDERECO (ou COD_SURVEY) e pelo hash do
+    conteúdo da linha. Ao reenviar o CSV corrigido de uma estação, as linhas
+    que não mudaram são copiadas daqui em vez de passar pelo gerador.
+    """
+
+    TAMANHO_LOTE = 500  # Chaves por SELECT ... IN (abaixo do limite de parâmetros do SQLite)
+
+    def __init__(self, caminho=None):
+        self.caminho = caminho or os.path.join(Config.DOWNLOAD_FOLDER, '.cache', 'linhas.sqlite')
+        os.makedirs(os.path.dirname(self.caminho), exist_ok=True)
+        with self._conectar() as conexao:
+            conexao.execute(
+                'CREATE TABLE IF NOT EXISTS linhas ('
+                ' estacao TEXT NOT NULL, chave TEXT NOT NULL, hash TEXT NOT NULL,'
+                ' xml BLOB NOT NULL, atualizado REAL NOT NULL,'
+                ' PRIMARY KEY (estacao, chave))'
+            )
+
+    @contextmanager
+    def _conectar(self):
+        """Conexão com commit ao final do bloco e sempre fechada"""
+        conexao = sqlite3.connect(self.caminho, timeout=30)
+        try:
+            with conexao:
+                yield conexao
+        finally:
+            conexao.close()
+
+    @staticmethod
+    def chaves_linhas(df):
+        """ID_ENDERECO de cada linha, ou COD_SURVEY quando não houver (None se nenhum)"""
+        chaves = pd.Series([None] * len(df), index=df.index, dtype=object)
+        for coluna in ('COD_SURVEY', 'ID_ENDERECO'):
+            if coluna in df.columns:
+                valores = df[coluna]
+                chaves = chaves.where(valores.isna(), coluna + ':' + valores.astype(str))
+        return chaves.tolist()
+
+    @staticmethod
+    def estacoes_linhas(df, padrao):
+        """ESTACAO_ABASTECEDORA de cada linha ('padrao' quando não houver)"""
+        padrao = str(padrao)
+        if 'ESTACAO_ABASTECEDORA' not in df.columns:
+            return [padrao] * len(df)
+        return [padrao if pd.isna(estacao) else str(estacao) for estacao in df['ESTACAO_ABASTECEDORA']]
+
+    @staticmethod
+    def hashes_linhas(df, complemento_vazio):
+        """
+        Hash do conteúdo de cada linha, combinado com tudo o que muda o XML
+        gerado além dela: colunas e tipos, complemento_vazio, versão e
+        valores padrão
+        """
+        contexto = json.dumps({
+            'colunas': [f'{coluna}:{tipo}' for coluna, tipo in df.dtypes.items()],
+            'complemento_vazio': bool(complemento_vazio),
+            'versao': VERSAO_GERADOR,
+            'valores_padrao': GeradorXml.VALORES_PADRAO,
+        }, sort_keys=True)
+        prefixo = hashlib.sha256(contexto.encode('utf-8')).hexdigest()[:16]
+
+        hashes = pd.util.hash_pandas_object(df, index=False)
+        return [f'{prefixo}:{h:016x}' for h in hashes.to_numpy()]
+
+    def hashes_armazenados(self, estacao):
+        """Dicionário chave -> hash das linhas já armazenadas da estação"""
+        with self._conectar() as conexao:
+            cursor = conexao.execute('SELECT chave, hash FROM linhas WHERE estacao = ?', (estacao,))
+            return dict(cursor.fetchall())
+
+    def ler_xmls(self, estacao, chaves):
+        """
+        Dicionário chave -> XML armazenado, lido em lotes; chaves que
+        expiraram nesse meio tempo simplesmente não aparecem
+        """
+        chaves = list(chaves)
+        xmls = {}
+        with self._conectar() as conexao:
+            for inicio in range(0, len(chaves), self.TAMANHO_LOTE):
+                lote = chaves[inicio:inicio + self.TAMANHO_LOTE]
+                cursor = conexao.execute(
+                    f'SELECT chave, xml FROM linhas WHERE estacao = ? AND chave IN ({",".join("?" * len(lote))})',
+                    (estacao, *lote)
+                )
+                xmls.update(cursor.fetchall())
+        return xmls
+
+    def gravar(self, estacao, registros):
+        """Grava (chave, hash, xml) das linhas geradas"""
+        agora = time.time()
+        with self._conectar() as conexao:
+            conexao.executemany(
+                'INSERT OR REPLACE INTO linhas (estacao, chave, hash, xml, atualizado) VALUES (?, ?, ?, ?, ?)',
+                ((estacao, chave, hash_linha, xml, agora) for chave, hash_linha, xml in registros)
+            )
+
+    def limpar(self, idade_maxima=None):
+        """Remove as linhas não atualizadas há mais de 'idade_maxima' segundos"""
+        idade_maxima = idade_maxima or Config.XML_INCREMENTAL_IDADE_MAXIMA
+        with self._conectar() as conexao:
+            conexao.execute('DELETE FROM linhas WHERE atualizado < ?', (time.time() - idade_maxima,))
+
+
+def gerar_xmls_incremental(df, estacao, complemento_vazio, gerar, estatisticas, armazem=None, data=None):
+    """
+    Gera os XMLs na ordem das linhas reaproveitando os que não mudaram.
+
+    Cada linha é guardada sob a própria ESTACAO_ABASTECEDORA ('estacao' é
+    usada nas linhas sem estação). 'gerar' recebe o DataFrame só com as
+    linhas alteradas e devolve seus XMLs em ordem. Os XMLs reaproveitados
+    recebem a data 'data' (padrão: agora) no lugar da data em que foram
+    gerados. 'estatisticas' recebe 'reutilizadas' e 'regeneradas'.
+    """
+    armazem = armazem or ArmazemLinhas()
+    data = (data or datetime.now().strftime('%Y%m%d%H%M%S')).encode('ascii')
+
+    estacoes = ArmazemLinhas.estacoes_linhas(df, estacao)
+    chaves = ArmazemLinhas.chaves_linhas(df)
+    hashes = ArmazemLinhas.hashes_linhas(df, complemento_vazio)
+
+    armazenados = {}
+    for estacao_linha in set(estacoes):
+        armazenados.update(((estacao_linha, chave), hash_linha)
+                           for chave, hash_linha in armazem.hashes_armazenados(estacao_linha).items())
+
+    candidatas = {}
+    for estacao_linha, chave, hash_linha in zip(estacoes, chaves, hashes):
+        if chave is not None and armazenados.get((estacao_linha, chave)) == hash_linha:
+            candidatas.setdefault(estacao_linha, []).append(chave)
+
+    # Lidos antes de decidir: uma linha que expirou depois da leitura dos hashes é regenerada
+    antigos = {}
+    for estacao_linha, chaves_estacao in candidatas.items():
+        antigos.update(((estacao_linha, chave), xml)
+                       for chave, xml in armazem.ler_xmls(estacao_linha, chaves_estacao).items())
+
+    reutilizar = [(estacao_linha, chave) in antigos for estacao_linha, chave in zip(estacoes, chaves)]
+    posicoes_alteradas = [i for i, reutiliza in enumerate(reutilizar) if not reutiliza]
+
+    estatisticas['reutilizadas'] = len(df) - len(posicoes_alteradas)
+    estatisticas['regeneradas'] = len(posicoes_alteradas)
+
+    novos = iter(gerar(df.iloc[posicoes_alteradas])) if posicoes_alteradas else iter(())
+
+    gerados = {}
+    pendentes = 0
+    for estacao_linha, chave, hash_linha, reutiliza in zip(estacoes, chaves, hashes, reutilizar):
+        if reutiliza:
+            yield _DATA_XML.sub(b'<data>' + data + b'</data>', antigos[(estacao_linha, chave)], count=1)
+            continue
+
+        xml_content = next(novos)
+        if chave is not None:
+            gerados.setdefault(estacao_linha, []).append((chave, hash_linha, xml_content))
+            pendentes += 1
+            if pendentes >= 1000:
+                _gravar_gerados(armazem, gerados)
+                gerados, pendentes = {}, 0
+        yield xml_content
+
+    _gravar_gerados(armazem, gerados)
+
+
+def _gravar_gerados(armazem, gerados):
+    for estacao_linha, registros in gerados.items():
+        armazem.gravar(estacao_linha, registros)
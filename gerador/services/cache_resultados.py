@@ -0,0 +1,104 @@
+import hashlib, json, os, threading, time
+from gerador.config import Config
+from gerador.constants import VERSAO_GERADOR
+from .gerar_xml import GeradorXml
+
+_LOCK = threading.Lock()
+
+
+class CacheResultados:
+    """
+    Cache de resultados endereçado pelo conteúdo do upload.
+
+    A chave é o SHA-256 dos bytes enviados, do tipo de processamento, da
+    versão do gerador e dos valores padrão do GeradorXml. Os arquivos
+    continuam em DOWNLOAD_FOLDER; o índice fica em DOWNLOAD_FOLDER/.cache,
+    fora do alcance do limpar_arquivos_antigos.
+    """
+
+    def __init__(self, pasta=None):
+        self.pasta = pasta or Config.DOWNLOAD_FOLDER
+        self.caminho_indice = os.path.join(self.pasta, '.cache', 'indice.json')
+
+    @staticmethod
+    def chave(arquivo_path, tipo, **opcoes):
+        """Calcula a chave do upload (lido em blocos de 1MB)"""
+        sha = hashlib.sha256()
+        with open(arquivo_path, 'rb') as f:
+            for bloco in iter(lambda: f.read(1024 * 1024), b''):
+                sha.update(bloco)
+
+        contexto = {
+            'tipo': tipo,
+            'versao': VERSAO_GERADOR,
+            'valores_padrao': GeradorXml.VALORES_PADRAO,
+            'opcoes': opcoes,
+        }
+        sha.update(json.dumps(contexto, sort_keys=True, default=str).encode('utf-8'))
+        return sha.hexdigest()
+
+    def _ler_indice(self):
+        try:
+            with open(self.caminho_indice, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _gravar_indice(self, indice):
+        os.makedirs(os.path.dirname(self.caminho_indice), exist_ok=True)
+        temporario = f'{self.caminho_indice}.{os.getpid()}.tmp'
+        with open(temporario, 'w', encoding='utf-8') as f:
+            json.dump(indice, f)
+        os.replace(temporario, self.caminho_indice)
+
+    def obter(self, chave):
+        """Retorna os metadados do resultado em cache ou None"""
+        with _LOCK:
+            indice = self._ler_indice()
+            entrada = indice.get(chave)
+            if entrada is None:
+                return None
+
+            caminho = os.path.join(self.pasta, entrada['filename'])
+            expirado = time.time() - entrada['criado'] > Config.IDADE_MAXIMA_DOWNLOADS
+            if not os.path.isfile(caminho) or expirado:
+                indice.pop(chave)
+                self._gravar_indice(indice)
+                return None
+
+            return entrada
+
+    def registrar(self, chave, filename, **metadados):
+        """Registra o arquivo gerado para a chave"""
+        with _LOCK:
+            indice = self._ler_indice()
+            indice[chave] = {'filename': filename, 'criado': time.time(), **metadados}
+            self._gravar_indice(indice)
+
+    def limpar(self, tamanho_maximo=None):
+        """
+        Remove entradas cujo arquivo não existe mais (já apagado por idade) e,
+        se os arquivos em cache passarem da cota, apaga os mais antigos
+        """
+        tamanho_maximo = tamanho_maximo or Config.CACHE_TAMANHO_MAXIMO
+
+        with _LOCK:
+            indice = self._ler_indice()
+            tamanhos = {}
+            for chave, entrada in list(indice.items()):
+                caminho = os.path.join(self.pasta, entrada['filename'])
+                if os.path.isfile(caminho):
+                    tamanhos[chave] = os.path.getsize(caminho)
+                else:
+                    indice.pop(chave)
+
+            total = sum(tamanhos.values())
+            for chave in sorted(tamanhos, key=lambda c: indice[c]['criado']):
+                if total <= tamanho_maximo:
+                    break
+                caminho = os.path.join(self.pasta, indice.pop(chave)['filename'])
+                if os.path.isfile(caminho):
+                    os.remove(caminho)
+                total -= tamanhos[chave]
+
+            self._gravar_indice(indice)
@@ -0,0 +1,125 @@
+import os, pickle, threading, time
+import pandas as pd
+from .indice_roteiro import IndiceRoteiro
+
+
+class CacheRoteiros:
+    """
+    Cache dos roteiros (xlsx) no processo, invalidado pelo mtime do arquivo.
+
+    Na primeira carga do processo o roteiro vem do arquivo auxiliar
+    '<roteiro>.xlsx.pkl' (se ele tiver o mesmo mtime do xlsx), evitando o
+    openpyxl; se não houver, o xlsx é lido e o .pkl é gravado ao lado.
+
+    Os DataFrames devolvidos são compartilhados entre os jobs e não devem
+    ser alterados. O IndiceRoteiro de cada roteiro também é guardado aqui,
+    montado uma vez por versão do arquivo.
+    """
+
+    SUFIXO_AUXILIAR = '.pkl'
+
+    def __init__(self, leitor=pd.read_excel):
+        self.leitor = leitor
+        self._roteiros = {}  # caminho -> (mtime, DataFrame)
+        self._indices = {}  # caminho -> {chaves: IndiceRoteiro}
+        self._lock = threading.Lock()
+        self._estatisticas = {
+            'acertos': 0,
+            'falhas': 0,
+            'cargas_auxiliar': 0,
+            'cargas_xlsx': 0,
+            'tempo_ultima_carga': None,
+            'tempo_total_carga': 0.0,
+            'indices_montados': 0,
+            'tempo_indices': 0.0,
+        }
+
+    def carregar(self, caminho):
+        """Retorna o DataFrame do roteiro, lendo do disco apenas se ele mudou"""
+        mtime = os.path.getmtime(caminho)
+
+        with self._lock:
+            em_cache = self._roteiros.get(caminho)
+            if em_cache is not None and em_cache[0] == mtime:
+                self._estatisticas['acertos'] += 1
+                return em_cache[1]
+
+            self._estatisticas['falhas'] += 1
+            inicio = time.perf_counter()
+
+            df = self._ler_auxiliar(caminho, mtime)
+            if df is None:
+                df = self.leitor(caminho)
+                self._estatisticas['cargas_xlsx'] += 1
+                self._gravar_auxiliar(caminho, mtime, df)
+            else:
+                self._estatisticas['cargas_auxiliar'] += 1
+
+            tempo = time.perf_counter() - inicio
+            self._estatisticas['tempo_ultima_carga'] = tempo
+            self._estatisticas['tempo_total_carga'] += tempo
+
+            self._roteiros[caminho] = (mtime, df)
+            self._indices.pop(caminho, None)
+            return df
+
+    def indice(self, df_roteiro, chaves=None):
+        """
+        IndiceRoteiro do roteiro devolvido por carregar(), montado apenas na
+        primeira chamada. Para DataFrames fora do cache o índice é montado
+        sem ser guardado. Retorna None se o roteiro não tiver as chaves.
+
+        Ainda não é usado em produção: o cruzamento feito por
+        processar_enderecos_otimizado continua sem o índice.
+        """
+        chaves = tuple(chaves or IndiceRoteiro.CHAVES)
+
+        with self._lock:
+            caminho = next((c for c, (_, df) in self._roteiros.items() if df is df_roteiro), None)
+            indices = self._indices.setdefault(caminho, {}) if caminho is not None else {}
+            if chaves in indices:
+                return indices[chaves]
+
+            inicio = time.perf_counter()
+            try:
+                indice = IndiceRoteiro(df_roteiro, chaves)
+            except ValueError as e:
+                print(f"⚠️ Índice do roteiro não montado: {e}")
+                return None
+
+            self._estatisticas['indices_montados'] += 1
+            self._estatisticas['tempo_indices'] += time.perf_counter() - inicio
+            indices[chaves] = indice
+            return indice
+
+    def _ler_auxiliar(self, caminho, mtime):
+        """Lê o .pkl ao lado do xlsx se ele corresponder ao mtime atual"""
+        try:
+            with open(caminho + self.SUFIXO_AUXILIAR, 'rb') as f:
+                auxiliar = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            return None
+
+        if auxiliar.get('mtime') != mtime:
+            return None
+        return auxiliar.get('df')
+
+    def _gravar_auxiliar(self, caminho, mtime, df):
+        """Grava o .pkl de forma atômica; falhas (ex.: pasta sem escrita) são ignoradas"""
+        destino = caminho + self.SUFIXO_AUXILIAR
+        temporario = f'{destino}.{os.getpid()}.tmp'
+        try:
+            with open(temporario, 'wb') as f:
+                pickle.dump({'mtime': mtime, 'df': df}, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporario, destino)
+        except OSError as e:
+            print(f"⚠️ Não foi possível gravar o cache do roteiro {destino}: {e}")
+
+    def estatisticas(self):
+        """Cópia das estatísticas de acerto/falha e tempo de carga"""
+        with self._lock:
+            return dict(self._estatisticas, roteiros_em_cache=len(self._roteiros))
+
+
+# Cache único do processo
+CACHE_ROTEIROS = CacheRoteiros()
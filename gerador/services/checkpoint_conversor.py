@@ -0,0 +1,97 @@
+import json, os, time
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+class CheckpointConversor:
+    """
+    Ponto de retomada de uma conversão grande, gravado ao lado da saída
+    parcial ('<saida>.checkpoint.json').
+
+    Registra o último chunk gravado por completo, a posição em bytes da
+    entrada até onde ele vai, as linhas lidas e gravadas e o tamanho da
+    saída naquele momento. Só é aceito para o mesmo upload (mesma chave).
+    """
+
+    def __init__(self, caminho_saida, chave):
+        self.caminho_saida = caminho_saida
+        self.caminho = caminho_saida + '.checkpoint.json'
+        self.chave = chave
+
+    def carregar(self):
+        """Estado salvo para esta chave, ou None se não houver como retomar"""
+        try:
+            with open(self.caminho, 'r', encoding='utf-8') as f:
+                estado = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+        if estado.get('chave') != self.chave:
+            return None
+        if not os.path.isfile(self.caminho_saida) or os.path.getsize(self.caminho_saida) < estado['tamanho_saida']:
+            return None
+        return estado
+
+    def gravar(self, chunk, posicao, linhas, tamanho_saida, **extras):
+        """Grava o estado de forma atômica (a saída já deve ter sido descarregada)"""
+        estado = dict(extras, chave=self.chave, chunk=chunk, posicao=posicao, linhas=linhas,
+                      tamanho_saida=tamanho_saida, atualizado=time.time())
+        temporario = f'{self.caminho}.{os.getpid()}.tmp'
+        with open(temporario, 'w', encoding='utf-8') as f:
+            json.dump(estado, f)
+        os.replace(temporario, self.caminho)
+
+    def existe(self):
+        return os.path.exists(self.caminho)
+
+    def remover(self):
+        if os.path.exists(self.caminho):
+            os.remove(self.caminho)
+
+
+class TravaConversao:
+    """
+    Trava exclusiva (flock) de uma conversão, por chave do upload: só um job
+    por vez grava a saída parcial e o checkpoint daquela chave. A trava é
+    liberada pelo sistema se o processo morrer, então não fica trava órfã.
+
+    Fora de sistemas POSIX (sem fcntl) não há trava.
+    """
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self._descritor = None
+
+    def adquirir(self, bloquear=True):
+        """Obtém a trava; com bloquear=False retorna False se outro job a tiver"""
+        if fcntl is None:
+            return True
+        os.makedirs(os.path.dirname(self.caminho), exist_ok=True)
+        while True:
+            descritor = os.open(self.caminho, os.O_RDWR | os.O_CREAT, 0o600)
+            try:
+                fcntl.flock(descritor, fcntl.LOCK_EX | (0 if bloquear else fcntl.LOCK_NB))
+            except BlockingIOError:
+                os.close(descritor)
+                return False
+
+            # O arquivo pode ter sido removido por quem liberou a trava
+            # enquanto esperávamos: nesse caso trava o arquivo novo
+            try:
+                if os.fstat(descritor).st_ino == os.stat(self.caminho).st_ino:
+                    self._descritor = descritor
+                    return True
+            except FileNotFoundError:
+                pass
+            os.close(descritor)
+
+    def liberar(self, remover=False):
+        if self._descritor is None:
+            return
+        if remover:
+            os.remove(self.caminho)
+        os.close(self._descritor)
+        self._descritor = None
@@ -0,0 +1,182 @@
+import time, zipfile, zlib
+from concurrent.futures import ThreadPoolExecutor
+
+# Atributos internos do ZipFile usados para anexar entradas já comprimidas
+# (estáveis do 3.11 ao 3.13). Sem algum deles, a compressão é feita pelo
+# próprio writestr, sem threads.
+_INTERNOS_ZIPFILE = ('_lock', '_seekable', '_writecheck', '_didModify', 'start_dir', 'fp', 'filelist', 'NameToInfo')
+
+# Estratégias de compressão: nome -> (método do zip, nível do deflate)
+COMPRESSOES = {
+    'padrao': (zipfile.ZIP_DEFLATED, None),
+    'stored': (zipfile.ZIP_STORED, None),
+    'rapida': (zipfile.ZIP_DEFLATED, 1),
+    'maxima': (zipfile.ZIP_DEFLATED, 9),
+}
+
+
+def _comprimir(xmls, nivel):
+    """Comprime (deflate puro, como o zipfile) uma lista de XMLs; roda nas threads"""
+    if nivel is None:
+        nivel = zlib.Z_DEFAULT_COMPRESSION
+    resultado = []
+    for xml_content in xmls:
+        compressor = zlib.compressobj(nivel, zlib.DEFLATED, -15)
+        comprimido = compressor.compress(xml_content) + compressor.flush()
+        resultado.append((xml_content, zlib.crc32(xml_content), comprimido))
+    return resultado
+
+
+class EscritorZipXml:
+    """
+    Escreve os XMLs gerados diretamente no arquivo ZIP, sem criar a árvore
+    temporária moradiaN/moradiaN.xml em disco.
+
+    'compressao' é uma das chaves de COMPRESSOES. Com 'threads' > 1 e
+    deflate, as entradas são acumuladas em lotes e comprimidas em um pool
+    de threads (o zlib libera o GIL) antes de serem anexadas, em ordem, ao ZIP.
+    Se o zipfile da versão em uso não expuser os atributos internos
+    necessários para anexar uma entrada comprimida, usa o writestr sem threads.
+    """
+
+    TAMANHO_LOTE_POR_THREAD = 256
+
+    def __init__(self, destino, compressao='padrao', threads=1):
+        if compressao not in COMPRESSOES:
+            raise ValueError(f"Compressão inválida: {compressao}")
+
+        self.destino = destino
+        self.metodo, self.nivel = COMPRESSOES[compressao]
+        self.zipf = zipfile.ZipFile(destino, 'w', self.metodo, compresslevel=self.nivel)
+        self.total = 0
+
+        self._executor = None
+        self._pendentes = []
+        if threads > 1 and self.metodo == zipfile.ZIP_DEFLATED and self.suporta_pre_comprimidos(self.zipf):
+            self._executor = ThreadPoolExecutor(max_workers=threads)
+            self._threads = threads
+
+    @staticmethod
+    def suporta_pre_comprimidos(zipf):
+        """Se o ZipFile tem os internos usados por _escrever_comprimido"""
+        return all(hasattr(zipf, atributo) for atributo in _INTERNOS_ZIPFILE)
+
+    @staticmethod
+    def nome_entrada(numero):
+        """Caminho do XML dentro do ZIP (o mesmo da antiga estrutura de pastas)"""
+        return f'moradia{numero}/moradia{numero}.xml'
+
+    def adicionar(self, numero, xml_content):
+        """Adiciona o XML da moradia 'numero' ao ZIP"""
+        if self._executor is None:
+            self.zipf.writestr(self.nome_entrada(numero), xml_content)
+            self.total += 1
+            return
+
+        self._pendentes.append((numero, xml_content))
+        if len(self._pendentes) >= self._threads * self.TAMANHO_LOTE_POR_THREAD:
+            self._descarregar()
+
+    def _descarregar(self):
+        """Comprime os pendentes em paralelo e grava na ordem de chegada"""
+        if not self._pendentes:
+            return
+
+        tamanho = self.TAMANHO_LOTE_POR_THREAD
+        numeros = [numero for numero, _ in self._pendentes]
+        xmls = [xml_content for _, xml_content in self._pendentes]
+        lotes = [xmls[i:i + tamanho] for i in range(0, len(xmls), tamanho)]
+        self._pendentes = []
+
+        comprimidos = (item for lote in self._executor.map(_comprimir, lotes, [self.nivel] * len(lotes))
+                       for item in lote)
+        for numero, (xml_content, crc, comprimido) in zip(numeros, comprimidos):
+            self._escrever_comprimido(self.nome_entrada(numero), xml_content, crc, comprimido)
+            self.total += 1
+
+    def _escrever_comprimido(self, nome, xml_content, crc, comprimido):
+        """
+        Anexa ao ZIP uma entrada já comprimida. Segue os mesmos passos do
+        ZipFile._open_to_write/_ZipWriteFile.close, mas como tamanhos e CRC
+        já são conhecidos o cabeçalho local é escrito de uma vez só.
+        """
+        zipf = self.zipf
+        zinfo = zipfile.ZipInfo(nome, date_time=time.localtime(time.time())[:6])
+        zinfo.compress_type = zipfile.ZIP_DEFLATED
+        zinfo.external_attr = 0o600 << 16
+        zinfo.file_size = len(xml_content)
+        zinfo.compress_size = len(comprimido)
+        zinfo.CRC = crc
+
+        with zipf._lock:
+            if zipf._seekable:
+                zipf.fp.seek(zipf.start_dir)
+            zinfo.header_offset = zipf.fp.tell()
+            zipf._writecheck(zinfo)
+            zipf._didModify = True
+
+            zipf.fp.write(zinfo.FileHeader(False))
+            zipf.fp.write(comprimido)
+
+            zipf.start_dir = zipf.fp.tell()
+            zipf.filelist.append(zinfo)
+            zipf.NameToInfo[zinfo.filename] = zinfo
+
+    def fechar(self):
+        try:
+            if self._executor is not None:
+                self._descarregar()
+                self._executor.shutdown()
+        finally:
+            self.zipf.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.fechar()
+
+
+class _SaidaStreaming:
+    """
+    Destino de escrita sem seek para o ZipFile: acumula os bytes escritos
+    até serem retirados. Sem tell()/seek() o zipfile grava cada entrada com
+    data descriptor, o que permite enviar o ZIP enquanto ele é montado.
+    """
+
+    def __init__(self):
+        self._partes = []
+
+    def write(self, dados):
+        self._partes.append(bytes(dados))
+        return len(dados)
+
+    def flush(self):
+        pass
+
+    def retirar(self):
+        """Retorna (e descarta) tudo o que foi escrito até agora"""
+        dados = b''.join(self._partes)
+        self._partes.clear()
+        return dados
+
+
+def gerar_zip_streaming(xmls, compressao='padrao', threads=1):
+    """
+    Gera o ZIP em pedaços de bytes, um por XML, na medida em que os
+    documentos são produzidos. Nada além da entrada atual (ou do lote
+    atual, com threads de compressão) fica em memória.
+    """
+    saida = _SaidaStreaming()
+    escritor = EscritorZipXml(saida, compressao, threads)
+    try:
+        for numero, xml_content in enumerate(xmls, 1):
+            escritor.adicionar(numero, xml_content)
+            pedaco = saida.retirar()
+            if pedaco:
+                yield pedaco
+    finally:
+        escritor.fechar()
+
+    # Diretório central do ZIP
+    yield saida.retirar()
@@ -9,6 +9,22 @@ import pandas as pd
 
 class GeradorXml:
     """Classe para gerar XML de edificios com complementos"""
+
+    # Valores usados quando a coluna não existe ou está vazia no CSV
+    VALORES_PADRAO = {
+        'codigo_zona': 'DF-GURX-ETGR-CEOS-68',
+        'localidade': 'GUARA',
+        'id_endereco': '93128133',
+        'cep': '71065071',
+        'id_roteiro': '57149008',
+        'id_localidade': '1894644',
+        'cod_lograd': '2700035341',
+        'id_tecnico': '1828772688',
+        'nome_tecnico': 'NADIA CAROLINE',
+        'id_empresa': '42541126',
+        'nome_empresa': 'TELEMONT',
+        'total_ucs': 1
+    }
     
     def __init__(self, dados_csv, numero_pasta, complemento_vazio):
         self.dados_csv = dados_csv
@@ -17,20 +33,7 @@ class GeradorXml:
         self.edificio = None
         
         # Valores padrão
-        self.valores_padrao = {
-            'codigo_zona': 'DF-GURX-ETGR-CEOS-68',
-            'localidade': 'GUARA',
-            'id_endereco': '93128133',
-            'cep': '71065071',
-            'id_roteiro': '57149008',
-            'id_localidade': '1894644',
-            'cod_lograd': '2700035341',
-            'id_tecnico': '1828772688',
-            'nome_tecnico': 'NADIA CAROLINE',
-            'id_empresa': '42541126',
-            'nome_empresa': 'TELEMONT',
-            'total_ucs': 1
-        }
+        self.valores_padrao = dict(self.VALORES_PADRAO)
     
     def _obter_valor(self, campo, campo_padrao=None):
         """Obtém valor do CSV ou usa valor padrão"""
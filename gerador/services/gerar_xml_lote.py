@@ -0,0 +1,177 @@
+import xml.etree.ElementTree as ET
+from datetime import datetime
+import pandas as pd
+from gerador.utils import formatar_coordenada, resolver_complementos
+from .gerar_xml import GeradorXml
+from .template_xml import TemplateXmlEdificio
+
+
+class GeradorXmlLote:
+    """
+    Gera os XMLs de edificios de todas as linhas de um DataFrame em lote.
+
+    Os valores padrão, as coordenadas e os códigos de complemento são
+    resolvidos uma única vez por coluna; depois cada documento é montado a
+    partir dessas listas pré-calculadas. O resultado é byte a byte igual ao
+    de GeradorXml.gerar_xml para a mesma linha (com a mesma data).
+
+    O documento pode ser montado por dois motores:
+      - 'etree': ElementTree, como o GeradorXml
+      - 'template': TemplateXmlEdificio, layout pré-compilado (mais rápido)
+    """
+
+    MOTORES = ('etree', 'template')
+
+    def __init__(self, df, complemento_vazio, data=None, motor='etree'):
+        if motor not in self.MOTORES:
+            raise ValueError(f"Motor de geração inválido: {motor}")
+
+        self.df = df
+        self.complemento_vazio = complemento_vazio
+        self.motor = motor
+        self.valores_padrao = dict(GeradorXml.VALORES_PADRAO)
+        self.data = data or datetime.now().strftime('%Y%m%d%H%M%S')
+
+        # df.iterrows() converte cada linha para o tipo comum do DataFrame;
+        # usar o mesmo tipo garante a mesma representação em texto dos valores
+        self._tipo_linha = df.iloc[:1].to_numpy().dtype
+
+    def _coluna(self, campo):
+        """Retorna os valores brutos da coluna (ou None se ela não existir)"""
+        if campo not in self.df.columns:
+            return None
+        return self.df[campo].to_numpy(dtype=self._tipo_linha)
+
+    def _valores(self, campo, campo_padrao=None):
+        """Equivalente em lote de GeradorXml._obter_valor"""
+        padrao = self.valores_padrao.get(campo_padrao, '')
+        coluna = self._coluna(campo)
+        if coluna is None:
+            return [padrao] * len(self.df)
+        vazios = pd.isna(coluna)
+        return [padrao if vazio else str(valor) for valor, vazio in zip(coluna, vazios)]
+
+    def _coordenadas(self, campo):
+        """Formata a coluna de coordenadas uma única vez"""
+        return [str(formatar_coordenada(valor)) for valor in self.df[campo].to_numpy(dtype=self._tipo_linha)]
+
+    def _complementos(self, campo):
+        """Resolve código e argumento da coluna de forma vetorizada"""
+        coluna = self._coluna(campo)
+        if coluna is None:
+            return ['60'] * len(self.df), ['1'] * len(self.df)
+
+        codigos, argumentos = resolver_complementos(pd.Series(coluna, dtype=object))
+        return codigos.tolist(), argumentos.tolist()
+
+    def _complementos3(self):
+        """Resolve o complemento 3 apenas para as linhas preenchidas"""
+        total = len(self.df)
+        coluna = self._coluna('COMPLEMENTO3')
+        if self.complemento_vazio or coluna is None:
+            return [None] * total
+
+        codigos, argumentos = self._complementos('COMPLEMENTO3')
+        return [
+            (codigo, argumento) if not pd.isna(valor) and str(valor).strip() else None
+            for valor, codigo, argumento in zip(coluna, codigos, argumentos)
+        ]
+
+    def _logradouros(self, logradouro, bairro, municipio, localidade, uf, cod_lograd):
+        """Constrói a string do logradouro de cada linha"""
+        resultado = []
+        for partes in zip(logradouro, bairro, municipio, localidade, uf, cod_lograd):
+            lograd, bair, mun, loc, estado, cod = partes
+            texto = ", ".join(p for p in (lograd, bair, mun, f"{loc} - {estado}") if p)
+            if cod:
+                texto += f" ({cod})"
+            resultado.append(texto)
+        return resultado
+
+    def preparar_colunas(self):
+        """Pré-calcula, coluna a coluna, todos os campos variáveis do XML"""
+        localidade = self._valores('LOCALIDADE', 'localidade')
+        bairro = self._valores('BAIRRO')
+        cod_lograd_csv = self._valores('COD_LOGRADOURO')
+        comp1_cod, comp1_arg = self._complementos('COMPLEMENTO')
+        comp2_cod, comp2_arg = self._complementos('COMPLEMENTO2')
+
+        return {
+            'nEdificio': self._valores('COD_SURVEY'),
+            'coordX': self._coordenadas('LONGITUDE'),
+            'coordY': self._coordenadas('LATITUDE'),
+            'codigoZona': self._valores('COD_ZONA', 'codigo_zona'),
+            'localidade': localidade,
+            'id': self._valores('ID_ENDERECO', 'id_endereco'),
+            'logradouro': self._logradouros(
+                self._valores('LOGRADOURO'), bairro, self._valores('MUNICIPIO'),
+                localidade, self._valores('UF'), cod_lograd_csv
+            ),
+            'numero_fachada': [v or 'SN' for v in self._valores('NUM_FACHADA')],
+            'id_complemento1': comp1_cod,
+            'argumento1': comp1_arg,
+            'id_complemento2': comp2_cod,
+            'argumento2': comp2_arg,
+            'complemento3': self._complementos3(),
+            'cep': self._valores('CEP', 'cep'),
+            'bairro': [b or loc for b, loc in zip(bairro, localidade)],
+            'id_roteiro': self._valores('ID_ROTEIRO', 'id_roteiro'),
+            'id_localidade': self._valores('ID_LOCALIDADE', 'id_localidade'),
+            'cod_lograd': self._valores('COD_LOGRADOURO', 'cod_lograd'),
+            'totalUCs': [str(v) for v in self._valores('QUANTIDADE_UMS', 'total_ucs')],
+        }
+
+    def _montar_edificio(self, campos):
+        """Monta o XML de uma linha a partir dos campos já resolvidos"""
+        edificio = ET.Element('edificio')
+        edificio.set('tipo', 'M')
+        edificio.set('versao', '7.9.2')
+
+        ET.SubElement(edificio, 'gravado').text = 'false'
+        ET.SubElement(edificio, 'nEdificio').text = campos['nEdificio']
+        ET.SubElement(edificio, 'coordX').text = campos['coordX']
+        ET.SubElement(edificio, 'coordY').text = campos['coordY']
+        ET.SubElement(edificio, 'codigoZona').text = campos['codigoZona']
+        ET.SubElement(edificio, 'nomeZona').text = campos['codigoZona']
+        ET.SubElement(edificio, 'localidade').text = campos['localidade']
+
+        endereco = ET.SubElement(edificio, 'enderecoEdificio')
+        for tag in ('id', 'logradouro', 'numero_fachada', 'id_complemento1', 'argumento1',
+                    'id_complemento2', 'argumento2'):
+            ET.SubElement(endereco, tag).text = campos[tag]
+        if campos['complemento3'] is not None:
+            codigo3, argumento3 = campos['complemento3']
+            ET.SubElement(endereco, 'id_complemento3').text = codigo3
+            ET.SubElement(endereco, 'argumento3').text = argumento3
+        for tag in ('cep', 'bairro', 'id_roteiro', 'id_localidade', 'cod_lograd'):
+            ET.SubElement(endereco, tag).text = campos[tag]
+
+        tecnico = ET.SubElement(edificio, 'tecnico')
+        ET.SubElement(tecnico, 'id').text = self.valores_padrao['id_tecnico']
+        ET.SubElement(tecnico, 'nome').text = self.valores_padrao['nome_tecnico']
+
+        empresa = ET.SubElement(edificio, 'empresa')
+        ET.SubElement(empresa, 'id').text = self.valores_padrao['id_empresa']
+        ET.SubElement(empresa, 'nome').text = self.valores_padrao['nome_empresa']
+
+        ET.SubElement(edificio, 'data').text = self.data
+        ET.SubElement(edificio, 'totalUCs').text = campos['totalUCs']
+        ET.SubElement(edificio, 'ocupacao').text = 'EDIFICACAOCOMPLETA'
+        ET.SubElement(edificio, 'numPisos').text = '1'
+        ET.SubElement(edificio, 'destinacao').text = 'COMERCIO'
+
+        xml_str = ET.tostring(edificio, encoding='UTF-8', method='xml')
+        return b'<?xml version="1.0" encoding="UTF-8"?>' + xml_str
+
+    def gerar_xmls(self):
+        """Gera (em ordem) o XML de cada linha do DataFrame"""
+        colunas = self.preparar_colunas()
+        nomes = list(colunas)
+
+        if self.motor == 'template':
+            montar = TemplateXmlEdificio(self.valores_padrao, self.data).renderizar
+        else:
+            montar = self._montar_edificio
+
+        for valores in zip(*colunas.values()):
+            yield montar(dict(zip(nomes, valores)))
@@ -0,0 +1,56 @@
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from gerador.config import Config
+from .gerar_xml_lote import GeradorXmlLote
+from .agendador_jobs import cota_do_job
+
+
+def _renderizar_fatia(df_fatia, complemento_vazio, data, motor):
+    """Executado em um processo do pool: gera os XMLs de uma faixa de linhas"""
+    return list(GeradorXmlLote(df_fatia, complemento_vazio, data=data, motor=motor).gerar_xmls())
+
+
+def gerar_xmls(df, complemento_vazio, workers=None, tamanho_fatia=None, data=None, motor=None):
+    """
+    Gera os XMLs de todas as linhas do DataFrame, sempre na ordem das linhas.
+
+    Arquivos grandes são divididos em faixas de 'tamanho_fatia' linhas e
+    renderizados em um pool de processos; arquivos pequenos (ou com apenas
+    um worker configurado) usam o caminho serial. Dentro de um job do
+    agendador, os Config.XML_WORKERS são divididos entre os jobs que podem
+    rodar ao mesmo tempo (cota_do_job). 'motor' escolhe entre
+    'etree' e 'template' (padrão: Config.XML_MOTOR).
+    """
+    workers = workers or cota_do_job(Config.XML_WORKERS)
+    tamanho_fatia = tamanho_fatia or Config.XML_TAMANHO_FATIA
+    data = data or datetime.now().strftime('%Y%m%d%H%M%S')
+    motor = motor or Config.XML_MOTOR
+
+    if workers <= 1 or len(df) < Config.XML_MIN_LINHAS_PARALELO:
+        yield from GeradorXmlLote(df, complemento_vazio, data=data, motor=motor).gerar_xmls()
+        return
+
+    yield from _gerar_xmls_paralelo(df, complemento_vazio, workers, tamanho_fatia, data, motor)
+
+
+def _gerar_xmls_paralelo(df, complemento_vazio, workers, tamanho_fatia, data, motor):
+    """Renderiza as faixas no pool mantendo no máximo 2 faixas por worker em memória"""
+    inicios = iter(range(0, len(df), tamanho_fatia))
+    pendentes = deque()
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        def enviar_proxima():
+            inicio = next(inicios, None)
+            if inicio is not None:
+                fatia = df.iloc[inicio:inicio + tamanho_fatia]
+                pendentes.append(executor.submit(_renderizar_fatia, fatia, complemento_vazio, data, motor))
+
+        for _ in range(workers * 2):
+            enviar_proxima()
+
+        # As faixas são consumidas na ordem de envio, o que preserva moradia1..N
+        while pendentes:
+            xmls = pendentes.popleft().result()
+            enviar_proxima()
+            yield from xmls
@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+
+
+class IndiceRoteiro:
+    """
+    Índice de busca sobre uma tabela de roteiro, pelas chaves de localidade
+    e logradouro.
+
+    É montado uma vez por roteiro carregado (ver CacheRoteiros.indice); cada
+    chunk de endereços é resolvido com um único get_indexer sobre a tabela
+    hash do índice, então o custo por chunk depende do tamanho do chunk e
+    não do tamanho do roteiro.
+    """
+
+    CHAVES = ('COD_LOCALIDADE', 'COD_LOGRADOURO')
+
+    def __init__(self, df_roteiro, chaves=None):
+        self.chaves = tuple(chaves or self.CHAVES)
+        faltantes = [chave for chave in self.chaves if chave not in df_roteiro.columns]
+        if faltantes:
+            raise ValueError(f"Roteiro sem as colunas de chave: {', '.join(faltantes)}")
+
+        self.df = df_roteiro
+
+        # Valores distintos (normalizados) de cada chave; cada linha vira um
+        # código inteiro por chave, combinados em um único inteiro
+        self._niveis = []
+        for chave in self.chaves:
+            _, distintos = pd.factorize(df_roteiro[chave], use_na_sentinel=False)
+            self._niveis.append(pd.Index(self.normalizar(pd.Series(distintos)).unique()))
+
+        # Em chaves repetidas vale a primeira linha do roteiro
+        chaves_roteiro = pd.Index(self.montar_chaves(df_roteiro))
+        unicas = ~chaves_roteiro.duplicated(keep='first')
+        self._indice = chaves_roteiro[unicas]
+        self._posicoes = np.flatnonzero(unicas)
+
+        # Força a construção da tabela hash agora, e não no primeiro chunk
+        self._indice.get_indexer(self._indice[:1])
+
+    def __len__(self):
+        return len(self._indice)
+
+    @staticmethod
+    def normalizar(serie):
+        """Código como texto, sem espaços e sem o '.0' de colunas lidas como float"""
+        texto = serie.astype('string').str.strip().str.replace(r'\.0$', '', regex=True)
+        return texto.fillna('')
+
+    def montar_chaves(self, df):
+        """
+        Chave composta (inteira) de cada linha do DataFrame, -1 se algum
+        valor não existir no roteiro. A normalização é feita só sobre os
+        valores distintos da coluna.
+        """
+        chaves = np.zeros(len(df), dtype=np.int64)
+        faltando = np.zeros(len(df), dtype=bool)
+        for chave, nivel in zip(self.chaves, self._niveis):
+            codigos, distintos = pd.factorize(df[chave], use_na_sentinel=False)
+            nos_niveis = nivel.get_indexer(self.normalizar(pd.Series(distintos)))
+            codigos = nos_niveis[codigos]
+
+            faltando |= codigos < 0
+            chaves = chaves * len(nivel) + codigos
+        chaves[faltando] = -1
+        return chaves
+
+    def posicoes(self, df):
+        """Posição (iloc) no roteiro da linha correspondente a cada endereço, ou -1"""
+        chaves = self.montar_chaves(df)
+        encontrados = self._indice.get_indexer(chaves)
+        encontrados[chaves < 0] = -1
+        return np.where(encontrados >= 0, self._posicoes[encontrados], -1)
+
+    def buscar(self, df, colunas=None):
+        """
+        Colunas do roteiro alinhadas às linhas de 'df' (mesmo índice), com
+        NaN onde não houver correspondência
+        """
+        if colunas is None:
+            colunas = [coluna for coluna in self.df.columns if coluna not in self.chaves]
+
+        # take coluna a coluna: não copia o roteiro inteiro a cada chunk
+        posicoes = self.posicoes(df)
+        return pd.DataFrame({
+            coluna: pd.api.extensions.take(self._valores(coluna), posicoes, allow_fill=True)
+            for coluna in colunas
+        }, index=df.index)
+
+    def _valores(self, coluna):
+        """Valores da coluna do roteiro sem cópia (mantém tipos como category)"""
+        serie = self.df[coluna]
+        if isinstance(serie.dtype, pd.api.extensions.ExtensionDtype):
+            return serie.array
+        return serie.to_numpy()
@@ -0,0 +1,137 @@
+import io, itertools, os
+import pandas as pd
+from gerador.formato_csv import abrir_csv_binario, compressao_arquivo, tamanho_descomprimido
+
+
+class LeitorCsvBlocos:
+    """
+    Lê um CSV grande em blocos de linhas direto do arquivo binário.
+
+    Cada bloco é recortado por linhas (sem decodificar) e só então entregue
+    ao pandas, de modo que a posição em bytes no arquivo é sempre exata.
+    Com ela o progresso é calculado sobre o tamanho do arquivo e o total de
+    linhas é estimado pelos bytes por linha já observados, sem uma leitura
+    extra só para contar linhas.
+
+    Arquivos .gz e .zip são descompactados em fluxo; as posições são sempre
+    no CSV descompactado. No .gz o tamanho descompactado é estimado pela
+    taxa de compressão observada até o momento.
+
+    Os registros não podem ter quebras de linha dentro de campos entre aspas:
+    ler_bloco confere o número de registros com o de linhas do bloco e
+    levanta ValueError se um campo atravessar linhas.
+    """
+
+    def __init__(self, caminho, linhas_por_bloco, encoding='latin-1', sep='|', **opcoes):
+        self.caminho = caminho
+        self.linhas_por_bloco = linhas_por_bloco
+        self.encoding = encoding
+        self.sep = sep
+        self.opcoes = opcoes
+
+        self.compressao = compressao_arquivo(caminho)
+        self.tamanho_arquivo = os.path.getsize(caminho)
+        self._tamanho = None if self.compressao == 'gzip' else tamanho_descomprimido(caminho)
+        self._bytes_comprimidos = 0
+
+        with abrir_csv_binario(caminho) as arquivo:
+            self.cabecalho = arquivo.readline()
+        self.posicao = len(self.cabecalho)  # Bytes já consumidos (inclui o cabeçalho)
+        self.linhas_lidas = 0
+
+    def retomar(self, posicao, linhas_lidas):
+        """Continua a leitura a partir de uma posição (em bytes) já processada"""
+        self.posicao = posicao
+        self.linhas_lidas = linhas_lidas
+
+    def __iter__(self):
+        for inicio, _, bloco in self.blocos():
+            yield self.ler_bloco(bloco, inicio)
+
+    def blocos(self):
+        """
+        Gera (linha inicial, posição final em bytes, bytes do bloco) sem
+        interpretar o conteúdo; o bloco pode ser lido depois com ler_bloco,
+        inclusive em outro processo
+        """
+        with abrir_csv_binario(self.caminho) as arquivo:
+            arquivo.seek(self.posicao)
+
+            while True:
+                linhas = list(itertools.islice(arquivo, self.linhas_por_bloco))
+                if not linhas:
+                    if self.compressao == 'gzip':
+                        self._tamanho = self.posicao
+                    break
+
+                self.posicao = arquivo.tell()
+                if self.compressao == 'gzip':
+                    self._bytes_comprimidos = arquivo.fileobj.tell()
+                inicio = self.linhas_lidas
+                self.linhas_lidas += len(linhas)
+
+                yield inicio, self.posicao, b''.join(linhas)
+
+    def ler_bloco(self, bloco, inicio=0):
+        """DataFrame de um bloco de linhas, com índice contínuo a partir de 'inicio'"""
+        try:
+            df = pd.read_csv(
+                io.BytesIO(self.cabecalho + bloco),
+                encoding=self.encoding,
+                sep=self.sep,
+                low_memory=False,
+                **self.opcoes
+            )
+        except pd.errors.ParserError as e:
+            # Aspas abertas até o fim do bloco: o campo continua no próximo
+            raise ValueError(f"Registro inválido no bloco iniciado na linha {inicio + 1}: {e}") from e
+
+        if len(df) != self._linhas_dados(bloco):
+            raise ValueError(
+                f"Campo entre aspas com quebra de linha no bloco iniciado na linha {inicio + 1}: "
+                "o arquivo não pode ser lido em blocos de linhas"
+            )
+        df.index = pd.RangeIndex(inicio, inicio + len(df))
+        return df
+
+    @staticmethod
+    def _linhas_dados(bloco):
+        """Linhas do bloco, sem as vazias (que o pandas ignora)"""
+        linhas = bloco.count(b'\n') + (not bloco.endswith(b'\n'))
+        if b'\n\n' in bloco or bloco.startswith((b'\n', b'\r\n')) or b'\n\r\n' in bloco:
+            linhas = sum(1 for linha in bloco.splitlines() if linha.strip())
+        return linhas
+
+    @property
+    def tamanho(self):
+        """Tamanho do CSV descompactado (estimado para .gz até o fim da leitura)"""
+        if self._tamanho is not None:
+            return self._tamanho
+        if not self._bytes_comprimidos:
+            return max(self.tamanho_arquivo, self.posicao)
+        return round(self.tamanho_arquivo * self.posicao / self._bytes_comprimidos)
+
+    @property
+    def fracao_lida(self):
+        """Fração do arquivo já consumida (0 a 1)"""
+        return self.fracao(self.posicao)
+
+    def fracao(self, posicao):
+        """Fração do arquivo correspondente à posição em bytes (0 a 1)"""
+        if not self.tamanho:
+            return 1.0
+        return min(posicao / self.tamanho, 1.0)
+
+    def total_estimado(self, linhas=None, posicao=None):
+        """
+        Total de linhas estimado pelos bytes por linha observados: por
+        padrão até onde o arquivo foi lido, ou até 'linhas'/'posicao'
+        """
+        linhas = self.linhas_lidas if linhas is None else linhas
+        posicao = self.posicao if posicao is None else posicao
+
+        bytes_dados = posicao - len(self.cabecalho)
+        if not linhas or bytes_dados <= 0:
+            return None
+        restante = max(self.tamanho - posicao, 0)
+        return linhas + round(restante * linhas / bytes_dados)
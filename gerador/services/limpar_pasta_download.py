@@ -1,16 +1,30 @@
 import time, os 
 from gerador.config import Config
+from .cache_resultados import CacheResultados
+from .armazem_linhas import ArmazemLinhas
+from .armazem_jobs import armazem_jobs
 
 
 def limpar_arquivos_antigos():
-    """Limpa arquivos com mais de 1 hora na pasta de downloads"""
+    """
+    Limpa arquivos com mais de 1 hora na pasta de downloads, remove do
+    cache de resultados as entradas sem arquivo ou acima da cota, expira
+    os jobs antigos e encerra com erro os jobs cujo processo não existe mais
+    """
     try:
         agora = time.time()
         for filename in os.listdir(Config.DOWNLOAD_FOLDER):
             file_path = os.path.join(Config.DOWNLOAD_FOLDER, filename)
             if os.path.isfile(file_path):
                 # Verificar se o arquivo tem mais de 1 hora
-                if agora - os.path.getctime(file_path) > 3600:
+                if agora - os.path.getctime(file_path) > Config.IDADE_MAXIMA_DOWNLOADS:
                     os.remove(file_path)
+        
+        CacheResultados().limpar()
+        ArmazemLinhas().limpar()
+        armazem = armazem_jobs()
+        armazem.limpar()
+        # Jobs interrompidos (processo dono encerrado): quem espera por eles recebe o erro
+        armazem.encerrar_orfaos()
     except Exception as e:
         print(f"Erro ao limpar arquivos antigos: {e}")
\ No newline at end of file
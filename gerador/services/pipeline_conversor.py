@@ -0,0 +1,159 @@
+import codecs, gzip, multiprocessing, queue, threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from gerador.config import Config
+from gerador.utils import processar_enderecos_otimizado
+
+# Estado de cada processo do pool, preenchido pelo initializer
+_WORKER = {}
+
+
+def formatar_chunk(df, cabecalho):
+    """Texto CSV de saída do conversor para um chunk já processado"""
+    return df.to_csv(
+        None,
+        header=cabecalho,
+        index=False,
+        sep=';',
+        quoting=1,
+        quotechar='"',
+        na_rep=''
+    )
+
+
+def codificar_chunk(texto, primeiro, saida_gzip=False):
+    """
+    Bytes de saída de um chunk em utf-8-sig (BOM só no primeiro). Com
+    'saida_gzip' cada chunk vira um membro gzip independente; membros
+    concatenados formam um .gz válido e o arquivo pode ser cortado entre
+    chunks (checkpoint) sem corromper o que já foi gravado.
+    """
+    dados = (codecs.BOM_UTF8 if primeiro else b'') + texto.encode('utf-8')
+    if saida_gzip:
+        return gzip.compress(dados, compresslevel=Config.CONVERSOR_GZIP_NIVEL)
+    return dados
+
+
+def converter_bloco(leitor, bloco, inicio, roteiros, saida_gzip=False):
+    """
+    Lê, converte e codifica um bloco de linhas: (linhas lidas, linhas de
+    saída, bytes de saída, memória do DataFrame lido). A memória só é medida
+    no primeiro bloco.
+    """
+    chunk = leitor.ler_bloco(bloco, inicio)
+    memoria = int(chunk.memory_usage(deep=True).sum()) if inicio == 0 else None
+    chunk_processado = processar_enderecos_otimizado(chunk, *roteiros)
+    texto = formatar_chunk(chunk_processado, cabecalho=inicio == 0)
+    return len(chunk), len(chunk_processado), codificar_chunk(texto, inicio == 0, saida_gzip), memoria
+
+
+def _iniciar_worker(leitor, roteiros, saida_gzip):
+    """Recebe uma única vez por processo o leitor e os roteiros"""
+    _WORKER.update(leitor=leitor, roteiros=roteiros, saida_gzip=saida_gzip)
+
+
+def _converter_bloco_worker(bloco, inicio):
+    """Executado em um processo do pool"""
+    return converter_bloco(_WORKER['leitor'], bloco, inicio, _WORKER['roteiros'],
+                           _WORKER['saida_gzip'])
+
+
+def converter_blocos(leitor, roteiros, workers=1, saida_gzip=False):
+    """
+    Converte o arquivo do leitor bloco a bloco, gerando na ordem de entrada
+    (linhas lidas, linhas de saída, posição final em bytes, bytes de saída,
+    memória) de cada bloco. A codificação (e a compressão gzip) também roda nos workers.
+
+    O tamanho dos blocos segue leitor.linhas_por_bloco no momento da
+    leitura, e pode ser alterado durante a conversão.
+
+    Com mais de um worker roda como pipeline: uma thread lê os blocos brutos
+    para uma fila limitada, o pool de processos lê e converte cada bloco e
+    os resultados são entregues na ordem de envio. No máximo 2 blocos por
+    worker ficam na fila e outros 2 por worker em processamento.
+    """
+    if workers <= 1:
+        for inicio, posicao, bloco in leitor.blocos():
+            linhas, linhas_saida, dados, memoria = converter_bloco(leitor, bloco, inicio, roteiros, saida_gzip)
+            yield linhas, linhas_saida, posicao, dados, memoria
+        return
+
+    yield from _converter_blocos_paralelo(leitor, roteiros, workers, saida_gzip)
+
+
+def _contexto_processos():
+    """
+    Contexto dos processos do pool (Config.CONVERSOR_INICIO_PROCESSOS). O
+    padrão é forkserver: o servidor tem threads (agendador, SSE) e um fork
+    copiaria locks mantidos por elas. Onde o método não existe, usa spawn.
+    """
+    metodo = Config.CONVERSOR_INICIO_PROCESSOS
+    if metodo not in multiprocessing.get_all_start_methods():
+        metodo = 'spawn'
+    return multiprocessing.get_context(metodo)
+
+
+def _converter_blocos_paralelo(leitor, roteiros, workers, saida_gzip):
+    """Leitor (thread) -> fila limitada -> pool de processos -> saída ordenada"""
+    fila = queue.Queue(maxsize=workers * 2)
+    parar = threading.Event()
+    FIM = object()
+
+    def colocar(item):
+        # Desiste se o consumidor parou (erro ou gerador fechado)
+        while not parar.is_set():
+            try:
+                fila.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def ler():
+        try:
+            for item in leitor.blocos():
+                if not colocar(item):
+                    return
+            colocar(FIM)
+        except Exception as e:
+            colocar(e)
+
+    leitor_thread = threading.Thread(target=ler, daemon=True)
+    leitor_thread.start()
+
+    pendentes = deque()
+    fim_leitura = False
+    try:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=_contexto_processos(),
+                                 initializer=_iniciar_worker,
+                                 initargs=(leitor, roteiros, saida_gzip)) as executor:
+            def enviar_proxima():
+                nonlocal fim_leitura
+                if fim_leitura:
+                    return
+                item = fila.get()
+                if item is FIM:
+                    fim_leitura = True
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                inicio, posicao, bloco = item
+                pendentes.append((posicao, executor.submit(_converter_bloco_worker, bloco, inicio)))
+
+            try:
+                for _ in range(workers * 2):
+                    enviar_proxima()
+
+                # Os blocos são entregues na ordem de envio, o que preserva a ordem das linhas
+                while pendentes:
+                    posicao, futuro = pendentes.popleft()
+                    linhas, linhas_saida, dados, memoria = futuro.result()
+                    enviar_proxima()
+                    yield linhas, linhas_saida, posicao, dados, memoria
+            finally:
+                # Em caso de erro não espera os blocos que ainda não começaram
+                for _, futuro in pendentes:
+                    futuro.cancel()
+    finally:
+        parar.set()
+        leitor_thread.join()
@@ -1,57 +1,134 @@
-import os, shutil, zipfile
+import os, time
 import pandas as pd
 from datetime import datetime
-from .gerar_xml import GeradorXml
-from gerador.utils import obter_codigo_complemento, extrair_numero_argumento
+from .gerar_xml_paralelo import gerar_xmls
+from .escritor_zip import EscritorZipXml, gerar_zip_streaming
+from .armazem_linhas import gerar_xmls_incremental
+from .agendador_jobs import cota_do_job
+from gerador.utils import resolver_complementos, update_progress
 from gerador.config import Config
+from gerador.csv_profile import CsvProfile
 
-def processar_csv(arquivo_path):
-    global LOG_COMPLEMENTOS
-    global ERRO_COMPLEMENTO2
-    global ERRO_COMPLEMENTO3
-    ERRO_COMPLEMENTO2 = False
-    ERRO_COMPLEMENTO3 = False
-
-
-    try:
-        encodings = ['utf-8', 'latin-1', 'iso-8859-1', 'cp1252']
-        for encoding in encodings:
-            try:
-                df = pd.read_csv(arquivo_path, sep=';', encoding=encoding)
-                # print(f"Arquivo lido com encoding: {encoding}")
-                break 
-            except UnicodeDecodeError:
-                continue
-        else:
-            df = pd.read_csv(arquivo_path, sep=';')
-    except Exception as e:
-        raise Exception(f"Erro ao ler o arquivo CSV: {e}")
+def _preparar(arquivo_path, perfil):
+    """Lê o CSV (se necessário) e define o nome base do ZIP"""
+    if perfil is None:
+        try:
+            perfil = CsvProfile.carregar(arquivo_path)
+        except ValueError as e:
+            raise Exception(f"Erro ao ler o arquivo CSV: {e}")
+    df = perfil.df
 
     if len(df) == 0:
         raise Exception("O arquivo CSV está vazio")
 
     estacao = df['ESTACAO_ABASTECEDORA'].iloc[0] if 'ESTACAO_ABASTECEDORA' in df.columns else 'DESCONHECIDA'
     diretorio_principal = f'moradias_xml_{estacao}_{datetime.now().strftime("%Y%m%d%H%M%S")}'
-    os.makedirs(diretorio_principal, exist_ok=True)
+    return perfil, df, estacao, diretorio_principal
+
+def _xmls(df, estacao, complemento_vazio, motor, incremental, estatisticas):
+    """Gera os XMLs em ordem, reaproveitando as linhas inalteradas se 'incremental'"""
+    if incremental is None:
+        incremental = Config.XML_INCREMENTAL
+
+    if not incremental:
+        estatisticas.update(reutilizadas=0, regeneradas=len(df))
+        return gerar_xmls(df, complemento_vazio, motor=motor)
+
+    # Mesma data nos XMLs novos e nos reaproveitados
+    data = datetime.now().strftime('%Y%m%d%H%M%S')
+    return gerar_xmls_incremental(
+        df, estacao, complemento_vazio,
+        lambda df_alterado: gerar_xmls(df_alterado, complemento_vazio, data=data, motor=motor),
+        estatisticas,
+        data=data
+    )
+
+def _opcoes_zip(df, compressao):
+    """Estratégia de compressão do job e número de threads de deflate"""
+    compressao = compressao or Config.ZIP_COMPRESSAO
+    threads = cota_do_job(Config.ZIP_THREADS) if len(df) >= Config.ZIP_MIN_LINHAS_PARALELO else 1
+    return compressao, threads
+
+def processar_csv(arquivo_path, perfil=None, motor=None, incremental=None, compressao=None):
+    global ERRO_COMPLEMENTO2
+    global ERRO_COMPLEMENTO3
+    ERRO_COMPLEMENTO2 = False
+    ERRO_COMPLEMENTO3 = False
 
-    pastas_criadas = []
-    log_processamento = []
+    perfil, df, estacao, diretorio_principal = _preparar(arquivo_path, perfil)
+    zip_filename = os.path.join(Config.DOWNLOAD_FOLDER, f'{diretorio_principal}.zip')
 
-    for i, (index, linha) in enumerate(df.iterrows(), 1):
-         # Verifica se a coluna COMPLEMENTO3 e COMPLEMENTO2 estão totalmente vazias
-        coluna_complemento_2_vazia = df['COMPLEMENTO3'].isna().all() or (df['COMPLEMENTO3'].astype(str).str.strip() == '').all()
-        
-        nome_pasta = f'moradia{i}'
-        caminho_pasta = os.path.join(diretorio_principal, nome_pasta)
-        os.makedirs(caminho_pasta, exist_ok=True)
-        pastas_criadas.append(caminho_pasta)
+    # Verifica se a coluna COMPLEMENTO3 está totalmente vazia (calculado uma vez no perfil)
+    coluna_complemento_2_vazia = perfil.coluna_vazia('COMPLEMENTO3')
 
-        comp1 = linha['COMPLEMENTO'] if 'COMPLEMENTO' in linha else ''
-        comp2 = linha['COMPLEMENTO2'] if 'COMPLEMENTO2' in linha else ''
-        resultado = linha['RESULTADO'] if 'RESULTADO' in linha else ''
+    vazios = [''] * len(df)
+    complementos1 = df['COMPLEMENTO'].tolist() if 'COMPLEMENTO' in df.columns else vazios
+    complementos2 = df['COMPLEMENTO2'].tolist() if 'COMPLEMENTO2' in df.columns else vazios
+    resultados = df['RESULTADO'].tolist() if 'RESULTADO' in df.columns else vazios
 
-        xml_content = GeradorXml(linha, i, coluna_complemento_2_vazia).gerar_xml()
+    estatisticas = {}
+    xmls = _xmls(df, estacao, coluna_complemento_2_vazia, motor, incremental, estatisticas)
+
+    escritor = EscritorZipXml(zip_filename, *_opcoes_zip(df, compressao))
+    try:
+        _gerar_entradas(escritor, xmls, complementos1, complementos2, resultados,
+                        coluna_complemento_2_vazia, total=len(df))
+    finally:
+        escritor.fechar()
+
+    log_processamento = [
+        f"♻️ Linhas reaproveitadas: {estatisticas['reutilizadas']} | "
+        f"🔄 Linhas regeneradas: {estatisticas['regeneradas']}",
+        '-' * 50,
+    ]
+    log_processamento += _log_complementos(df, coluna_complemento_2_vazia)
+
+    return os.path.basename(zip_filename), len(df), '\n'.join(log_processamento)
+
+
+def processar_csv_streaming(arquivo_path, perfil=None, motor=None, incremental=None, compressao=None):
+    """
+    Variante do processar_csv para download direto: retorna o nome do ZIP e
+    um gerador com os bytes do ZIP, montado enquanto os XMLs são gerados.
+    Nada é gravado em DOWNLOAD_FOLDER.
+    """
+    perfil, df, estacao, diretorio_principal = _preparar(arquivo_path, perfil)
+    xmls = _xmls(df, estacao, perfil.coluna_vazia('COMPLEMENTO3'), motor, incremental, {})
+    return f'{diretorio_principal}.zip', gerar_zip_streaming(xmls, *_opcoes_zip(df, compressao))
+
+
+def _formatar_duracao(segundos):
+    minutos, segundos = divmod(int(segundos), 60)
+    return f'{minutos}min {segundos:02d}s' if minutos else f'{segundos}s'
+
+
+def _informar_progresso(gerados, total, inicio):
+    """Publica no job atual as linhas geradas, a velocidade e o tempo restante"""
+    linhas_por_segundo = gerados / max(time.perf_counter() - inicio, 1e-9)
+    restante = (total - gerados) / linhas_por_segundo
+    update_progress(
+        f"📄 {gerados:,} de {total:,} XMLs gerados "
+        f"({linhas_por_segundo:,.0f} linhas/s, restam ~{_formatar_duracao(restante)})",
+        progress=5 + gerados / total * 90,
+        current=gerados,
+        total=total,
+        linhas_por_segundo=round(linhas_por_segundo, 1),
+        eta=round(restante, 1)
+    )
+
+
+def _gerar_entradas(escritor, xmls, complementos1, complementos2, resultados,
+                    coluna_complemento_2_vazia, total=None):
+    """
+    Grava cada XML no ZIP e registra o log dos complementos. Com 'total',
+    informa o progresso a cada Config.XML_PROGRESSO_LINHAS linhas.
+    """
+    global LOG_COMPLEMENTOS
+    global ERRO_COMPLEMENTO2
+    global ERRO_COMPLEMENTO3
 
+    inicio = time.perf_counter()
+    for i, (xml_content, comp1, comp2, resultado) in enumerate(zip(xmls, complementos1, complementos2, resultados), 1):
         # validação dos complementos
         if comp1 == '' or pd.isna(comp1):
             ERRO_COMPLEMENTO2 = True
@@ -75,39 +152,35 @@ def processar_csv(arquivo_path):
             LOG_COMPLEMENTOS = "✅(XML) com três complementos gerado com sucesso! Agora é só fazer o download do zip!"
 
 
-        caminho_xml = os.path.join(caminho_pasta, f'{nome_pasta}.xml')
-        with open(caminho_xml, 'wb') as f:
-            f.write(xml_content)
-
-        if i % 10 == 0 or i == 1:
-            codigo1 = obter_codigo_complemento(comp1)
-            codigo2 = obter_codigo_complemento(comp2)
-            arg1 = extrair_numero_argumento(comp1)
-            arg2 = extrair_numero_argumento(comp2)
-            log_processamento.append(f'Registro {i}:')
-
-            if coluna_complemento_2_vazia:
-                log_processamento.append(f'  COMP1("{comp1}" → código:{codigo1} argumento:"{arg1}")')
-                log_processamento.append(f'  COMP2("{comp2}" → código:{codigo2} argumento:"{arg2}")')
-                log_processamento.append('-' * 50)
-                
-            else:
-                codigo3 = obter_codigo_complemento(resultado)
-                arg3 = extrair_numero_argumento(resultado)
-                log_processamento.append(f'  COMP1("{comp1}" → código:{codigo1} argumento:"{arg1}")')
-                log_processamento.append(f'  COMP2("{comp2}" → código:{codigo2} argumento:"{arg2}")')
-                log_processamento.append(f'  COMP3("{resultado}" → código:{codigo3} argumento:"{arg3}")')
-                log_processamento.append('-' * 50)
-          
+        escritor.adicionar(i, xml_content)
+        if total and (i % Config.XML_PROGRESSO_LINHAS == 0 or i == total):
+            _informar_progresso(i, total, inicio)
 
-    zip_filename = os.path.join(Config.DOWNLOAD_FOLDER, f'{diretorio_principal}.zip')
-    with zipfile.ZipFile(zip_filename, 'w', zipfile.ZIP_DEFLATED) as zipf:
-        for pasta in pastas_criadas:
-            for root, dirs, files in os.walk(pasta):
-                for file in files:
-                    file_path = os.path.join(root, file)
-                    arcname = os.path.relpath(file_path, diretorio_principal)
-                    zipf.write(file_path, arcname)
-
-    shutil.rmtree(diretorio_principal)
-    return os.path.basename(zip_filename), len(df), '\n'.join(log_processamento) 
+
+def _log_complementos(df, coluna_complemento_2_vazia):
+    """Monta o log dos complementos do 1º registro e de cada 10º registro"""
+    amostra = [i for i in range(1, len(df) + 1) if i % 10 == 0 or i == 1]
+    linhas = df.iloc[[i - 1 for i in amostra]]
+
+    def coluna(nome):
+        if nome in linhas.columns:
+            valores = linhas[nome].reset_index(drop=True)
+        else:
+            valores = pd.Series([''] * len(linhas), dtype=object)
+        codigos, argumentos = resolver_complementos(valores)
+        return valores.tolist(), codigos.tolist(), argumentos.tolist()
+
+    comp1, codigos1, args1 = coluna('COMPLEMENTO')
+    comp2, codigos2, args2 = coluna('COMPLEMENTO2')
+    comp3, codigos3, args3 = coluna('RESULTADO')
+
+    log_processamento = []
+    for j, i in enumerate(amostra):
+        log_processamento.append(f'Registro {i}:')
+        log_processamento.append(f'  COMP1("{comp1[j]}" → código:{codigos1[j]} argumento:"{args1[j]}")')
+        log_processamento.append(f'  COMP2("{comp2[j]}" → código:{codigos2[j]} argumento:"{args2[j]}")')
+        if not coluna_complemento_2_vazia:
+            log_processamento.append(f'  COMP3("{comp3[j]}" → código:{codigos3[j]} argumento:"{args3[j]}")')
+        log_processamento.append('-' * 50)
+
+    return log_processamento
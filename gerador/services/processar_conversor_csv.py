@@ -2,21 +2,28 @@ import os
 from datetime import datetime
 from gerador.utils import carregar_roteiros, processar_enderecos_otimizado
 from gerador.config import Config
+from gerador.schema_csv import opcoes_leitura_conversor, detectar_formato_conversor
+from gerador.formato_csv import abrir_csv_binario
 import pandas as pd
 
-def processar_conversor_csv(arquivo_path):
-    """Processa o arquivo CSV para conversão"""
+def processar_conversor_csv(arquivo_path, formato=None, saida_gzip=None):
+    """Processa o arquivo CSV (.csv, .csv.gz ou .zip) para conversão"""
     try:
         print(f"📂 Carregando {arquivo_path}...")
-        
-        # Carrega o CSV
-        df_enderecos = pd.read_csv(
-            arquivo_path,
-            encoding='latin-1',
-            sep='|',
-            engine='c',
-            low_memory=False
-        )
+        if saida_gzip is None:
+            saida_gzip = Config.CONVERSOR_SAIDA_GZIP
+        
+        # Carrega o CSV com o encoding/delimitador detectados no upload
+        formato = formato or detectar_formato_conversor(arquivo_path)
+        with abrir_csv_binario(arquivo_path) as arquivo:
+            df_enderecos = pd.read_csv(
+                arquivo,
+                encoding=formato.encoding,
+                sep=formato.delimitador,
+                engine='c',
+                low_memory=False,
+                **opcoes_leitura_conversor()
+            )
         
         print(f"✅ CSV carregado: {len(df_enderecos):,} linhas")
         
@@ -29,7 +36,8 @@ def processar_conversor_csv(arquivo_path):
         df_final = processar_enderecos_otimizado(df_enderecos, df_roteiro_aparecida, df_roteiro_goiania)
         
         # Gera nome do arquivo
-        nome_arquivo = f"Enderecos_Totais_CO_Convertido_{datetime.now().strftime('%Y%m%d%H%M%S')}.csv"
+        extensao = '.csv.gz' if saida_gzip else '.csv'
+        nome_arquivo = f"Enderecos_Totais_CO_Convertido_{datetime.now().strftime('%Y%m%d%H%M%S')}{extensao}"
         caminho_arquivo = os.path.join(Config.DOWNLOAD_FOLDER, nome_arquivo)
         
         # Salva o arquivo
@@ -40,7 +48,8 @@ def processar_conversor_csv(arquivo_path):
             sep=';',
             quoting=1,
             quotechar='"',
-            na_rep=''
+            na_rep='',
+            compression={'method': 'gzip', 'compresslevel': Config.CONVERSOR_GZIP_NIVEL} if saida_gzip else None
         )
         
         print(f"✅ Arquivo convertido salvo: {nome_arquivo}")
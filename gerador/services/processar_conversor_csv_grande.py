@@ -1,15 +1,60 @@
-import pandas as pd
 from datetime import datetime
-from gerador.utils import update_progress, carregar_roteiros, processar_enderecos_otimizado
+from gerador.utils import update_progress, carregar_roteiros
 from gerador.config import Config
-import os
+from gerador.schema_csv import opcoes_leitura_conversor, detectar_formato_conversor
+from gerador.services.leitor_csv import LeitorCsvBlocos
+from gerador.services.pipeline_conversor import converter_blocos
+from gerador.services.tamanho_chunk import TamanhoChunkAdaptativo
+from gerador.services.checkpoint_conversor import CheckpointConversor, TravaConversao
+from gerador.services.cache_resultados import CacheResultados
+from gerador.services.agendador_jobs import cota_do_job
+import os, time
 
 
-def processar_conversor_csv_grande(arquivo_path):
-    """Processa o arquivo CSV para conversão - OTIMIZADO PARA ARQUIVOS GRANDES"""
+def processar_conversor_csv_grande(arquivo_path, formato=None, chave=None, saida_gzip=None):
+    """
+    Processa o arquivo CSV para conversão - OTIMIZADO PARA ARQUIVOS GRANDES
+
+    Aceita .csv, .csv.gz e .zip (descompactados em fluxo). Com 'saida_gzip'
+    (padrão: Config.CONVERSOR_SAIDA_GZIP) o resultado é um .csv.gz gravado
+    chunk a chunk.
+
+    A saída parcial e o checkpoint ficam em DOWNLOAD_FOLDER com o nome
+    derivado da 'chave' do upload (CacheResultados.chave); se a conversão
+    for interrompida, um novo job para o mesmo arquivo continua do último
+    chunk gravado. Uma trava por chave impede que dois jobs do mesmo arquivo
+    gravem a mesma saída: o segundo espera o primeiro e reaproveita o
+    resultado (ou retoma do checkpoint, se o primeiro falhar).
+    """
+    trava = None
     try:
         update_progress("📂 Iniciando carregamento do arquivo...", progress=5, status='processing')
         
+        # Saída parcial identificada pelo upload, com o checkpoint ao lado
+        if saida_gzip is None:
+            saida_gzip = Config.CONVERSOR_SAIDA_GZIP
+        extensao = '.csv.gz' if saida_gzip else '.csv'
+        cache = CacheResultados()
+        chave = chave or cache.chave(arquivo_path, 'conversor', gzip=saida_gzip)
+        caminho_parcial = os.path.join(Config.DOWNLOAD_FOLDER, f"Enderecos_Totais_CO_Convertido_{chave[:16]}.parcial{extensao}")
+        checkpoint = CheckpointConversor(caminho_parcial, chave)
+        
+        # A trava fica em .cache, fora do alcance do limpar_arquivos_antigos
+        trava = TravaConversao(os.path.join(Config.DOWNLOAD_FOLDER, '.cache', f"conversor_{chave[:16]}.lock"))
+        if not trava.adquirir(bloquear=False):
+            update_progress("⏳ Este arquivo já está sendo convertido por outro job; aguardando...", progress=5)
+            trava.adquirir()
+            em_cache = cache.obter(chave)
+            if em_cache:
+                update_progress(
+                    f"✅ Conversão concluída pelo outro job! Arquivo: {em_cache['filename']}",
+                    progress=100,
+                    current=em_cache['total_registros'],
+                    total=em_cache['total_registros'],
+                    status='completed'
+                )
+                return em_cache['filename'], em_cache['total_registros']
+        
         # Verificar tamanho do arquivo
         file_size = os.path.getsize(arquivo_path) / (1024 * 1024)  # Tamanho em MB
         update_progress(f"📊 Tamanho do arquivo: {file_size:.2f} MB", progress=10)
@@ -22,86 +67,131 @@ def processar_conversor_csv_grande(arquivo_path):
         
         update_progress("✅ Roteiros carregados com sucesso", progress=20)
 
-        # Processamento em chunks para arquivos grandes
-        chunk_size = 50000  # Ajuste conforme a memória disponível
+        # Processamento em chunks para arquivos grandes: o tamanho começa em
+        # CONVERSOR_TAMANHO_CHUNK e é recalculado pelo orçamento de memória
+        # Com outros jobs rodando ao mesmo tempo, os processos são divididos entre eles
+        workers = cota_do_job(Config.CONVERSOR_WORKERS)
+        controle_chunk = TamanhoChunkAdaptativo(
+            Config.CONVERSOR_MEMORIA_MAXIMA,
+            Config.CONVERSOR_TAMANHO_CHUNK,
+            Config.CONVERSOR_CHUNK_MINIMO,
+            Config.CONVERSOR_CHUNK_MAXIMO,
+            chunks_em_memoria=1 if workers <= 1 else workers * 2
+        )
+        chunk_size = controle_chunk.tamanho
         chunks_processed = 0
-        total_rows = 0
         
-        # Primeiro passagem: contar linhas totais
-        update_progress("🔢 Contando linhas totais...", progress=25)
-        with open(arquivo_path, 'r', encoding='latin-1') as f:
-            total_rows = sum(1 for line in f) - 1  # -1 para o cabeçalho
+        # Progresso pelos bytes lidos do arquivo; o total de linhas é
+        # estimado durante a leitura, sem uma passagem só para contar
+        formato = formato or detectar_formato_conversor(arquivo_path)
+        leitor = LeitorCsvBlocos(arquivo_path, chunk_size, encoding=formato.encoding, sep=formato.delimitador,
+                                 **opcoes_leitura_conversor())
         
-        update_progress(f"📊 Total de linhas encontradas: {total_rows:,}", progress=30, total=total_rows)
-        
-        # Lista para armazenar chunks processados
-        chunks_processados = []
-        
-        # Processar em chunks
-        update_progress("🔄 Iniciando processamento em chunks...", progress=35)
-        
-        for chunk_number, chunk in enumerate(pd.read_csv(arquivo_path, 
-                                encoding='latin-1',
-                                sep='|',
-                                chunksize=chunk_size,
-                                low_memory=False), 1):
-            
-            chunks_processed += 1
-            current_row = chunk_number * chunk_size
-            if current_row > total_rows:
-                current_row = total_rows
-                
-            progress_percent = 35 + (chunk_number * 55 / (total_rows / chunk_size))
-            progress_percent = min(progress_percent, 90)
-            
+        estado = checkpoint.carregar()
+        linhas_lidas = 0
+        linhas_gravadas = 0
+        primeiro_chunk = 1
+        if estado:
+            # Descarta o que foi gravado depois do último checkpoint
+            with open(caminho_parcial, 'r+b') as f:
+                f.truncate(estado['tamanho_saida'])
+            leitor.retomar(estado['posicao'], estado['linhas'])
+            leitor.linhas_por_bloco = estado.get('linhas_por_bloco', chunk_size)
+            linhas_lidas = estado['linhas']
+            linhas_gravadas = estado.get('linhas_gravadas', linhas_lidas)
+            primeiro_chunk = estado['chunk'] + 1
             update_progress(
-                f"📦 Processando chunk {chunk_number} ({len(chunk):,} linhas)...", 
-                progress=progress_percent,
-                current=current_row
+                f"♻️ Retomando a conversão do chunk {primeiro_chunk} ({linhas_gravadas:,} linhas já gravadas)",
+                progress=35 + leitor.fracao_lida * 55
             )
-            
-            # Processa o chunk
-            chunk_processado = processar_enderecos_otimizado(chunk, df_roteiro_aparecida, df_roteiro_goiania)
-            chunks_processados.append(chunk_processado)
-            
-            # Limpar memória
-            del chunk
-            del chunk_processado
-            
-            update_progress(f"✅ Chunk {chunk_number} processado", progress=progress_percent)
         
-        # Combinar todos os chunks
-        update_progress("🔗 Combinando chunks processados...", progress=92)
-        df_final = pd.concat(chunks_processados, ignore_index=True)
+        # Processar em chunks, gravando cada um no arquivo final assim que
+        # fica pronto (o BOM do utf-8-sig e o cabeçalho saem uma única vez;
+        # na saída gzip cada chunk é um membro gzip próprio).
+        # Com mais de um worker, leitura, conversão e gravação rodam em pipeline
+        update_progress(f"🔄 Iniciando processamento em chunks ({workers} worker(s))...", progress=35)
+        linhas_iniciais = linhas_lidas
+        inicio = time.perf_counter()
         
-        # Gera nome do arquivo
-        nome_arquivo = f"Enderecos_Totais_CO_Convertido_{datetime.now().strftime('%Y%m%d%H%M%S')}.csv"
-        caminho_arquivo = os.path.join(Config.DOWNLOAD_FOLDER, nome_arquivo)
+        try:
+            # Ao retomar, o arquivo é aberto para acrescentar
+            with open(caminho_parcial, 'ab' if estado else 'wb') as saida:
+                roteiros = (df_roteiro_aparecida, df_roteiro_goiania)
+                for chunk_number, (linhas, linhas_saida, posicao, dados, memoria) in enumerate(
+                        converter_blocos(leitor, roteiros, workers, saida_gzip), primeiro_chunk):
+                    
+                    chunks_processed += 1
+                    saida.write(dados)
+                    linhas_lidas += linhas
+                    linhas_gravadas += linhas_saida
+                    del dados
+                    
+                    # Chunk gravado por completo: registra o ponto de retomada
+                    saida.flush()
+                    checkpoint.gravar(
+                        chunk=chunk_number,
+                        posicao=posicao,
+                        linhas=linhas_lidas,
+                        linhas_gravadas=linhas_gravadas,
+                        tamanho_saida=os.fstat(saida.fileno()).st_size,
+                        linhas_por_bloco=leitor.linhas_por_bloco
+                    )
+                    
+                    # Ajusta o tamanho dos próximos chunks lidos
+                    if memoria is not None and linhas:
+                        leitor.linhas_por_bloco = controle_chunk.observar(memoria, linhas)
+                        update_progress(
+                            f"📏 Tamanho do chunk: {leitor.linhas_por_bloco:,} linhas "
+                            f"({controle_chunk.bytes_por_linha:,.0f} bytes/linha, "
+                            f"orçamento de {Config.CONVERSOR_MEMORIA_MAXIMA / 2**20:,.0f} MB)"
+                        )
+                    rss = controle_chunk.ajustar()
+                    leitor.linhas_por_bloco = controle_chunk.tamanho
+                    if rss is not None:
+                        update_progress(
+                            f"⚠️ Memória perto do limite ({rss / 2**20:,.0f} MB): "
+                            f"chunk reduzido para {leitor.linhas_por_bloco:,} linhas"
+                        )
+                    
+                    # Sem nenhuma linha lida ainda (chunk só com linhas vazias) não há estimativa
+                    total_estimado = leitor.total_estimado(linhas_lidas, posicao)
+                    texto_total = '?' if total_estimado is None else f'{total_estimado:,}'
+                    linhas_por_segundo = (linhas_lidas - linhas_iniciais) / max(time.perf_counter() - inicio, 1e-9)
+                    progress_percent = min(35 + leitor.fracao(posicao) * 55, 90)
+                    
+                    update_progress(
+                        f"✅ Chunk {chunk_number} processado ({linhas:,} linhas, "
+                        f"{linhas_lidas:,} de ~{texto_total}, {linhas_por_segundo:,.0f} linhas/s)",
+                        progress=progress_percent,
+                        current=linhas_lidas,
+                        total=total_estimado
+                    )
+        except Exception:
+            # Sem nenhum chunk completo não há o que retomar: remove a saída parcial
+            if not checkpoint.existe() and os.path.exists(caminho_parcial):
+                os.remove(caminho_parcial)
+            raise
         
-        # Salva o arquivo em chunks também (para evitar problemas de memória)
-        update_progress("💾 Salvando arquivo final...", progress=95)
-        df_final.to_csv(
-            caminho_arquivo,
-            index=False,
-            encoding='utf-8-sig',
-            sep=';',
-            quoting=1,
-            quotechar='"',
-            na_rep='',
-            chunksize=10000  # Salva em chunks também
-        )
+        # Conversão completa: publica o arquivo final e descarta o checkpoint
+        nome_arquivo = f"Enderecos_Totais_CO_Convertido_{datetime.now().strftime('%Y%m%d%H%M%S')}{extensao}"
+        os.replace(caminho_parcial, os.path.join(Config.DOWNLOAD_FOLDER, nome_arquivo))
+        checkpoint.remover()
+        # Registrado ainda com a trava: quem espera por ela encontra o resultado
+        cache.registrar(chave, nome_arquivo, total_registros=linhas_gravadas)
+        trava.liberar(remover=True)
         
         update_progress(
             f"✅ Conversão concluída! Arquivo salvo: {nome_arquivo}", 
             progress=100, 
-            current=total_rows,
+            current=linhas_gravadas,
+            total=linhas_gravadas,
             status='completed'
         )
         
         print(f"✅ Arquivo convertido salvo: {nome_arquivo}")
-        print(f"📊 Total processado: {len(df_final):,} linhas")
+        print(f"📊 Total processado: {linhas_gravadas:,} linhas")
         
-        return nome_arquivo, len(df_final)
+        return nome_arquivo, linhas_gravadas
         
     except Exception as e:
         error_msg = f"❌ Erro no processamento: {str(e)}"
@@ -109,4 +199,7 @@ def processar_conversor_csv_grande(arquivo_path):
         print(error_msg)
         import traceback
         print(f"📋 Traceback: {traceback.format_exc()}")
-        raise Exception(f"Erro ao processar arquivo: {str(e)}")
\ No newline at end of file
+        raise Exception(f"Erro ao processar arquivo: {str(e)}")
+    finally:
+        if trava is not None:
+            trava.liberar()
\ No newline at end of file
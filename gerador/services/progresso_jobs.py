@@ -0,0 +1,227 @@
+import sqlite3, threading, time
+from collections import deque
+from contextlib import contextmanager
+from gerador.config import Config
+from gerador.services.armazem_jobs import STATUS_FINAIS, armazem_jobs
+
+# Job da thread atual, usado pelo update_progress
+_LOCAL = threading.local()
+
+
+class CanalProgresso:
+    """
+    Progresso de um job: o estado mais recente e um buffer limitado dos
+    últimos eventos, numerados em sequência.
+
+    Ler não consome eventos: cada leitor guarda a sequência do último evento
+    recebido e pede os seguintes, então vários assinantes podem acompanhar o
+    mesmo job. Se ficar para trás mais do que o buffer, recebe só o estado
+    atual.
+    """
+
+    def __init__(self, tamanho_buffer=None, persistir=None):
+        self.estado = {
+            'message': '',
+            'progress': 0,
+            'current': 0,
+            'total': 0,
+            'status': 'waiting'
+        }
+        self.sequencia = 0
+        self.finalizado_em = None
+        self._eventos = deque(maxlen=tamanho_buffer or Config.PROGRESSO_BUFFER_EVENTOS)
+        self._condicao = threading.Condition()
+        self._persistir = persistir
+        self._persistido_em = 0
+
+    def publicar(self, **campos):
+        """
+        Atualiza o estado com os campos informados e registra um evento. Com
+        'persistir', o estado também é gravado (no máximo a cada
+        Config.JOBS_INTERVALO_GRAVACAO segundos, e sempre no status final).
+        """
+        with self._condicao:
+            self.estado.update(campos)
+            self.sequencia += 1
+            sequencia, estado = self.sequencia, dict(self.estado)
+            self._eventos.append((sequencia, estado))
+            if estado['status'] in STATUS_FINAIS and self.finalizado_em is None:
+                self.finalizado_em = time.time()
+            self._condicao.notify_all()
+
+            # Decidido com o lock: publicações simultâneas não gravam as duas
+            agora = time.monotonic()
+            persistir = self._persistir and (estado['status'] in STATUS_FINAIS
+                                             or agora - self._persistido_em >= Config.JOBS_INTERVALO_GRAVACAO)
+            if persistir:
+                self._persistido_em = agora
+
+        # A gravação em si fica fora do lock, para não atrasar os leitores
+        if persistir:
+            self._persistir(sequencia, estado)
+
+    def eventos(self, desde=0, timeout=None):
+        """
+        Eventos com sequência maior que 'desde', como (sequência, estado);
+        espera até 'timeout' segundos por um novo. Lista vazia no timeout.
+        """
+        with self._condicao:
+            self._condicao.wait_for(lambda: self.sequencia > desde, timeout)
+            if self.sequencia <= desde:
+                return []
+            if not self._eventos or self._eventos[0][0] > desde + 1:
+                # Leitor atrasado (ou novo): parte do estado atual
+                return [(self.sequencia, dict(self.estado))]
+            return [(sequencia, estado) for sequencia, estado in self._eventos if sequencia > desde]
+
+    def acompanhar(self, desde=0, eventos_por_segundo=None, espera=30):
+        """
+        Eventos para um assinante (SSE), no máximo 'eventos_por_segundo'
+        (Config.PROGRESSO_EVENTOS_POR_SEGUNDO). As atualizações que chegam
+        dentro do intervalo são agrupadas em um evento só, com o estado mais
+        recente e, em 'mensagens', as mensagens de todas elas.
+
+        Gera (sequência, estado), ou None após 'espera' segundos sem
+        novidade; termina depois de entregar o status final.
+        """
+        intervalo = 1 / (eventos_por_segundo or Config.PROGRESSO_EVENTOS_POR_SEGUNDO)
+        proximo_envio = 0
+        while not (self.finalizado and desde >= self.sequencia):
+            atraso = proximo_envio - time.monotonic()
+            if atraso > 0:
+                time.sleep(atraso)
+
+            eventos = self.eventos(desde, timeout=espera)
+            if not eventos:
+                yield None
+                continue
+
+            mensagens = []
+            for _, estado in eventos:
+                if estado['message'] and (not mensagens or mensagens[-1] != estado['message']):
+                    mensagens.append(estado['message'])
+            desde, estado = eventos[-1]
+            yield desde, dict(estado, mensagens=mensagens)
+            proximo_envio = time.monotonic() + intervalo
+
+    @property
+    def finalizado(self):
+        return self.finalizado_em is not None
+
+
+class CanalArmazenado:
+    """
+    Canal de um job executado por outro processo: o progresso é lido do
+    ArmazemJobs. Só para assinantes; não há buffer, cada leitura traz o
+    último estado gravado.
+    """
+
+    def __init__(self, job_id, armazem):
+        self.job_id = job_id
+        self.armazem = armazem
+
+    @property
+    def estado(self):
+        registro = self.armazem.progresso(self.job_id)
+        return registro[1] if registro else {}
+
+    def acompanhar(self, desde=0, eventos_por_segundo=None, espera=30):
+        """Mesma interface do CanalProgresso.acompanhar, consultando o armazém"""
+        intervalo = 1 / (eventos_por_segundo or Config.PROGRESSO_EVENTOS_POR_SEGUNDO)
+        ultimo_envio = time.monotonic()
+        while True:
+            registro = self.armazem.progresso(self.job_id)
+            if registro is None:
+                return
+            sequencia, estado = registro
+            if sequencia > desde:
+                desde = sequencia
+                yield sequencia, dict(estado, mensagens=[estado['message']] if estado['message'] else [])
+                ultimo_envio = time.monotonic()
+            elif estado['status'] in STATUS_FINAIS:
+                return
+            elif time.monotonic() - ultimo_envio >= espera:
+                yield None
+                ultimo_envio = time.monotonic()
+            time.sleep(intervalo)
+
+
+class RegistroProgresso:
+    """
+    Canais de progresso por job (process_id). Canais de jobs encerrados há
+    mais de Config.PROGRESSO_RETENCAO segundos são descartados a cada job novo.
+
+    Com 'armazem' (função que retorna o ArmazemJobs, como armazem_jobs), o
+    progresso também é gravado em SQLite, e jobs de outros processos são
+    acompanhados por lá.
+    """
+
+    def __init__(self, armazem=None):
+        self._canais = {}
+        self._lock = threading.Lock()
+        self._armazem = armazem
+
+    def criar(self, job_id):
+        persistir = None
+        if self._armazem:
+            # Cada job novo também expira os jobs antigos do armazém
+            self._armazem().limpar()
+            persistir = lambda sequencia, estado: self._gravar(job_id, sequencia, estado)
+
+        with self._lock:
+            self._descartar_antigos()
+            canal = self._canais[job_id] = CanalProgresso(persistir=persistir)
+            return canal
+
+    def _gravar(self, job_id, sequencia, estado):
+        # Falha ao gravar não interrompe o job: os assinantes locais seguem recebendo
+        try:
+            self._armazem().gravar_progresso(job_id, sequencia, estado)
+        except sqlite3.Error as e:
+            print(f"⚠️ Erro ao gravar o progresso do job {job_id}: {e}")
+
+    def obter(self, job_id):
+        """Canal do job: o local, ou o do armazém se o job rodar em outro processo"""
+        if job_id is None:
+            return None
+        with self._lock:
+            canal = self._canais.get(job_id)
+        if canal is None and self._armazem:
+            armazem = self._armazem()
+            if armazem.progresso(job_id) is not None:
+                canal = CanalArmazenado(job_id, armazem)
+        return canal
+
+    def remover(self, job_id):
+        with self._lock:
+            self._canais.pop(job_id, None)
+        if self._armazem:
+            self._armazem().remover(job_id)
+
+    def _descartar_antigos(self):
+        limite = time.time() - Config.PROGRESSO_RETENCAO
+        for job_id in [job_id for job_id, canal in self._canais.items()
+                       if canal.finalizado and canal.finalizado_em < limite]:
+            del self._canais[job_id]
+
+    def __len__(self):
+        return len(self._canais)
+
+
+@contextmanager
+def contexto_job(job_id):
+    """Associa a thread atual ao job: o update_progress publica no canal dele"""
+    anterior = getattr(_LOCAL, 'job_id', None)
+    _LOCAL.job_id = job_id
+    try:
+        yield
+    finally:
+        _LOCAL.job_id = anterior
+
+
+def job_atual():
+    return getattr(_LOCAL, 'job_id', None)
+
+
+# Registro único do processo, com o progresso gravado no ArmazemJobs do processo
+PROGRESSO_JOBS = RegistroProgresso(armazem=armazem_jobs)
@@ -0,0 +1,87 @@
+import multiprocessing, os
+
+
+def _rss_processo(pid='self'):
+    """Memória residente (RSS) de um processo em bytes, lida de /proc/<pid>/statm"""
+    with open(f'/proc/{pid}/statm') as f:
+        paginas = int(f.read().split()[1])
+    return paginas * os.sysconf('SC_PAGE_SIZE')
+
+
+def rss_atual(filhos=True):
+    """
+    RSS do processo em bytes, somado por padrão ao dos processos filhos do
+    multiprocessing (os workers do pool de conversão). None fora do Linux.
+    """
+    try:
+        rss = _rss_processo()
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+    if filhos:
+        for processo in multiprocessing.active_children():
+            try:
+                rss += _rss_processo(processo.pid)
+            except (OSError, ValueError, IndexError):
+                continue  # Filho que terminou durante a leitura
+    return rss
+
+
+class TamanhoChunkAdaptativo:
+    """
+    Calcula o número de linhas por chunk a partir de um orçamento de memória.
+
+    Depois do primeiro chunk, o tamanho é recalculado pelos bytes por linha
+    observados no DataFrame lido e pela memória ainda livre no orçamento.
+    Durante a execução, se o RSS do processo e dos workers chegar perto do
+    limite, o tamanho é reduzido pela metade; com folga de novo, volta a
+    crescer (dobrando) até o tamanho calculado pelo observar.
+    """
+
+    # Cópias de um chunk em memória ao mesmo tempo: DataFrame lido,
+    # DataFrame convertido e texto de saída
+    FATOR_MEMORIA = 3
+    LIMITE_RSS = 0.9  # Fração do orçamento que dispara a redução
+    LIMITE_CRESCIMENTO = 0.6  # Abaixo desta fração o tamanho volta a crescer
+
+    def __init__(self, orcamento, inicial, minimo, maximo, chunks_em_memoria=1):
+        self.orcamento = orcamento
+        self.minimo = minimo
+        self.maximo = maximo
+        self.chunks_em_memoria = chunks_em_memoria
+        self.tamanho = self._limitar(inicial)
+        self.alvo = self.tamanho
+        self.bytes_por_linha = None
+
+    def _limitar(self, tamanho):
+        return max(self.minimo, min(self.maximo, int(tamanho)))
+
+    def observar(self, memoria, linhas):
+        """
+        Recalcula o tamanho pela memória de um chunk lido com 'linhas'
+        linhas; um chunk vazio não muda o tamanho
+        """
+        if not linhas:
+            return self.tamanho
+        self.bytes_por_linha = max(memoria / linhas, 1)
+        livre = self.orcamento - (rss_atual() or 0)
+        por_chunk = livre / (self.chunks_em_memoria * self.FATOR_MEMORIA)
+        self.tamanho = self.alvo = self._limitar(por_chunk / self.bytes_por_linha)
+        return self.tamanho
+
+    def ajustar(self):
+        """
+        Reduz o tamanho se o RSS estiver perto do orçamento (retorna o RSS
+        quando reduzir) ou o aproxima de volta do alvo se houver folga
+        """
+        rss = rss_atual()
+        if rss is None:
+            return None
+        if rss >= self.LIMITE_RSS * self.orcamento:
+            if self.tamanho <= self.minimo:
+                return None
+            self.tamanho = self._limitar(self.tamanho // 2)
+            return rss
+        if rss < self.LIMITE_CRESCIMENTO * self.orcamento and self.tamanho < self.alvo:
+            self.tamanho = min(self.tamanho * 2, self.alvo)
+        return None
@@ -0,0 +1,102 @@
+class TemplateXmlEdificio:
+    """
+    Motor de geração por template: o layout fixo do XML de edificio é
+    compilado uma única vez em uma string de formato com um espaço para cada
+    campo variável. Cada documento é então gerado com um único format +
+    encode, com o mesmo escape e a mesma serialização do ElementTree
+    (incluindo '<tag />' para textos vazios).
+    """
+
+    CABECALHO = '<?xml version="1.0" encoding="UTF-8"?>'
+
+    CAMPOS_EDIFICIO = ['nEdificio', 'coordX', 'coordY', 'codigoZona', 'nomeZona', 'localidade']
+    CAMPOS_ENDERECO = ['id', 'logradouro', 'numero_fachada', 'id_complemento1', 'argumento1',
+                       'id_complemento2', 'argumento2']
+    CAMPOS_COMPLEMENTO3 = ['id_complemento3', 'argumento3']
+    CAMPOS_ENDERECO_FINAL = ['cep', 'bairro', 'id_roteiro', 'id_localidade', 'cod_lograd']
+
+    def __init__(self, valores_padrao, data):
+        self.valores_padrao = valores_padrao
+        self.data = data
+
+        # Um formato com e outro sem o complemento 3
+        self._formatos = {
+            False: self._compilar(com_complemento3=False),
+            True: self._compilar(com_complemento3=True),
+        }
+
+    @staticmethod
+    def escapar(texto):
+        """Mesmo escape de texto do ElementTree (&, < e >)"""
+        if '&' in texto:
+            texto = texto.replace('&', '&amp;')
+        if '<' in texto:
+            texto = texto.replace('<', '&lt;')
+        if '>' in texto:
+            texto = texto.replace('>', '&gt;')
+        return texto
+
+    @classmethod
+    def elemento(cls, tag, valor):
+        """Serializa um elemento simples como o ElementTree faria"""
+        if valor:
+            return f'<{tag}>{cls.escapar(valor)}</{tag}>'
+        return f'<{tag} />'
+
+    def _compilar(self, com_complemento3):
+        """Monta a string de formato do documento completo"""
+        def espacos(campos):
+            return '{}' * len(campos)
+
+        def fixo(tag, valor):
+            # Escapa as chaves para o str.format
+            return self.elemento(tag, str(valor)).replace('{', '{{').replace('}', '}}')
+
+        partes = [
+            self.CABECALHO,
+            '<edificio tipo="M" versao="7.9.2">',
+            fixo('gravado', 'false'),
+            espacos(self.CAMPOS_EDIFICIO),
+            '<enderecoEdificio>',
+            espacos(self.CAMPOS_ENDERECO),
+            espacos(self.CAMPOS_COMPLEMENTO3) if com_complemento3 else '',
+            espacos(self.CAMPOS_ENDERECO_FINAL),
+            '</enderecoEdificio>',
+            '<tecnico>', fixo('id', self.valores_padrao['id_tecnico']),
+            fixo('nome', self.valores_padrao['nome_tecnico']), '</tecnico>',
+            '<empresa>', fixo('id', self.valores_padrao['id_empresa']),
+            fixo('nome', self.valores_padrao['nome_empresa']), '</empresa>',
+            fixo('data', self.data),
+            '{}',  # totalUCs
+            fixo('ocupacao', 'EDIFICACAOCOMPLETA'),
+            fixo('numPisos', '1'),
+            fixo('destinacao', 'COMERCIO'),
+            '</edificio>',
+        ]
+        return ''.join(partes)
+
+    def renderizar(self, campos):
+        """
+        Gera o XML (bytes) de uma linha a partir dos campos resolvidos por
+        GeradorXmlLote.preparar_colunas
+        """
+        elemento = self.elemento
+        valores = [
+            elemento('nEdificio', campos['nEdificio']),
+            elemento('coordX', campos['coordX']),
+            elemento('coordY', campos['coordY']),
+            elemento('codigoZona', campos['codigoZona']),
+            elemento('nomeZona', campos['codigoZona']),
+            elemento('localidade', campos['localidade']),
+        ]
+        valores.extend(elemento(tag, campos[tag]) for tag in self.CAMPOS_ENDERECO)
+
+        complemento3 = campos['complemento3']
+        if complemento3 is not None:
+            valores.append(elemento('id_complemento3', complemento3[0]))
+            valores.append(elemento('argumento3', complemento3[1]))
+
+        valores.extend(elemento(tag, campos[tag]) for tag in self.CAMPOS_ENDERECO_FINAL)
+        valores.append(elemento('totalUCs', campos['totalUCs']))
+
+        return self._formatos[complemento3 is not None].format(*valores).encode('utf-8', 'xmlcharrefreplace')
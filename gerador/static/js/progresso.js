@@ -6,6 +6,8 @@ let actionButtons, resultButton;
 let reconnectAttempts = 0;
 const maxReconnectAttempts = 5;
 let sseConnection;
+let jobId;
+let ultimoEvento = '';
 
 function initProgresso() {
     progressBar = document.getElementById('progressBar');
@@ -20,6 +22,7 @@ function initProgresso() {
     statusText = document.getElementById('statusText');
     actionButtons = document.getElementById('actionButtons');
     resultButton = document.getElementById('resultButton');
+    jobId = document.getElementById('progressoJob').dataset.jobId;
 
     sseConnection = connectSSE();
 
@@ -67,7 +70,13 @@ function updateConnectionStatus(connected) {
 function connectSSE() {
     updateConnectionStatus(false);
     
-    const eventSource = new EventSource('/progress');
+    // Cada job tem seu próprio canal de progresso
+    // Na reconexão, continua do último evento recebido
+    let url = jobId ? `/progress/${encodeURIComponent(jobId)}` : '/progress';
+    if (ultimoEvento) {
+        url += `?ultimo_evento=${encodeURIComponent(ultimoEvento)}`;
+    }
+    const eventSource = new EventSource(url);
 
     eventSource.onopen = function() {
         console.log('Conexão SSE aberta');
@@ -78,6 +87,9 @@ function connectSSE() {
     eventSource.onmessage = function(event) {
         try {
             const data = JSON.parse(event.data);
+            if (event.lastEventId) {
+                ultimoEvento = event.lastEventId;
+            }
             
             if (data.progress !== undefined) {
                 progressBar.style.width = data.progress + '%';
@@ -94,9 +106,19 @@ function connectSSE() {
             
             if (data.message) {
                 statusMessage.textContent = data.message;
-                if (data.message !== 'Aguardando...' && data.message !== 'Conectado...') {
-                    addLog(data.message);
-                }
+                // Eventos agrupados trazem todas as mensagens do intervalo
+                const mensagens = data.mensagens || [data.message];
+                mensagens.forEach(function(mensagem) {
+                    if (mensagem !== 'Aguardando...' && mensagem !== 'Conectado...') {
+                        addLog(mensagem);
+                    }
+                });
+            }
+            
+            if (data.status === 'queued') {
+                statusIcon.className = 'fas fa-hourglass-half text-warning';
+            } else if (data.status === 'processing') {
+                statusIcon.className = 'fas fa-sync-alt fa-spin';
             }
             
             if (data.status === 'completed') {
@@ -127,7 +149,7 @@ function connectSSE() {
         if (reconnectAttempts < maxReconnectAttempts) {
             reconnectAttempts++;
             addLog(`🔁 Tentativa de reconexão ${reconnectAttempts}/${maxReconnectAttempts}...`);
-            setTimeout(connectSSE, 2000);
+            setTimeout(function() { sseConnection = connectSSE(); }, 2000);
         } else {
             addLog('❌ Falha na conexão. Por favor, recarregue a página.');
             statusIcon.className = 'fas fa-exclamation-triangle text-danger';
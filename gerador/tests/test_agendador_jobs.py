@@ -0,0 +1,65 @@
+import threading
+from gerador.services import agendador_jobs
+from gerador.services.agendador_jobs import AgendadorJobs
+from gerador.services.progresso_jobs import RegistroProgresso, contexto_job, job_atual
+
+
+class TestAgendadorJobs:
+
+    def setup_method(self):
+        self.progresso = RegistroProgresso()
+        self.agendador = AgendadorJobs(workers=1, tamanho_fila=1, progresso=self.progresso)
+        self.liberar = threading.Event()
+        self.concluidos = []
+
+    def enviar(self, job_id):
+        self.progresso.criar(job_id)
+        return self.agendador.enviar(job_id, self.executar)
+
+    def executar(self):
+        self.liberar.wait(5)
+        self.concluidos.append(job_atual())
+
+    def test_fila_limitada_e_recusa(self):
+        assert self.enviar('a') == 0
+        assert self.enviar('b') == 1
+        assert self.enviar('c') is None
+
+        canal = self.progresso.obter('b')
+        assert canal.estado['status'] == 'queued'
+        assert canal.estado['posicao'] == 1
+
+        self.liberar.set()
+        self.aguardar(2)
+        assert self.concluidos == ['a', 'b']
+        assert self.agendador.estatisticas()['recusados'] == 1
+
+    def test_job_na_fila_recebe_nova_posicao(self):
+        agendador = AgendadorJobs(workers=1, tamanho_fila=2, progresso=self.progresso)
+        for job_id in ('a', 'b', 'c'):
+            self.progresso.criar(job_id)
+            agendador.enviar(job_id, self.executar)
+
+        assert self.progresso.obter('c').estado['posicao'] == 2
+        self.liberar.set()
+        self.aguardar(3)
+
+        posicoes = [estado['posicao'] for _, estado in self.progresso.obter('c').eventos(0, timeout=0)
+                    if estado['status'] == 'queued']
+        assert posicoes[0] == 2
+        assert posicoes[-1] == 1
+
+    def aguardar(self, total):
+        for _ in range(500):
+            if len(self.concluidos) == total:
+                return
+            threading.Event().wait(0.01)
+
+
+def test_cota_do_job_divide_entre_os_jobs(monkeypatch):
+    monkeypatch.setattr(agendador_jobs, 'AGENDADOR_JOBS', AgendadorJobs(workers=3, progresso=RegistroProgresso()))
+
+    assert agendador_jobs.cota_do_job(8) == 8
+    with contexto_job('job'):
+        assert agendador_jobs.cota_do_job(8) == 2
+        assert agendador_jobs.cota_do_job(2) == 1
@@ -0,0 +1,98 @@
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+from gerador.services.armazem_jobs import ArmazemJobs, armazem_jobs
+from gerador.services.progresso_jobs import CanalArmazenado, RegistroProgresso
+
+
+class TestArmazemJobs:
+
+    def setup_method(self):
+        self.caminho = os.path.join(tempfile.mkdtemp(), 'jobs.sqlite')
+        self.armazem = ArmazemJobs(self.caminho)
+
+    def test_progresso_mantem_a_sequencia_mais_recente(self):
+        self.armazem.gravar_progresso('job', 2, {'message': 'b'})
+        self.armazem.gravar_progresso('job', 1, {'message': 'a'})
+
+        assert self.armazem.progresso('job') == (2, {'message': 'b'})
+        assert self.armazem.progresso('outro') is None
+
+    def test_resultado_e_progresso_do_mesmo_job(self):
+        self.armazem.gravar_progresso('job', 1, {'message': 'a'})
+        assert self.armazem.resultado('job') is None
+
+        self.armazem.gravar_resultado('job', {'filename': 'saida.csv', 'status': 'success'})
+
+        assert self.armazem.resultado('job') == {'filename': 'saida.csv', 'status': 'success'}
+        assert self.armazem.progresso('job')[0] == 1
+
+    def test_limpar_expira_jobs_antigos(self):
+        self.armazem.gravar_resultado('job', {'status': 'success'})
+
+        self.armazem.limpar(idade_maxima=3600)
+        assert self.armazem.resultado('job') is not None
+
+        self.armazem.limpar(idade_maxima=-1)
+        assert self.armazem.resultado('job') is None
+
+    def test_job_de_outro_processo_acompanhado_pelo_armazem(self):
+        fabrica = lambda: self.armazem
+        executando = RegistroProgresso(armazem=fabrica)
+        outro_processo = RegistroProgresso(armazem=fabrica)
+
+        canal = executando.criar('job')
+        canal.publicar(message='🔧 Processando arquivo...', status='processing')
+        canal.publicar(message='✅ Concluído', progress=100, status='completed')
+
+        remoto = outro_processo.obter('job')
+        assert isinstance(remoto, CanalArmazenado)
+        assert remoto.estado['status'] == 'completed'
+
+        eventos = list(remoto.acompanhar(0, eventos_por_segundo=100))
+        assert eventos == [(2, dict(canal.estado, mensagens=['✅ Concluído']))]
+        assert list(remoto.acompanhar(2, eventos_por_segundo=100)) == []
+        assert outro_processo.obter('desconhecido') is None
+
+    def pid_encerrado(self):
+        processo = subprocess.Popen([sys.executable, '-c', 'pass'])
+        processo.wait()
+        return processo.pid
+
+    def test_encerrar_orfaos_de_processos_encerrados(self):
+        self.armazem.gravar_progresso('orfao', 3, {'message': 'a', 'status': 'processing'})
+        self.armazem.gravar_progresso('vivo', 1, {'message': 'b', 'status': 'processing'})
+        self.armazem.gravar_progresso('concluido', 1, {'message': 'c', 'status': 'completed'})
+        with sqlite3.connect(self.caminho) as conexao:
+            conexao.execute('UPDATE jobs SET dono_pid = ? WHERE job_id IN (?, ?)',
+                            (self.pid_encerrado(), 'orfao', 'concluido'))
+
+        assert self.armazem.encerrar_orfaos() == ['orfao']
+
+        sequencia, estado = self.armazem.progresso('orfao')
+        assert sequencia == 4
+        assert estado['status'] == 'error'
+        assert self.armazem.resultado('orfao')['status'] == 'error'
+        assert self.armazem.progresso('vivo')[1]['status'] == 'processing'
+        assert self.armazem.resultado('concluido') is None
+
+        # O assinante de outro processo termina com o erro em vez de esperar
+        eventos = list(CanalArmazenado('orfao', self.armazem).acompanhar(3, eventos_por_segundo=100))
+        assert [estado['status'] for _, estado in eventos] == ['error']
+
+    def test_banco_anterior_as_colunas_do_dono(self):
+        caminho = os.path.join(tempfile.mkdtemp(), 'jobs.sqlite')
+        with sqlite3.connect(caminho) as conexao:
+            conexao.execute('CREATE TABLE jobs (job_id TEXT PRIMARY KEY, sequencia INTEGER NOT NULL DEFAULT 0,'
+                            ' progresso TEXT, resultado TEXT, atualizado REAL NOT NULL)')
+
+        armazem = ArmazemJobs(caminho)
+        armazem.gravar_progresso('job', 1, {'message': 'a', 'status': 'processing'})
+
+        assert armazem.encerrar_orfaos() == []
+
+    def test_uma_instancia_por_caminho(self):
+        assert armazem_jobs(self.caminho) is armazem_jobs(self.caminho)
+        assert armazem_jobs(self.caminho) is not armazem_jobs(self.caminho + '.outro')
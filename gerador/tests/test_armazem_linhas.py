@@ -0,0 +1,81 @@
+import os
+import tempfile
+import pandas as pd
+from gerador.services.armazem_linhas import ArmazemLinhas, gerar_xmls_incremental
+
+
+def gerar_fake(df, data='20250101120000'):
+    """Gerador de teste: o XML é só o COD_SURVEY + COMPLEMENTO da linha e a data"""
+    return [f'<x>{s}|{c}<data>{data}</data></x>'.encode() for s, c in zip(df['COD_SURVEY'], df['COMPLEMENTO'])]
+
+
+class TestGerarXmlsIncremental:
+
+    def setup_method(self):
+        self.armazem = ArmazemLinhas(os.path.join(tempfile.mkdtemp(), 'linhas.sqlite'))
+        self.df = pd.DataFrame({
+            'ID_ENDERECO': [1, 2, 3],
+            'COD_SURVEY': ['S1', 'S2', 'S3'],
+            'COMPLEMENTO': ['LT 1', 'LT 2', 'LT 3'],
+        })
+
+    def executar(self, df):
+        estatisticas = {}
+        xmls = list(gerar_xmls_incremental(df, 'EST1', False, gerar_fake, estatisticas, self.armazem,
+                                           data='20250101120000'))
+        return xmls, estatisticas
+
+    def test_reaproveita_apenas_linhas_inalteradas(self):
+        primeiro, estatisticas = self.executar(self.df)
+        assert estatisticas == {'reutilizadas': 0, 'regeneradas': 3}
+
+        alterado = self.df.copy()
+        alterado.loc[1, 'COMPLEMENTO'] = 'QD 9'
+        segundo, estatisticas = self.executar(alterado)
+
+        assert estatisticas == {'reutilizadas': 2, 'regeneradas': 1}
+        assert segundo == [primeiro[0], b'<x>S2|QD 9<data>20250101120000</data></x>', primeiro[2]]
+
+    def test_estacoes_sao_independentes(self):
+        self.executar(self.df)
+
+        estatisticas = {}
+        list(gerar_xmls_incremental(self.df, 'EST2', False, gerar_fake, estatisticas, self.armazem))
+
+        assert estatisticas['reutilizadas'] == 0
+
+    def test_complemento_vazio_invalida_hash(self):
+        self.executar(self.df)
+
+        estatisticas = {}
+        list(gerar_xmls_incremental(self.df, 'EST1', True, gerar_fake, estatisticas, self.armazem))
+
+        assert estatisticas['regeneradas'] == 3
+
+    def test_reaproveitado_recebe_a_data_atual(self):
+        self.executar(self.df)
+
+        xmls = list(gerar_xmls_incremental(self.df, 'EST1', False, gerar_fake, {}, self.armazem,
+                                           data='20260101000000'))
+
+        assert xmls[0] == b'<x>S1|LT 1<data>20260101000000</data></x>'
+
+    def test_linha_expirada_entre_as_leituras_e_regenerada(self, monkeypatch):
+        self.executar(self.df)
+        ler_xmls = self.armazem.ler_xmls
+        monkeypatch.setattr(self.armazem, 'ler_xmls',
+                            lambda estacao, chaves: {c: x for c, x in ler_xmls(estacao, chaves).items()
+                                                     if c != 'ID_ENDERECO:2'})
+
+        xmls, estatisticas = self.executar(self.df)
+
+        assert estatisticas == {'reutilizadas': 2, 'regeneradas': 1}
+        assert xmls[1] == b'<x>S2|LT 2<data>20250101120000</data></x>'
+
+    def test_estacao_de_cada_linha(self):
+        df = self.df.assign(ESTACAO_ABASTECEDORA=['EST1', 'EST2', 'EST2'])
+        self.executar(df)
+
+        assert set(self.armazem.hashes_armazenados('EST1')) == {'ID_ENDERECO:1'}
+        assert set(self.armazem.hashes_armazenados('EST2')) == {'ID_ENDERECO:2', 'ID_ENDERECO:3'}
+        assert set(self.armazem.ler_xmls('EST2', ['ID_ENDERECO:2', 'ID_ENDERECO:9'])) == {'ID_ENDERECO:2'}
@@ -0,0 +1,57 @@
+import os
+import tempfile
+import time
+from gerador.services.cache_resultados import CacheResultados
+
+
+class TestCacheResultados:
+
+    def setup_method(self):
+        self.pasta = tempfile.mkdtemp()
+        self.cache = CacheResultados(self.pasta)
+
+    def criar_arquivo(self, nome, conteudo=b'dados'):
+        caminho = os.path.join(self.pasta, nome)
+        with open(caminho, 'wb') as f:
+            f.write(conteudo)
+        return caminho
+
+    def test_chave_depende_do_conteudo_e_do_tipo(self):
+        a = self.criar_arquivo('a.csv', b'x;y\n1;2\n')
+        b = self.criar_arquivo('b.csv', b'x;y\n1;2\n')
+        c = self.criar_arquivo('c.csv', b'x;y\n1;3\n')
+
+        assert CacheResultados.chave(a, 'xml') == CacheResultados.chave(b, 'xml')
+        assert CacheResultados.chave(a, 'xml') != CacheResultados.chave(c, 'xml')
+        assert CacheResultados.chave(a, 'xml') != CacheResultados.chave(a, 'conversor')
+
+    def test_registrar_e_obter(self):
+        self.criar_arquivo('resultado.zip')
+
+        self.cache.registrar('k1', 'resultado.zip', total_registros=10)
+        entrada = self.cache.obter('k1')
+
+        assert entrada['filename'] == 'resultado.zip'
+        assert entrada['total_registros'] == 10
+        assert self.cache.obter('k2') is None
+
+    def test_entrada_sem_arquivo_e_descartada(self):
+        caminho = self.criar_arquivo('resultado.zip')
+        self.cache.registrar('k1', 'resultado.zip', total_registros=1)
+
+        os.remove(caminho)
+
+        assert self.cache.obter('k1') is None
+
+    def test_limpar_respeita_cota(self):
+        self.criar_arquivo('antigo.zip', b'a' * 100)
+        self.criar_arquivo('novo.zip', b'n' * 100)
+        self.cache.registrar('antigo', 'antigo.zip')
+        time.sleep(0.01)
+        self.cache.registrar('novo', 'novo.zip')
+
+        self.cache.limpar(tamanho_maximo=150)
+
+        assert self.cache.obter('antigo') is None
+        assert not os.path.exists(os.path.join(self.pasta, 'antigo.zip'))
+        assert self.cache.obter('novo') is not None
@@ -0,0 +1,68 @@
+import os
+import tempfile
+import pandas as pd
+from gerador.services.cache_roteiros import CacheRoteiros
+
+
+class TestCacheRoteiros:
+
+    def setup_method(self):
+        self.pasta = tempfile.mkdtemp()
+        self.caminho = os.path.join(self.pasta, 'roteiro.xlsx')
+        self.gravar_roteiro([1, 2, 3])
+        self.leituras = []
+
+    def gravar_roteiro(self, valores, mtime=None):
+        pd.DataFrame({'COD_LOCALIDADE': valores}).to_csv(self.caminho, index=False)
+        if mtime is not None:
+            os.utime(self.caminho, (mtime, mtime))
+
+    def leitor(self, caminho):
+        self.leituras.append(caminho)
+        return pd.read_csv(caminho)
+
+    def test_le_uma_vez_por_processo(self):
+        cache = CacheRoteiros(leitor=self.leitor)
+
+        primeiro = cache.carregar(self.caminho)
+        segundo = cache.carregar(self.caminho)
+
+        assert primeiro is segundo
+        assert len(self.leituras) == 1
+        estatisticas = cache.estatisticas()
+        assert estatisticas['acertos'] == 1
+        assert estatisticas['falhas'] == 1
+        assert estatisticas['cargas_xlsx'] == 1
+
+    def test_recarrega_quando_mtime_muda(self):
+        cache = CacheRoteiros(leitor=self.leitor)
+        cache.carregar(self.caminho)
+
+        self.gravar_roteiro([4, 5], mtime=os.path.getmtime(self.caminho) + 10)
+        df = cache.carregar(self.caminho)
+
+        assert df['COD_LOCALIDADE'].tolist() == [4, 5]
+        assert len(self.leituras) == 2
+
+    def test_arquivo_auxiliar_evita_leitura_do_xlsx(self):
+        CacheRoteiros(leitor=self.leitor).carregar(self.caminho)
+        assert os.path.exists(self.caminho + CacheRoteiros.SUFIXO_AUXILIAR)
+
+        novo = CacheRoteiros(leitor=self.leitor)
+        df = novo.carregar(self.caminho)
+
+        assert df['COD_LOCALIDADE'].tolist() == [1, 2, 3]
+        assert len(self.leituras) == 1
+        assert novo.estatisticas()['cargas_auxiliar'] == 1
+
+    def test_indice_montado_uma_vez_por_roteiro(self):
+        pd.DataFrame({'COD_LOCALIDADE': [1], 'COD_LOGRADOURO': [2]}).to_csv(self.caminho, index=False)
+        cache = CacheRoteiros(leitor=self.leitor)
+        df = cache.carregar(self.caminho)
+
+        assert cache.indice(df) is cache.indice(df)
+        assert cache.estatisticas()['indices_montados'] == 1
+
+    def test_indice_de_roteiro_sem_chaves(self):
+        cache = CacheRoteiros(leitor=self.leitor)
+        assert cache.indice(cache.carregar(self.caminho)) is None
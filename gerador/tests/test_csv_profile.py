@@ -0,0 +1,68 @@
+import os
+import tempfile
+from gerador.csv_profile import CsvProfile
+
+
+class TestCsvProfile:
+
+    def create_test_csv(self, content: str, encoding: str = 'utf-8') -> str:
+        """Cria um arquivo CSV temporário para testes"""
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False, encoding=encoding) as f:
+            f.write(content)
+            return f.name
+
+    def test_carregar_detecta_encoding_e_delimitador(self):
+        csv_path = self.create_test_csv("COMPLEMENTO;BAIRRO\nLT 1;SÃO JOSÉ\n", encoding='latin-1')
+
+        try:
+            perfil = CsvProfile.carregar(csv_path)
+
+            assert perfil.encoding == 'latin-1'
+            assert perfil.delimitador == ';'
+            assert perfil.df['BAIRRO'].iloc[0] == 'SÃO JOSÉ'
+        finally:
+            os.unlink(csv_path)
+
+    def test_amostra_ascii_de_arquivo_cp1252(self):
+        linhas = ''.join(f'LT {i};CENTRO\n' for i in range(8000))
+        csv_path = self.create_test_csv(f"COMPLEMENTO;BAIRRO\n{linhas}LT 1;JARDIM “AMÉRICA”\n", encoding='cp1252')
+
+        try:
+            perfil = CsvProfile.carregar(csv_path)
+
+            assert perfil.encoding == 'cp1252'
+            assert perfil.df['BAIRRO'].iloc[-1] == 'JARDIM “AMÉRICA”'
+        finally:
+            os.unlink(csv_path)
+
+    def test_coluna_vazia(self):
+        csv_path = self.create_test_csv("COMPLEMENTO;COMPLEMENTO3\nLT 1;\nLT 2;  \n")
+
+        try:
+            perfil = CsvProfile.carregar(csv_path)
+
+            assert perfil.coluna_vazia('COMPLEMENTO3') == True
+            assert perfil.coluna_vazia('COMPLEMENTO') == False
+            assert perfil.coluna_vazia('INEXISTENTE') == True
+        finally:
+            os.unlink(csv_path)
+
+    def test_estatisticas_complementos(self):
+        csv_path = self.create_test_csv(
+            "COMPLEMENTO;COMPLEMENTO2;COMPLEMENTO3\n"
+            "LT 1;;\n"
+            "LT 2;QD 1;\n"
+            "LT 3;QD 2;AP 1\n"
+            "LT 4;;AP 2\n"
+            ";QD 3;\n"
+        )
+
+        try:
+            estatisticas = CsvProfile.carregar(csv_path).estatisticas_complementos()
+
+            assert estatisticas['registros_1_comp'] == 1
+            assert estatisticas['registros_2_comp'] == 1
+            assert estatisticas['registros_3_comp'] == 1
+            assert "COMPLEMENTO2 deve ser preenchida" in estatisticas['erro']
+        finally:
+            os.unlink(csv_path)
@@ -3,6 +3,7 @@ import pandas as pd
 import tempfile
 import os
 from gerador.validators.csv_validator import CSVValidator
+from gerador.csv_profile import CsvProfile
 
 class TestCSVValidator:
     
@@ -73,4 +74,36 @@ celula1|estacao1|SP|São Paulo"""
             # Mas a estrutura básica é válida
             assert "Erro ao validar CSV do conversor" not in str(result['errors'])
         finally:
-            os.unlink(csv_path)
\ No newline at end of file
+            os.unlink(csv_path)
+
+    def test_validar_com_perfil(self):
+        csv_content = """COMPLEMENTO;COMPLEMENTO2;COMPLEMENTO3
+LT 1;QD 1;
+LT 2;QD 2;"""
+
+        csv_path = self.create_test_csv(csv_content)
+
+        try:
+            perfil = CsvProfile.carregar(csv_path)
+            sucesso, mensagem = self.validator.validar(csv_path, perfil=perfil)
+
+            assert sucesso == True
+            assert "2 registros com 2 complementos" in mensagem
+        finally:
+            os.unlink(csv_path)
+
+    def test_validar_complemento_vazio(self):
+        csv_content = """COMPLEMENTO;COMPLEMENTO2;COMPLEMENTO3
+LT 1;QD 1;
+;QD 2;"""
+
+        csv_path = self.create_test_csv(csv_content)
+
+        try:
+            sucesso, mensagem = self.validator.validar(csv_path)
+
+            assert sucesso == False
+            assert "COMPLEMENTO deve estar preenchido" in mensagem
+        finally:
+            os.unlink(csv_path)
+
@@ -0,0 +1,86 @@
+import pytest
+import io
+import zipfile
+from gerador.services.escritor_zip import EscritorZipXml, gerar_zip_streaming
+
+
+class TestEscritorZipXml:
+
+    def test_adiciona_xmls_com_o_caminho_moradia(self):
+        destino = io.BytesIO()
+
+        with EscritorZipXml(destino) as escritor:
+            escritor.adicionar(1, b'<a/>')
+            escritor.adicionar(2, b'<b/>')
+
+        with zipfile.ZipFile(destino) as zipf:
+            assert zipf.namelist() == ['moradia1/moradia1.xml', 'moradia2/moradia2.xml']
+            assert zipf.read('moradia2/moradia2.xml') == b'<b/>'
+        assert escritor.total == 2
+
+    def test_zip_streaming_valido(self):
+        xmls = [f'<x>{i}</x>'.encode() for i in range(1, 4)]
+
+        pedacos = list(gerar_zip_streaming(iter(xmls)))
+
+        assert len(pedacos) > len(xmls)
+        with zipfile.ZipFile(io.BytesIO(b''.join(pedacos))) as zipf:
+            assert zipf.namelist() == [f'moradia{i}/moradia{i}.xml' for i in range(1, 4)]
+            assert zipf.read('moradia3/moradia3.xml') == b'<x>3</x>'
+            assert zipf.testzip() is None
+
+    @pytest.mark.parametrize('compressao', ['padrao', 'stored', 'rapida', 'maxima'])
+    @pytest.mark.parametrize('threads', [1, 3])
+    def test_compressoes_e_threads(self, compressao, threads):
+        xmls = [f'<edificio>{i}</edificio>'.encode() * 20 for i in range(1, 1200)]
+        destino = io.BytesIO()
+
+        with EscritorZipXml(destino, compressao, threads) as escritor:
+            for numero, xml_content in enumerate(xmls, 1):
+                escritor.adicionar(numero, xml_content)
+
+        with zipfile.ZipFile(destino) as zipf:
+            assert zipf.testzip() is None
+            assert zipf.namelist() == [EscritorZipXml.nome_entrada(i) for i in range(1, 1200)]
+            assert zipf.read('moradia700/moradia700.xml') == xmls[699]
+
+    def test_zip_streaming_com_threads(self):
+        xmls = [f'<x>{i}</x>'.encode() for i in range(1, 1000)]
+
+        corpo = b''.join(gerar_zip_streaming(iter(xmls), 'rapida', threads=2))
+
+        with zipfile.ZipFile(io.BytesIO(corpo)) as zipf:
+            assert zipf.testzip() is None
+            assert len(zipf.namelist()) == 999
+
+    def test_compressao_invalida(self):
+        with pytest.raises(ValueError):
+            EscritorZipXml(io.BytesIO(), 'bzip2')
+
+    def test_threads_gera_o_mesmo_conteudo_que_o_writestr(self):
+        xmls = [f'<x>{i}</x>'.encode() * 30 for i in range(1, 600)]
+        destinos = {threads: io.BytesIO() for threads in (1, 2)}
+
+        for threads, destino in destinos.items():
+            with EscritorZipXml(destino, 'rapida', threads) as escritor:
+                assert (escritor._executor is not None) == (threads > 1)
+                for numero, xml_content in enumerate(xmls, 1):
+                    escritor.adicionar(numero, xml_content)
+
+        with zipfile.ZipFile(destinos[1]) as serial, zipfile.ZipFile(destinos[2]) as paralelo:
+            assert [(i.filename, i.CRC, i.file_size) for i in serial.infolist()] == \
+                   [(i.filename, i.CRC, i.file_size) for i in paralelo.infolist()]
+            assert paralelo.testzip() is None
+
+    def test_sem_internos_do_zipfile_usa_writestr(self, monkeypatch):
+        monkeypatch.setattr(EscritorZipXml, 'suporta_pre_comprimidos', staticmethod(lambda zipf: False))
+        destino = io.BytesIO()
+
+        with EscritorZipXml(destino, 'rapida', threads=3) as escritor:
+            assert escritor._executor is None
+            for numero in range(1, 10):
+                escritor.adicionar(numero, b'<a/>')
+
+        with zipfile.ZipFile(destino) as zipf:
+            assert zipf.testzip() is None
+            assert len(zipf.namelist()) == 9
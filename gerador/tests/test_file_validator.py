@@ -48,6 +48,13 @@ class TestFileValidator:
         assert result['is_valid'] == True
         assert len(result['errors']) == 0
     
+    def test_validate_upload_extensao_composta(self):
+        # Testa extensões compostas (csv.gz) e zip
+        assert self.validator._is_allowed_file('extrato.CSV.GZ', {'csv', 'csv.gz', 'zip'})
+        assert self.validator._is_allowed_file('extrato.zip', {'csv', 'csv.gz', 'zip'})
+        assert not self.validator._is_allowed_file('extrato.gz', {'csv', 'csv.gz', 'zip'})
+        assert not self.validator._is_allowed_file('extrato.csv.gz', {'csv'})
+    
     def test_validate_file_exists(self):
         # Testa validação de arquivo existente
         with tempfile.NamedTemporaryFile(delete=False) as temp_file:
@@ -0,0 +1,102 @@
+import gzip
+import os
+import tempfile
+import pytest
+from gerador import formato_csv
+from gerador.formato_csv import detectar_formato, tamanho_descomprimido
+
+
+class TestFormatoCsv:
+
+    def create_test_file(self, conteudo: bytes) -> str:
+        with tempfile.NamedTemporaryFile(suffix='.csv', delete=False) as f:
+            f.write(conteudo)
+            return f.name
+
+    def detectar(self, conteudo, **opcoes):
+        caminho = self.create_test_file(conteudo)
+        try:
+            return detectar_formato(caminho, **opcoes)
+        finally:
+            os.unlink(caminho)
+
+    def test_utf8(self):
+        formato = self.detectar('COMPLEMENTO;BAIRRO\nLT 1;SÃO JOSÉ\n'.encode('utf-8'))
+
+        assert formato.encoding == 'utf-8'
+        assert formato.delimitador == ';'
+
+    def test_utf8_com_bom(self):
+        formato = self.detectar('﻿A,B\n1,ã\n2,é\n'.encode('utf-8'))
+
+        assert formato.encoding == 'utf-8-sig'
+        assert formato.delimitador == ','
+
+    def test_latin1_pelo_chardet(self):
+        linhas = ''.join(f'GO|GOIÂNIA|SÃO JOSÉ {i}|AÇUDE\n' for i in range(200))
+        formato = self.detectar(('UF|MUNICIPIO|BAIRRO|LOGRADOURO\n' + linhas).encode('latin-1'),
+                                delimitadores='|;,')
+
+        assert formato.encoding == 'latin-1'
+        assert formato.delimitador == '|'
+
+    def test_cp1252_com_caracteres_do_windows(self):
+        linhas = ''.join(f'GO|GOIÂNIA|SÃO JOSÉ {i}|RUA “AÇUDE” – {i}\n' for i in range(200))
+        formato = self.detectar(('UF|MUNICIPIO|BAIRRO|LOGRADOURO\n' + linhas).encode('cp1252'),
+                                delimitadores='|;,')
+
+        assert formato.encoding == 'cp1252'
+
+    def test_amostra_ascii_usa_encoding_informado(self):
+        formato = self.detectar(b'UF|CEP\nGO|74000000\n', delimitadores='|;,', encoding_ascii='latin-1')
+
+        assert formato.encoding == 'latin-1'
+        assert formato.delimitador == '|'
+
+    def test_amostra_cortada_na_ultima_linha_completa(self):
+        conteudo = ('A;B\n' + 'ã;é\n' * 100).encode('utf-8')
+
+        assert self.detectar(conteudo, tamanho_amostra=15).encoding == 'utf-8'
+
+    def test_confianca_baixa(self, monkeypatch):
+        monkeypatch.setattr(formato_csv.chardet, 'detect', lambda amostra: {'encoding': 'cp1252', 'confidence': 0.1})
+
+        with pytest.raises(ValueError, match='encoding'):
+            self.detectar('A;B\n1;\xe3\n'.encode('latin-1'))
+
+    def test_arquivo_vazio(self):
+        with pytest.raises(ValueError, match='vazio'):
+            self.detectar(b'')
+
+    def test_csv_gzip(self):
+        conteudo = 'UF|MUNICIPIO\nGO|Goiânia\n'.encode('latin-1')
+        with tempfile.NamedTemporaryFile(suffix='.csv.gz', delete=False) as f:
+            f.write(gzip.compress(conteudo))
+        try:
+            formato = detectar_formato(f.name, delimitadores='|;,')
+            assert formato.encoding == 'latin-1'
+            assert formato.delimitador == '|'
+            assert tamanho_descomprimido(f.name) == len(conteudo)
+        finally:
+            os.unlink(f.name)
+
+    def test_tamanho_gzip_com_varios_membros_e_limite(self):
+        membros = [b'A;B\n' + b'1;2\n' * 1000, b'3;4\n' * 500000]
+        with tempfile.NamedTemporaryFile(suffix='.csv.gz', delete=False) as f:
+            for membro in membros:
+                f.write(gzip.compress(membro))
+        try:
+            total = sum(len(membro) for membro in membros)
+            assert tamanho_descomprimido(f.name) == total
+            assert len(membros[0]) < tamanho_descomprimido(f.name, limite=len(membros[0])) < total
+        finally:
+            os.unlink(f.name)
+
+    def test_zip_corrompido(self):
+        with tempfile.NamedTemporaryFile(suffix='.zip', delete=False) as f:
+            f.write(b'nao e um zip')
+        try:
+            with pytest.raises(ValueError, match='corrompido'):
+                detectar_formato(f.name)
+        finally:
+            os.unlink(f.name)
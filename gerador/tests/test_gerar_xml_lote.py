@@ -0,0 +1,106 @@
+import os
+import pytest
+import numpy as np
+import pandas as pd
+from gerador.services import gerar_xml
+from gerador.services.gerar_xml import GeradorXml
+from gerador.services.gerar_xml_lote import GeradorXmlLote
+
+DATA_FIXA = '20250101120000'
+DADOS_DIR = os.path.join(os.path.dirname(__file__), 'dados')
+
+
+class _DataFixa:
+    @staticmethod
+    def now():
+        return pd.Timestamp(DATA_FIXA).to_pydatetime()
+
+
+def criar_df():
+    """Cria um DataFrame com valores vazios, numéricos e caracteres especiais"""
+    return pd.DataFrame({
+        'COD_SURVEY': ['SV1', np.nan, 'SV&3'],
+        'LATITUDE': ['-15,7801', np.nan, 'abc'],
+        'LONGITUDE': ['-47,9292', '-47.1', np.nan],
+        'COD_ZONA': ['ZONA-1', np.nan, 'Z<2>'],
+        'LOCALIDADE': ['GUARA', 'SAMAMBAIA', np.nan],
+        'ID_ENDERECO': [123, 456, 789],
+        'LOGRADOURO': ['RUA A', np.nan, 'AVENIDA "B"'],
+        'BAIRRO': ['CENTRO', np.nan, 'SÃO JOSÉ'],
+        'MUNICIPIO': ['BRASILIA', 'BRASILIA', np.nan],
+        'UF': ['DF', 'DF', np.nan],
+        'COD_LOGRADOURO': [2700035341, np.nan, 12],
+        'NUM_FACHADA': ['10', np.nan, 'S/N'],
+        'COMPLEMENTO': ['LT 10', 'CS2', np.nan],
+        'COMPLEMENTO2': ['QD 5', np.nan, 'M'],
+        'COMPLEMENTO3': ['AP 101', '  ', np.nan],
+        'CEP': [71065071, np.nan, 70000000],
+        'ID_ROTEIRO': [1.5, np.nan, 3.0],
+        'ID_LOCALIDADE': ['1894644', '1894644', np.nan],
+        'QUANTIDADE_UMS': [2, 3, 4],
+    })
+
+
+class TestGeradorXmlLote:
+
+    def setup_method(self):
+        self._datetime_original = gerar_xml.datetime
+        gerar_xml.datetime = _DataFixa
+
+    def teardown_method(self):
+        gerar_xml.datetime = self._datetime_original
+
+    @pytest.mark.parametrize('motor', GeradorXmlLote.MOTORES)
+    @pytest.mark.parametrize('complemento_vazio', [False, True])
+    def test_bytes_iguais_ao_gerador_por_linha(self, complemento_vazio, motor):
+        df = criar_df()
+
+        esperado = [
+            GeradorXml(linha, i, complemento_vazio).gerar_xml()
+            for i, (_, linha) in enumerate(df.iterrows(), 1)
+        ]
+        gerado = list(GeradorXmlLote(df, complemento_vazio, data=DATA_FIXA, motor=motor).gerar_xmls())
+
+        assert gerado == esperado
+
+    def test_colunas_ausentes_usam_valores_padrao(self):
+        df = pd.DataFrame({'LATITUDE': ['-15,1'], 'LONGITUDE': ['-47,2']})
+
+        esperado = GeradorXml(next(df.iterrows())[1], 1, True).gerar_xml()
+        gerado = next(GeradorXmlLote(df, True, data=DATA_FIXA).gerar_xmls())
+
+        assert gerado == esperado
+
+    @pytest.mark.parametrize('motor', GeradorXmlLote.MOTORES)
+    @pytest.mark.parametrize('linha, arquivo', [
+        (0, 'edificio_golden.xml'),
+        (2, 'edificio_golden_especiais.xml'),
+    ])
+    def test_golden(self, motor, linha, arquivo):
+        with open(os.path.join(DADOS_DIR, arquivo), 'rb') as f:
+            esperado = f.read()
+
+        df = criar_df().iloc[[linha]]
+        gerado = next(GeradorXmlLote(df, False, data=DATA_FIXA, motor=motor).gerar_xmls())
+
+        assert gerado == esperado
+
+    def test_motor_invalido(self):
+        with pytest.raises(ValueError):
+            GeradorXmlLote(criar_df(), False, motor='lxml')
+
+
+class TestGerarXmlsParalelo:
+
+    def test_paralelo_mantem_ordem_e_conteudo(self, monkeypatch):
+        from gerador.config import Config
+        from gerador.services.gerar_xml_paralelo import gerar_xmls
+
+        df = pd.concat([criar_df()] * 5, ignore_index=True)
+        df['COD_SURVEY'] = [f'SV{i}' for i in range(len(df))]
+        monkeypatch.setattr(Config, 'XML_MIN_LINHAS_PARALELO', 1)
+
+        serial = list(GeradorXmlLote(df, False, data=DATA_FIXA).gerar_xmls())
+        paralelo = list(gerar_xmls(df, False, workers=2, tamanho_fatia=4, data=DATA_FIXA, motor='template'))
+
+        assert paralelo == serial
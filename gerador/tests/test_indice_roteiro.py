@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+import pytest
+from gerador.services.indice_roteiro import IndiceRoteiro
+
+
+class TestIndiceRoteiro:
+
+    def setup_method(self):
+        self.roteiro = pd.DataFrame({
+            'COD_LOCALIDADE': [10, 10, 20, 10],
+            'COD_LOGRADOURO': [1, 2, 1, 1],
+            'ROTEIRO': ['A', 'B', 'C', 'D'],
+        })
+        self.indice = IndiceRoteiro(self.roteiro)
+
+    def test_posicoes(self):
+        enderecos = pd.DataFrame({
+            'COD_LOCALIDADE': [20, 10, 30, 10],
+            'COD_LOGRADOURO': [1, 2, 1, 1],
+        })
+
+        # Chave repetida no roteiro: vale a primeira linha
+        assert self.indice.posicoes(enderecos).tolist() == [2, 1, -1, 0]
+
+    def test_normaliza_codigos_lidos_como_float_ou_texto(self):
+        enderecos = pd.DataFrame({
+            'COD_LOCALIDADE': [10.0, np.nan, ' 20 '],
+            'COD_LOGRADOURO': ['2', 1, 1],
+        })
+
+        assert self.indice.posicoes(enderecos).tolist() == [1, -1, 2]
+
+    def test_buscar_alinha_ao_indice_do_chunk(self):
+        enderecos = pd.DataFrame(
+            {'COD_LOCALIDADE': [10, 30], 'COD_LOGRADOURO': [2, 1]},
+            index=[50000, 50001]
+        )
+
+        resultado = self.indice.buscar(enderecos)
+
+        assert resultado.index.tolist() == [50000, 50001]
+        assert resultado['ROTEIRO'].iloc[0] == 'B'
+        assert pd.isna(resultado['ROTEIRO'].iloc[1])
+
+    def test_roteiro_sem_chaves(self):
+        with pytest.raises(ValueError):
+            IndiceRoteiro(pd.DataFrame({'COD_LOCALIDADE': [1]}))
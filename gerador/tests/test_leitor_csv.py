@@ -0,0 +1,80 @@
+import gzip
+import os
+import shutil
+import tempfile
+import zipfile
+import pandas as pd
+import pytest
+from gerador.services.leitor_csv import LeitorCsvBlocos
+
+
+class TestLeitorCsvBlocos:
+
+    def setup_method(self):
+        self.caminho = os.path.join(tempfile.mkdtemp(), 'enderecos.csv')
+        with open(self.caminho, 'w', encoding='latin-1', newline='') as f:
+            f.write('UF|MUNICIPIO|NUM\n')
+            for i in range(7):
+                f.write(f'GO|Goiânia {i}|{i}\n')
+
+    def test_blocos_iguais_a_leitura_completa(self):
+        leitor = LeitorCsvBlocos(self.caminho, 3)
+        blocos = list(leitor)
+
+        assert [len(bloco) for bloco in blocos] == [3, 3, 1]
+        assert blocos[1].index.tolist() == [3, 4, 5]
+        pd.testing.assert_frame_equal(
+            pd.concat(blocos),
+            pd.read_csv(self.caminho, encoding='latin-1', sep='|')
+        )
+
+    def test_posicao_em_bytes_e_progresso(self):
+        leitor = LeitorCsvBlocos(self.caminho, 3)
+        iterador = iter(leitor)
+
+        next(iterador)
+        with open(self.caminho, 'rb') as f:
+            linhas = f.readlines()
+        assert leitor.posicao == sum(len(linha) for linha in linhas[:4])
+        assert 0 < leitor.fracao_lida < 1
+        assert leitor.total_estimado() == 7
+
+        list(iterador)
+        assert leitor.fracao_lida == 1.0
+        assert leitor.linhas_lidas == 7
+        assert leitor.total_estimado() == 7
+
+    def test_le_csv_compactado(self):
+        esperado = pd.read_csv(self.caminho, encoding='latin-1', sep='|')
+
+        caminho_gz = self.caminho + '.gz'
+        with open(self.caminho, 'rb') as origem, gzip.open(caminho_gz, 'wb') as destino:
+            shutil.copyfileobj(origem, destino)
+        caminho_zip = self.caminho[:-4] + '.zip'
+        with zipfile.ZipFile(caminho_zip, 'w', zipfile.ZIP_DEFLATED) as arquivo_zip:
+            arquivo_zip.write(self.caminho, 'enderecos.csv')
+
+        for caminho in (caminho_gz, caminho_zip):
+            leitor = LeitorCsvBlocos(caminho, 3)
+            pd.testing.assert_frame_equal(pd.concat(list(leitor)), esperado)
+            assert leitor.fracao_lida == 1.0
+            assert leitor.total_estimado() == 7
+
+    def test_campo_com_quebra_de_linha_falha(self):
+        with open(self.caminho, 'w', encoding='latin-1', newline='') as f:
+            f.write('UF|MUNICIPIO|NUM\n')
+            f.write('GO|"Goiânia\nCentro"|1\n')
+            for i in range(2, 8):
+                f.write(f'GO|Goiânia {i}|{i}\n')
+
+        for linhas_por_bloco in (2, 3, 10):
+            with pytest.raises(ValueError):
+                list(LeitorCsvBlocos(self.caminho, linhas_por_bloco))
+
+    def test_linhas_vazias_e_campos_entre_aspas(self):
+        with open(self.caminho, 'w', encoding='latin-1', newline='') as f:
+            f.write('UF|MUNICIPIO|NUM\n')
+            f.write('GO|"Goiânia | Centro"|1\n\n')
+            f.write('GO|Aparecida|2\n')
+
+        assert len(pd.concat(list(LeitorCsvBlocos(self.caminho, 2)))) == 2
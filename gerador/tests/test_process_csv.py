@@ -0,0 +1,33 @@
+from gerador import utils
+from gerador.config import Config
+from gerador.services import process_csv
+from gerador.services.progresso_jobs import RegistroProgresso, contexto_job
+
+
+class EscritorFalso:
+
+    def __init__(self):
+        self.entradas = []
+
+    def adicionar(self, indice, xml):
+        self.entradas.append(indice)
+
+
+def test_gerar_entradas_informa_progresso_por_linha(monkeypatch):
+    registro = RegistroProgresso()
+    canal = registro.criar('job')
+    monkeypatch.setattr(utils, 'PROGRESSO_JOBS', registro)
+    monkeypatch.setattr(Config, 'XML_PROGRESSO_LINHAS', 2)
+
+    total = 5
+    escritor = EscritorFalso()
+    with contexto_job('job'):
+        process_csv._gerar_entradas(escritor, ['<xml/>'] * total, ['LT 1'] * total, ['AP 1'] * total,
+                                    ['BL 1'] * total, False, total=total)
+
+    eventos = [estado for _, estado in canal.eventos(0, timeout=0)]
+    assert escritor.entradas == [1, 2, 3, 4, 5]
+    assert [estado['current'] for estado in eventos] == [2, 4, 5]
+    assert eventos[-1]['total'] == 5
+    assert eventos[-1]['eta'] == 0
+    assert eventos[-1]['linhas_por_segundo'] > 0
@@ -0,0 +1,203 @@
+import gzip
+import os
+import tempfile
+import threading
+import time
+import pytest
+from gerador.config import Config
+from gerador.services import pipeline_conversor
+from gerador.services import processar_conversor_csv_grande as modulo
+
+
+def converter_uf(df, *args):
+    return df.assign(UF=df['UF'] + '!')
+
+
+def falhar(df, *args):
+    raise RuntimeError('falha')
+
+
+def arquivos(pasta):
+    """Arquivos da pasta de downloads, sem a pasta .cache (índice e travas)"""
+    return sorted(nome for nome in os.listdir(pasta) if nome != '.cache')
+
+
+@pytest.fixture
+def conversor(monkeypatch):
+    """Conversor com roteiros e transformação substituídos por versões simples"""
+    pasta = tempfile.mkdtemp()
+    monkeypatch.setattr(Config, 'DOWNLOAD_FOLDER', pasta)
+    monkeypatch.setattr(Config, 'CONVERSOR_TAMANHO_CHUNK', 2)
+    monkeypatch.setattr(Config, 'CONVERSOR_CHUNK_MINIMO', 1)
+    monkeypatch.setattr(Config, 'CONVERSOR_CHUNK_MAXIMO', 2)
+    monkeypatch.setattr(Config, 'CONVERSOR_WORKERS', 1)
+    # fork: os workers do pool herdam as substituições feitas pelo monkeypatch
+    monkeypatch.setattr(Config, 'CONVERSOR_INICIO_PROCESSOS', 'fork')
+    monkeypatch.setattr(modulo, 'update_progress', lambda *args, **kwargs: None)
+    monkeypatch.setattr(modulo, 'carregar_roteiros', lambda: ('aparecida', 'goiania'))
+    monkeypatch.setattr(pipeline_conversor, 'processar_enderecos_otimizado', converter_uf)
+
+    entrada = os.path.join(pasta, 'entrada.csv')
+    with open(entrada, 'w', encoding='latin-1') as f:
+        f.write('UF|MUNICIPIO\n')
+        for i in range(5):
+            f.write(f'GO|Município {i}\n')
+    return pasta, entrada
+
+
+class TestProcessarConversorCsvGrande:
+
+    def test_grava_chunks_com_bom_e_cabecalho_uma_vez(self, conversor):
+        pasta, entrada = conversor
+
+        nome_arquivo, total = modulo.processar_conversor_csv_grande(entrada)
+
+        with open(os.path.join(pasta, nome_arquivo), 'rb') as f:
+            conteudo = f.read()
+
+        assert total == 5
+        assert conteudo.count(b'\xef\xbb\xbf') == 1
+        linhas = conteudo.decode('utf-8-sig').splitlines()
+        assert linhas[0] == '"UF";"MUNICIPIO"'
+        assert len(linhas) == 6
+        assert linhas[-1] == '"GO!";"Município 4"'
+
+    def test_saida_gzip(self, conversor):
+        pasta, entrada = conversor
+
+        nome_arquivo, total = modulo.processar_conversor_csv_grande(entrada, saida_gzip=True)
+
+        assert nome_arquivo.endswith('.csv.gz')
+        with gzip.open(os.path.join(pasta, nome_arquivo), 'rb') as f:
+            conteudo = f.read()
+        assert total == 5
+        assert conteudo.count(b'\xef\xbb\xbf') == 1
+        linhas = conteudo.decode('utf-8-sig').splitlines()
+        assert linhas[0] == '"UF";"MUNICIPIO"'
+        assert linhas[-1] == '"GO!";"Município 4"'
+
+    def test_pipeline_paralelo_mantem_a_ordem(self, conversor, monkeypatch):
+        pasta, entrada = conversor
+
+        def converter():
+            nome_arquivo, total = modulo.processar_conversor_csv_grande(entrada)
+            with open(os.path.join(pasta, nome_arquivo), 'rb') as f:
+                return f.read(), total
+
+        serial = converter()
+        monkeypatch.setattr(Config, 'CONVERSOR_WORKERS', 2)
+        paralelo = converter()
+
+        assert paralelo == serial
+        assert paralelo[1] == 5
+
+    def test_erro_sem_chunk_completo_remove_arquivo_parcial(self, conversor, monkeypatch):
+        pasta, entrada = conversor
+        monkeypatch.setattr(pipeline_conversor, 'processar_enderecos_otimizado', falhar)
+
+        with pytest.raises(Exception):
+            modulo.processar_conversor_csv_grande(entrada)
+
+        assert arquivos(pasta) == ['entrada.csv']
+
+    def test_retoma_do_ultimo_chunk_gravado(self, conversor, monkeypatch):
+        pasta, entrada = conversor
+        nome_completo, _ = modulo.processar_conversor_csv_grande(entrada)
+        with open(os.path.join(pasta, nome_completo), 'rb') as f:
+            esperado = f.read()
+        os.remove(os.path.join(pasta, nome_completo))
+
+        inicios = []
+
+        def falha_no_terceiro_chunk(df, *args):
+            inicios.append(df.index[0])
+            if df.index[0] >= 4:
+                raise RuntimeError('falha')
+            return converter_uf(df)
+        monkeypatch.setattr(pipeline_conversor, 'processar_enderecos_otimizado', falha_no_terceiro_chunk)
+
+        with pytest.raises(Exception):
+            modulo.processar_conversor_csv_grande(entrada)
+        assert any(nome.endswith('.checkpoint.json') for nome in os.listdir(pasta))
+
+        def registrar_chunk(df, *args):
+            inicios.append(df.index[0])
+            return converter_uf(df)
+        monkeypatch.setattr(pipeline_conversor, 'processar_enderecos_otimizado', registrar_chunk)
+
+        inicios.clear()
+        nome_arquivo, total = modulo.processar_conversor_csv_grande(entrada)
+
+        # Só o chunk que falhou é processado de novo
+        assert inicios == [4]
+        assert total == 5
+        with open(os.path.join(pasta, nome_arquivo), 'rb') as f:
+            assert f.read() == esperado
+        assert arquivos(pasta) == sorted(['entrada.csv', nome_arquivo])
+
+    def test_erro_no_pipeline_paralelo(self, conversor, monkeypatch):
+        pasta, entrada = conversor
+        monkeypatch.setattr(Config, 'CONVERSOR_WORKERS', 2)
+        monkeypatch.setattr(pipeline_conversor, 'processar_enderecos_otimizado', falhar)
+
+        with pytest.raises(Exception):
+            modulo.processar_conversor_csv_grande(entrada)
+
+        assert arquivos(pasta) == ['entrada.csv']
+
+    @pytest.mark.parametrize('workers', [1, 2])
+    def test_total_conta_as_linhas_de_saida(self, conversor, monkeypatch, workers):
+        pasta, entrada = conversor
+        monkeypatch.setattr(Config, 'CONVERSOR_WORKERS', workers)
+        monkeypatch.setattr(pipeline_conversor, 'processar_enderecos_otimizado',
+                            lambda df, *args: converter_uf(df[df.index % 2 == 0]))
+
+        nome_arquivo, total = modulo.processar_conversor_csv_grande(entrada)
+
+        with open(os.path.join(pasta, nome_arquivo), 'rb') as f:
+            linhas = f.read().decode('utf-8-sig').splitlines()
+        assert total == 3
+        assert len(linhas) == 4
+
+    def test_jobs_simultaneos_do_mesmo_arquivo(self, conversor, monkeypatch):
+        pasta, entrada = conversor
+        iniciou = threading.Event()
+        chunks = []
+
+        def converter_devagar(df, *args):
+            chunks.append(df.index[0])
+            iniciou.set()
+            time.sleep(0.1)
+            return converter_uf(df)
+        monkeypatch.setattr(pipeline_conversor, 'processar_enderecos_otimizado', converter_devagar)
+
+        resultados = []
+        primeiro = threading.Thread(target=lambda: resultados.append(modulo.processar_conversor_csv_grande(entrada)))
+        primeiro.start()
+        iniciou.wait(5)
+        segundo = modulo.processar_conversor_csv_grande(entrada)
+        primeiro.join()
+
+        # O segundo job espera o primeiro e reaproveita o resultado
+        assert segundo == resultados[0]
+        assert chunks == [0, 2, 4]
+        with open(os.path.join(pasta, segundo[0]), 'rb') as f:
+            linhas = f.read().decode('utf-8-sig').splitlines()
+        assert len(linhas) == 6
+        assert not any('.parcial' in nome for nome in os.listdir(pasta))
+
+    def test_arquivo_so_com_linhas_vazias(self, conversor):
+        pasta, entrada = conversor
+        with open(entrada, 'w', encoding='latin-1') as f:
+            f.write('UF|MUNICIPIO\n\n\n')
+
+        nome_arquivo, total = modulo.processar_conversor_csv_grande(entrada)
+
+        assert total == 0
+        with open(os.path.join(pasta, nome_arquivo), 'rb') as f:
+            assert f.read().decode('utf-8-sig').splitlines() == ['"UF";"MUNICIPIO"']
+
+
+def test_pool_usa_forkserver_por_padrao():
+    assert Config.CONVERSOR_INICIO_PROCESSOS == 'forkserver'
+    assert pipeline_conversor._contexto_processos().get_start_method() == 'forkserver'
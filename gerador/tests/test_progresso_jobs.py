@@ -0,0 +1,138 @@
+import threading
+from gerador.config import Config
+from gerador.services.progresso_jobs import CanalProgresso, RegistroProgresso, contexto_job, job_atual
+from gerador.utils import update_progress
+
+
+class TestCanalProgresso:
+
+    def test_leitores_nao_consomem_eventos(self):
+        canal = CanalProgresso()
+        canal.publicar(message='a', progress=10)
+        canal.publicar(message='b', progress=20)
+
+        primeiro = canal.eventos(0, timeout=0)
+        segundo = canal.eventos(0, timeout=0)
+
+        assert primeiro == segundo
+        assert [estado['message'] for _, estado in primeiro] == ['a', 'b']
+        assert canal.eventos(2, timeout=0) == []
+
+    def test_buffer_limitado_entrega_o_estado_atual_ao_leitor_atrasado(self):
+        canal = CanalProgresso(tamanho_buffer=3)
+        for i in range(10):
+            canal.publicar(current=i)
+
+        assert canal.eventos(0, timeout=0) == [(10, dict(canal.estado))]
+        assert [sequencia for sequencia, _ in canal.eventos(8, timeout=0)] == [9, 10]
+
+    def test_espera_novo_evento(self):
+        canal = CanalProgresso()
+        threading.Timer(0.05, canal.publicar, kwargs={'status': 'completed'}).start()
+
+        eventos = canal.eventos(0, timeout=5)
+
+        assert eventos[0][1]['status'] == 'completed'
+        assert canal.finalizado
+
+    def test_acompanhar_agrupa_atualizacoes_rapidas(self):
+        canal = CanalProgresso()
+        canal.publicar(message='início', status='processing')
+        eventos = canal.acompanhar(0, eventos_por_segundo=20, espera=1)
+        assert next(eventos)[0] == 1
+
+        for i in range(1, 11):
+            canal.publicar(message=f'linha {i}', current=i)
+        canal.publicar(message='fim', status='completed')
+        restantes = list(eventos)
+
+        assert len(restantes) == 1
+        sequencia, estado = restantes[0]
+        assert sequencia == 12
+        assert estado['status'] == 'completed'
+        assert estado['current'] == 10
+        assert estado['mensagens'] == [f'linha {i}' for i in range(1, 11)] + ['fim']
+
+    def test_publicacoes_simultaneas_gravam_uma_vez_por_intervalo(self, monkeypatch):
+        monkeypatch.setattr(Config, 'JOBS_INTERVALO_GRAVACAO', 60)
+        gravados = []
+        canal = CanalProgresso(persistir=lambda sequencia, estado: gravados.append(sequencia))
+        barreira = threading.Barrier(8)
+
+        def publicar():
+            barreira.wait()
+            for i in range(50):
+                canal.publicar(current=i)
+
+        threads = [threading.Thread(target=publicar) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(gravados) == 1
+        canal.publicar(status='completed')
+        assert gravados[-1] == 401
+
+    def test_varios_assinantes_e_retomada(self):
+        canal = CanalProgresso()
+        for i in range(3):
+            canal.publicar(message=f'm{i}')
+        canal.publicar(status='completed')
+
+        primeiro = list(canal.acompanhar(0, eventos_por_segundo=100))
+        segundo = list(canal.acompanhar(0, eventos_por_segundo=100))
+        retomado = list(canal.acompanhar(2, eventos_por_segundo=100))
+
+        assert primeiro == segundo
+        assert primeiro[-1][0] == 4
+        assert retomado[0][1]['mensagens'] == ['m2']
+        assert list(canal.acompanhar(4)) == []
+
+
+class TestRegistroProgresso:
+
+    def test_jobs_simultaneos_nao_se_misturam(self):
+        registro = RegistroProgresso()
+        canais = {job_id: registro.criar(job_id) for job_id in ('a', 'b')}
+
+        def executar(job_id):
+            with contexto_job(job_id):
+                for i in range(5):
+                    registro.obter(job_atual()).publicar(message=f'{job_id}{i}')
+
+        threads = [threading.Thread(target=executar, args=(job_id,)) for job_id in canais]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        for job_id, canal in canais.items():
+            assert {estado['message'][0] for _, estado in canal.eventos(0, timeout=0)} == {job_id}
+
+    def test_descarta_jobs_encerrados_antigos(self, monkeypatch):
+        monkeypatch.setattr(Config, 'PROGRESSO_RETENCAO', 0)
+        registro = RegistroProgresso()
+        registro.criar('antigo').publicar(status='completed')
+        registro.criar('ativo').publicar(status='processing')
+
+        registro.criar('novo')
+
+        assert registro.obter('antigo') is None
+        assert registro.obter('ativo') is not None
+        assert len(registro) == 2
+
+
+def test_update_progress_publica_no_job_da_thread(monkeypatch):
+    from gerador import utils
+    registro = RegistroProgresso()
+    canal = registro.criar('job')
+    monkeypatch.setattr(utils, 'PROGRESSO_JOBS', registro)
+
+    update_progress('fora de um job', progress=1)
+    with contexto_job('job'):
+        update_progress('🔧 Processando arquivo...', progress=10)
+
+    assert canal.sequencia == 1
+    assert canal.estado['message'] == '🔧 Processando arquivo...'
+    assert canal.estado['progress'] == 10
@@ -0,0 +1,46 @@
+import io
+import os
+import tempfile
+import zipfile
+import pytest
+from gerador import create_app
+from gerador.config import Config
+from gerador.constants import COLUNAS_OBRIGATORIAS
+
+
+def csv_valido():
+    linha = {coluna: '1' for coluna in COLUNAS_OBRIGATORIAS}
+    linha.update(COMPLEMENTO='LT 1', COMPLEMENTO2='', COMPLEMENTO3='', UF='GO', ESTACAO_ABASTECEDORA='GNA')
+    return (';'.join(COLUNAS_OBRIGATORIAS) + '\n'
+            + ';'.join(linha[coluna] for coluna in COLUNAS_OBRIGATORIAS) + '\n').encode('utf-8')
+
+
+@pytest.fixture
+def cliente(monkeypatch):
+    monkeypatch.setattr(Config, 'UPLOAD_FOLDER', tempfile.mkdtemp())
+    monkeypatch.setattr(Config, 'DOWNLOAD_FOLDER', tempfile.mkdtemp())
+    return create_app().test_client()
+
+
+class TestDownloadDireto:
+
+    def enviar(self, cliente, conteudo):
+        return cliente.post('/', data={'file': (io.BytesIO(conteudo), 'enderecos.csv'), 'download_direto': '1'},
+                            content_type='multipart/form-data')
+
+    def test_remove_o_upload_depois_do_envio(self, cliente):
+        resposta = self.enviar(cliente, csv_valido())
+        corpo = resposta.get_data()
+        resposta.close()
+
+        assert resposta.mimetype == 'application/zip'
+        with zipfile.ZipFile(io.BytesIO(corpo)) as zipf:
+            assert zipf.namelist() == ['moradia1/moradia1.xml']
+        assert os.listdir(Config.UPLOAD_FOLDER) == []
+
+    @pytest.mark.parametrize('conteudo', [b'', b'A;B\n1;2\n'])
+    def test_remove_o_upload_invalido(self, cliente, conteudo):
+        resposta = self.enviar(cliente, conteudo)
+
+        assert resposta.status_code == 200
+        assert os.listdir(Config.UPLOAD_FOLDER) == []
@@ -0,0 +1,30 @@
+import io
+import pandas as pd
+from gerador.schema_csv import opcoes_leitura_conversor
+
+
+class TestSchemaCsv:
+
+    CSV = 'UF|TIPO_REDE|COD_LOGRADOURO|QUANTIDADE_UMS|OBS\nGO|FTTH|0123|3|x\nGO|||1.5|\n'
+
+    def ler(self, **opcoes):
+        return pd.read_csv(io.StringIO(self.CSV), sep='|', **opcoes)
+
+    def test_tipos_declarados(self):
+        df = self.ler(**opcoes_leitura_conversor(descartadas=[]))
+
+        assert df['TIPO_REDE'].dtype == 'category'
+        assert df['OBS'].dtype == object
+
+    def test_chaves_e_colunas_transformadas_mantem_o_tipo_inferido(self):
+        df = self.ler(**opcoes_leitura_conversor(descartadas=[]))
+        inferido = self.ler()
+
+        for coluna in ('UF', 'COD_LOGRADOURO', 'QUANTIDADE_UMS'):
+            assert df[coluna].dtype == inferido[coluna].dtype
+        assert (df['UF'] + '!').tolist() == ['GO!', 'GO!']
+
+    def test_colunas_descartadas(self):
+        df = self.ler(**opcoes_leitura_conversor(descartadas=['OBS']))
+
+        assert df.columns.tolist() == ['UF', 'TIPO_REDE', 'COD_LOGRADOURO', 'QUANTIDADE_UMS']
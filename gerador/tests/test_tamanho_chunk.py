@@ -0,0 +1,83 @@
+import multiprocessing
+import pytest
+from gerador.services import tamanho_chunk
+from gerador.services.tamanho_chunk import TamanhoChunkAdaptativo, rss_atual
+
+
+class TestTamanhoChunkAdaptativo:
+
+    def test_rss_atual(self):
+        rss = rss_atual()
+        assert rss is None or rss > 0
+
+    def test_observar_calcula_pelo_orcamento_livre(self, monkeypatch):
+        monkeypatch.setattr(tamanho_chunk, 'rss_atual', lambda: 400)
+        controle = TamanhoChunkAdaptativo(orcamento=1000, inicial=10, minimo=1, maximo=1000)
+
+        # (1000 - 400) / 3 cópias / 2 bytes por linha
+        assert controle.observar(20, 10) == 100
+
+    def test_observar_respeita_limites(self, monkeypatch):
+        monkeypatch.setattr(tamanho_chunk, 'rss_atual', lambda: 2000)
+        controle = TamanhoChunkAdaptativo(orcamento=1000, inicial=10, minimo=5, maximo=50)
+
+        assert controle.observar(10, 10) == 5
+
+        monkeypatch.setattr(tamanho_chunk, 'rss_atual', lambda: 0)
+        assert controle.observar(10, 10) == 50
+
+    def test_ajustar_reduz_perto_do_limite(self, monkeypatch):
+        controle = TamanhoChunkAdaptativo(orcamento=1000, inicial=40, minimo=15, maximo=100)
+
+        monkeypatch.setattr(tamanho_chunk, 'rss_atual', lambda: 500)
+        assert controle.ajustar() is None
+        assert controle.tamanho == 40
+
+        monkeypatch.setattr(tamanho_chunk, 'rss_atual', lambda: 950)
+        assert controle.ajustar() == 950
+        assert controle.tamanho == 20
+        controle.ajustar()
+        assert controle.tamanho == 15
+        assert controle.ajustar() is None
+
+    def test_observar_chunk_vazio_mantem_o_tamanho(self, monkeypatch):
+        monkeypatch.setattr(tamanho_chunk, 'rss_atual', lambda: 0)
+        controle = TamanhoChunkAdaptativo(orcamento=1000, inicial=10, minimo=1, maximo=1000)
+
+        assert controle.observar(0, 0) == 10
+        assert controle.bytes_por_linha is None
+
+    def test_ajustar_volta_a_crescer_ate_o_alvo(self, monkeypatch):
+        monkeypatch.setattr(tamanho_chunk, 'rss_atual', lambda: 0)
+        controle = TamanhoChunkAdaptativo(orcamento=3000, inicial=10, minimo=10, maximo=1000)
+        assert controle.observar(10, 10) == 1000
+
+        monkeypatch.setattr(tamanho_chunk, 'rss_atual', lambda: 2900)
+        controle.ajustar()
+        controle.ajustar()
+        assert controle.tamanho == 250
+
+        # Entre os limites o tamanho fica como está
+        monkeypatch.setattr(tamanho_chunk, 'rss_atual', lambda: 2000)
+        assert controle.ajustar() is None
+        assert controle.tamanho == 250
+
+        monkeypatch.setattr(tamanho_chunk, 'rss_atual', lambda: 100)
+        controle.ajustar()
+        assert controle.tamanho == 500
+        controle.ajustar()
+        controle.ajustar()
+        assert controle.tamanho == 1000
+
+    def test_rss_inclui_os_processos_filhos(self):
+        if rss_atual() is None:
+            pytest.skip('RSS disponível só no Linux')
+
+        evento = multiprocessing.get_context('fork').Event()
+        filho = multiprocessing.get_context('fork').Process(target=evento.wait, args=(10,))
+        filho.start()
+        try:
+            assert rss_atual() > rss_atual(filhos=False)
+        finally:
+            evento.set()
+            filho.join()
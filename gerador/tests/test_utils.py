@@ -0,0 +1,32 @@
+import numpy as np
+import pandas as pd
+from gerador.utils import (
+    obter_codigo_complemento, extrair_numero_argumento, resolver_complementos
+)
+
+VALORES = ['LT 10', ' ap 101 ', 'M', 'm 12', 'P5', 'PX3', 'MT 5', 'QD', '', '  ', 'X', 12.0, np.nan]
+
+
+class TestComplementos:
+
+    def test_codigos_de_uma_letra(self):
+        assert obter_codigo_complemento('M') == '62'
+        assert extrair_numero_argumento('M') == '1'
+        assert obter_codigo_complemento('P 5') == '78'
+        assert extrair_numero_argumento('P 5') == '5'
+        assert obter_codigo_complemento('MT 5') == '63'
+        assert obter_codigo_complemento('PX3') == '60'
+
+    def test_vetorizado_igual_ao_escalar(self):
+        codigos, argumentos = resolver_complementos(pd.Series(VALORES, dtype=object))
+
+        assert codigos.tolist() == [obter_codigo_complemento(v) for v in VALORES]
+        assert argumentos.tolist() == [extrair_numero_argumento(v) for v in VALORES]
+
+    def test_vetorizado_mantem_indice(self):
+        serie = pd.Series(['AP 1', np.nan], index=[10, 20])
+
+        codigos, argumentos = resolver_complementos(serie)
+
+        assert codigos.to_dict() == {10: '9', 20: '60'}
+        assert argumentos.to_dict() == {10: '1', 20: '1'}
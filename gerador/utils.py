@@ -1,7 +1,9 @@
 import os
 import pandas as pd
 import numpy as np
-from gerador.constants import CODIGOS_COMPLEMENTO, PROGRESS_LOCK, MESSAGE_QUEUE
+from gerador.constants import CODIGOS_COMPLEMENTO
+from gerador.services.cache_roteiros import CACHE_ROTEIROS
+from gerador.services.progresso_jobs import PROGRESSO_JOBS, job_atual
 
 def formatar_coordenada(coord):
     """Converte coordenada de formato brasileiro para internacional"""
@@ -12,60 +14,107 @@ def formatar_coordenada(coord):
     except ValueError:
         return None
 
-def update_progress(message, progress=None, current=None, total=None, status=None):
-    """Atualiza os dados de progresso e envia para a fila"""
-    global progress_data
-    with PROGRESS_LOCK:
-        if message:
-            progress_data['message'] = message
-        if progress is not None:
-            progress_data['progress'] = progress
-        if current is not None:
-            progress_data['current'] = current
-        if total is not None:
-            progress_data['total'] = total
-        if status:
-            progress_data['status'] = status
-        
-        # Envia cópia dos dados para a fila
-        MESSAGE_QUEUE.put(progress_data.copy())
+def update_progress(message, progress=None, current=None, total=None, status=None, **extras):
+    """
+    Publica o progresso no canal do job da thread atual (sem job, é ignorado).
+    Campos extras (ex.: linhas_por_segundo) seguem junto no evento.
+    """
+    canal = PROGRESSO_JOBS.obter(job_atual())
+    if canal is None:
+        return
+    
+    campos = dict(extras)
+    if message:
+        campos['message'] = message
+    if progress is not None:
+        campos['progress'] = progress
+    if current is not None:
+        campos['current'] = current
+    if total is not None:
+        campos['total'] = total
+    if status:
+        campos['status'] = status
+    canal.publicar(**campos)
 
 # REMOVIDA: função validar_colunas_csv - agora está no CSVValidator
 
-def obter_codigo_complemento(texto):
+# Códigos de uma letra só (M = MODULO, P = PREDIO)
+CODIGOS_UMA_LETRA = {codigo for codigo in CODIGOS_COMPLEMENTO if len(codigo) == 1}
+
+def _resolver_complemento(texto):
     """
-    Obtém o código do complemento baseado nas duas primeiras letras do texto
+    Retorna (código, argumento) de um complemento.
+
+    O código vem das duas primeiras letras; se elas não forem um código
+    conhecido e o texto começar com um código de uma letra (ex.: "M 12",
+    "P5") seguido de algo que não é letra, usa o código de uma letra.
     """
     if pd.isna(texto) or texto == '':
-        return '60'  # Default para LT (LOTE)
+        return '60', '1'  # Default para LT (LOTE)
     
-    texto_str = str(texto).strip().upper()
+    texto_str = str(texto).strip()
+    maiusculo = texto_str.upper()
     
-    # Pegar as duas primeiras letras
-    if len(texto_str) >= 2:
-        codigo = texto_str[:2]
-        return str(CODIGOS_COMPLEMENTO.get(codigo, 60))  # Default 60 se não encontrar
-    else:
-        return '60'  # Default para LT (LOTE)
+    codigo = CODIGOS_COMPLEMENTO.get(maiusculo[:2])
+    argumento = texto_str[2:].strip()
+    
+    if codigo is None and maiusculo[:1] in CODIGOS_UMA_LETRA and not maiusculo[1:2].isalpha():
+        codigo = CODIGOS_COMPLEMENTO[maiusculo[:1]]
+        argumento = texto_str[1:].strip()
+    
+    return str(codigo if codigo is not None else 60), argumento or '1'
+
+def obter_codigo_complemento(texto):
+    """
+    Obtém o código do complemento baseado nas duas primeiras letras do texto
+    """
+    return _resolver_complemento(texto)[0]
 
 def extrair_numero_argumento(texto):
     """
     Extrai TODO o conteúdo depois das duas primeiras letras
     """
-    if pd.isna(texto) or texto == '':
-        return '1'
+    return _resolver_complemento(texto)[1]
+
+def resolver_complementos(serie):
+    """
+    Versão vetorizada de obter_codigo_complemento/extrair_numero_argumento.
+
+    Resolve apenas os valores distintos da Series (os dados reais têm poucas
+    centenas de complementos diferentes) e mapeia o resultado de volta.
+    Retorna (codigos, argumentos) como Series com o mesmo índice.
+    """
+    serie = pd.Series(serie)
+    distintos = pd.Series(pd.unique(serie.dropna()), dtype=object)
     
-    texto_str = str(texto).strip()
+    texto = distintos.astype(str).str.strip()
+    maiusculo = texto.str.upper()
     
-    if len(texto_str) < 2:
-        return '1'
+    codigo = maiusculo.str[:2].map(CODIGOS_COMPLEMENTO)
+    argumento = texto.str[2:].str.strip()
     
-    argumento = texto_str[2:].strip()
+    uma_letra = (
+        codigo.isna()
+        & maiusculo.str[:1].isin(CODIGOS_UMA_LETRA)
+        & ~maiusculo.str[1:2].str.isalpha().astype(bool)
+    )
+    codigo = codigo.where(~uma_letra, maiusculo.str[:1].map(CODIGOS_COMPLEMENTO))
+    argumento = argumento.where(~uma_letra, texto.str[1:].str.strip())
     
-    if argumento == '':
-        return '1'
+    codigo = codigo.fillna(60).astype(int).astype(str)
+    argumento = argumento.where(argumento != '', '1')
     
-    return argumento
+    codigos = serie.map(dict(zip(distintos, codigo))).fillna('60')
+    argumentos = serie.map(dict(zip(distintos, argumento))).fillna('1')
+    return codigos, argumentos
+
+def obter_codigos_complemento(serie):
+    """Versão vetorizada de obter_codigo_complemento"""
+    return resolver_complementos(serie)[0]
+
+def extrair_numeros_argumento(serie):
+    """Versão vetorizada de extrair_numero_argumento"""
+    return resolver_complementos(serie)[1]
 
 def determinar_destinacao(ucs_residenciais, ucs_comerciais):
     """Determina a destinação baseado nas UCs residenciais e comerciais"""
@@ -102,8 +151,10 @@ def carregar_roteiros():
             print(f"❌ Arquivo não encontrado: {caminho_goiania}")
             return None, None
             
-        df_roteiro_aparecida = pd.read_excel(caminho_aparecida)
-        df_roteiro_goiania = pd.read_excel(caminho_goiania)
+        # Lidos uma vez por processo (e do .pkl auxiliar quando existir);
+        # recarregados apenas se o xlsx mudar
+        df_roteiro_aparecida = CACHE_ROTEIROS.carregar(caminho_aparecida)
+        df_roteiro_goiania = CACHE_ROTEIROS.carregar(caminho_goiania)
         
         print("✅ Roteiros carregados com sucesso")
         print(f"   - Aparecida: {len(df_roteiro_aparecida)} registros")
@@ -73,9 +73,10 @@ class FileValidator(BaseValidator):
         return self.get_validation_result()
     
     def _is_allowed_file(self, filename: str, allowed_extensions: set) -> bool:
-        """Verifica se a extensão do arquivo é permitida"""
-        return '.' in filename and \
-               filename.rsplit('.', 1)[1].lower() in allowed_extensions
+        """Verifica se a extensão do arquivo é permitida (aceita extensões compostas, como 'csv.gz')"""
+        nome = filename.lower()
+        return '.' in nome and \
+               any(nome.endswith('.' + extensao) for extensao in allowed_extensions)
     
     def _is_valid_size(self, file) -> bool:
         """Verifica se o tamanho do arquivo é válido"""